@@ -0,0 +1,447 @@
+"""Latency benchmarks for each pipeline stage and the /solve route.
+
+    python benchmarks/bench.py                      # full run, compared with baseline.json
+    python benchmarks/bench.py --quick --only solve_ik
+    python benchmarks/bench.py --update-baseline    # after an intentional change
+
+Results are JSON (p50/p95/p99/mean in milliseconds plus throughput per second).
+Each benchmark runs in several rounds; with a baseline, any benchmark whose
+best per-round p50 grew by more than ``--tolerance`` is reported as a
+regression and the exit status is 1.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+from contextlib import ExitStack
+from dataclasses import dataclass
+import gc
+import io
+import json
+import os
+from pathlib import Path
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+RESOURCES_DIR = ROOT / "RobotResources"
+ROBOT_FILE = RESOURCES_DIR / "RobotModels" / "KUKA KR120R2500.m"
+TOOL_FILE = RESOURCES_DIR / "Tools" / "Drill_8mm.m"
+EXAMPLE_TEXT = (
+    "I am using the KUKA KR120 R2500 robot. "
+    "I want to move the tooltip of an 8mm drilling tool to [1.5m, 0.1m, 1.0m]"
+)
+CATALOG_SIZES = (10, 100, 1000, 10000)
+DEFAULT_TOLERANCE = 0.3
+DEFAULT_ROUNDS = 5
+SEED = 0
+
+
+Step = Callable[[int], None]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[Path, ExitStack], Step]
+    iterations: int
+    warmup: int = 3
+
+
+def summarize(samples_ns: List[int], round_medians_ns: List[float]) -> Dict[str, float]:
+    samples = np.asarray(samples_ns, dtype=float) / 1e6
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "n": int(samples.size),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(samples.mean()),
+        "best_round_p50_ms": float(min(round_medians_ns) / 1e6),
+        "throughput_per_s": float(1e3 * samples.size / samples.sum()) if samples.sum() else 0.0,
+    }
+
+
+def measure(benches: List[Benchmark], steps: Dict[str, Step], rounds: int = DEFAULT_ROUNDS) -> Dict[str, dict]:
+    """Time every step in ``rounds`` interleaved rounds.
+
+    Each round re-runs the warm-up and then ``iterations`` timed calls of every
+    benchmark in turn, so a transient slowdown of the machine spoils one round
+    of each benchmark rather than every round of a few. Percentiles pool all
+    samples; ``best_round_p50_ms`` is the lowest per-round median and is what
+    baselines are compared on.
+    """
+    samples: Dict[str, List[int]] = {bench.name: [] for bench in benches}
+    medians: Dict[str, List[float]] = {bench.name: [] for bench in benches}
+    for _ in range(rounds):
+        for bench in benches:
+            step = steps[bench.name]
+            for i in range(bench.warmup):
+                step(i)
+            round_samples = []
+            # As in timeit, keep the garbage collector out of the timed calls.
+            gc.collect()
+            gc.disable()
+            try:
+                for i in range(bench.iterations):
+                    start = time.perf_counter_ns()
+                    step(i)
+                    round_samples.append(time.perf_counter_ns() - start)
+            finally:
+                gc.enable()
+            medians[bench.name].append(float(np.median(round_samples)))
+            samples[bench.name].extend(round_samples)
+    return {bench.name: summarize(samples[bench.name], medians[bench.name]) for bench in benches}
+
+
+# Stage setups: each prepares its inputs and returns the timed step; ``stack``
+# collects anything that must be closed after the run.
+
+
+def _with_env(step: Step, **values: str) -> Step:
+    """Run ``step`` with environment overrides, e.g. to switch a cache off for the timed call."""
+
+    def wrapped(i: int) -> None:
+        saved = {name: os.environ.get(name) for name in values}
+        os.environ.update(values)
+        try:
+            step(i)
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    return wrapped
+
+
+def _parse_matrices(workdir: Path, stack: ExitStack):
+    from vibeik.matlab_m_parser import parse_matrices
+
+    text = ROBOT_FILE.read_text()
+    return lambda i: parse_matrices(text)
+
+
+def _extract_matrix(workdir: Path, stack: ExitStack):
+    from vibeik.matlab_m_parser import extract_matrix
+
+    text = ROBOT_FILE.read_text()
+    return lambda i: extract_matrix(text, ["DH", "dh", "DH_table"], expected_shape=(6, 4))
+
+
+def _extract_matrix_large(workdir: Path, stack: ExitStack):
+    from vibeik.matlab_m_parser import extract_matrix
+
+    text = _large_robot_text()
+    return lambda i: extract_matrix(text, ["DH", "dh", "DH_table"], expected_shape=(6, 4))
+
+
+def _catalog(size: int):
+    def setup(workdir: Path, stack: ExitStack):
+        from vibeik.resources import build_resource_index
+
+        base = workdir / f"catalog_{size}"
+        tools = base / "Tools"
+        robots = base / "RobotModels"
+        if not tools.exists():
+            tools.mkdir(parents=True)
+            robots.mkdir()
+            tool_text = TOOL_FILE.read_text()
+            robot_text = ROBOT_FILE.read_text()
+            for n in range(size):
+                (tools / f"Tool_{n % 7}_{n}mm.m").write_text(tool_text)
+            for n in range(max(1, size // 100)):
+                (robots / f"Robot_{n}.m").write_text(robot_text)
+        return lambda i: build_resource_index(base)
+
+    return setup
+
+
+def _large_robot_text() -> str:
+    # A robot file that also carries a 200x200 calibration lookup table.
+    rng = np.random.default_rng(SEED)
+    rows = ";\n".join(" ".join(f"{value:.6f}" for value in row) for row in rng.normal(size=(200, 200)))
+    return f"CAL = [{rows}];\n" + ROBOT_FILE.read_text()
+
+
+def _load(kind: str, cache: str):
+    def setup(workdir: Path, stack: ExitStack):
+        from vibeik import resources
+
+        load = resources.load_tool if kind == "tool" else resources.load_robot
+        path = {"robot": ROBOT_FILE, "tool": TOOL_FILE}.get(kind)
+        if path is None:
+            # Large enough for the compiled file on disk to be used.
+            path = workdir / "Large Robot.m"
+            path.write_text(_large_robot_text())
+        if cache == "memory":
+            load(path)
+            return lambda i: load(path)
+        if cache == "compiled":
+            load(path)
+
+            def step(i: int) -> None:
+                resources.clear_resource_cache()
+                load(path)
+
+            return step
+
+        if cache == "parse":
+            # What the disk layer must beat: a parse with the disk layer switched off.
+            def step(i: int) -> None:
+                resources.clear_resource_cache()
+                load(path)
+
+            return _with_env(step, VIBEIK_CACHE_DIR="")
+
+        # A cold worker: parse and write the compiled file.
+        def step(i: int) -> None:
+            resources.clear_resource_cache(disk=True)
+            load(path)
+
+        return step
+
+    return setup
+
+
+def _rotation(kind: str):
+    def setup(workdir: Path, stack: ExitStack):
+        from vibeik.kinematics import rotation_from_orientation
+        from vibeik.types import Orientation
+
+        rng = np.random.default_rng(SEED)
+        if kind == "rpy":
+            orientations = [Orientation(roll=r, pitch=p, yaw=y) for r, p, y in rng.uniform(-np.pi, np.pi, (256, 3))]
+        else:
+            quats = rng.normal(size=(256, 4))
+            quats /= np.linalg.norm(quats, axis=1, keepdims=True)
+            orientations = [Orientation(quaternion=q.tolist()) for q in quats]
+        return lambda i: rotation_from_orientation(orientations[i % len(orientations)])
+
+    return setup
+
+
+def _batch_targets(kind: str):
+    """Turn a 1000-row targets CSV into flange targets, per point or as one PoseBatch."""
+
+    def setup(workdir: Path, stack: ExitStack):
+        from vibeik.pipeline import ResolvedResources, flange_target
+        from vibeik.poses import ORIENTATION_COLUMNS, read_pose_csv
+        from vibeik.resources import load_robot, load_tool
+        from vibeik.types import BatchTarget, Orientation
+
+        resources = ResolvedResources("KR120R2500", "Drill_8mm", load_robot(ROBOT_FILE), load_tool(TOOL_FILE))
+        rng = np.random.default_rng(SEED)
+        rows = np.column_stack([rng.uniform(0.5, 2.0, (1000, 3)), rng.uniform(-np.pi, np.pi, (1000, 3))])
+        text = "x,y,z,roll,pitch,yaw\n" + "".join(",".join(f"{v:.6f}" for v in row) + "\n" for row in rows)
+        if kind == "per_point":
+            # The pre-PoseBatch path: one model and one 4x4 transform per row.
+            def step(i: int) -> None:
+                for row in csv.DictReader(io.StringIO(text)):
+                    orientation = Orientation(**{column: float(row[column]) for column in ORIENTATION_COLUMNS})
+                    target = BatchTarget(x=float(row["x"]), y=float(row["y"]), z=float(row["z"]),
+                                         orientation=orientation)
+                    flange_target(resources, target, target.orientation)
+        else:
+            def step(i: int) -> None:
+                read_pose_csv(io.StringIO(text)).flange_targets(resources.tool.tcp_inv)
+        return step
+
+    return setup
+
+
+def _encode_batch(fmt: str):
+    """Serialize a 1000-point batch response."""
+
+    def setup(workdir: Path, stack: ExitStack):
+        from vibeik.formats import encode
+        from vibeik.types import BatchPointResult, BatchSolveResponse
+
+        rng = np.random.default_rng(SEED)
+        response = BatchSolveResponse(ok=True, results=[
+            BatchPointResult(ok=True, joint_angles_rad=q.tolist(), residual_error=1e-9)
+            for q in rng.uniform(-np.pi, np.pi, (1000, 6))
+        ])
+        return lambda i: encode(response, fmt)
+
+    return setup
+
+
+def reachable_poses(dh: np.ndarray, count: int, seed: int = SEED) -> np.ndarray:
+    """Flange poses generated by forward kinematics of seeded random joint vectors."""
+    from vibeik.kinematics import fkine_batch
+
+    rng = np.random.default_rng(seed)
+    q = rng.uniform(-np.pi * 0.8, np.pi * 0.8, size=(count, dh.shape[0]))
+    return fkine_batch(dh, q)
+
+
+def _solve_ik(solver: str, use_cache: bool = False):
+    def setup(workdir: Path, stack: ExitStack):
+        from vibeik.ik import solve_ik
+        from vibeik.resources import load_robot
+
+        dh = load_robot(ROBOT_FILE).dh
+        poses = reachable_poses(dh, 512)
+        return lambda i: solve_ik(dh, poses[i % len(poses)], solver=solver, use_cache=use_cache)
+
+    return setup
+
+
+# The route and CLI benchmarks repeat one instruction, so with the IK cache on every
+# call after the first is a hit. The plain variants switch it off to time the solve.
+
+
+def _solve_route(ik_cache: bool):
+    def setup(workdir: Path, stack: ExitStack):
+        from fastapi.testclient import TestClient
+
+        from vibeik.api import app
+
+        client = stack.enter_context(TestClient(app))
+
+        def step(i: int) -> None:
+            response = client.post("/solve", json={"text": EXAMPLE_TEXT})
+            response.raise_for_status()
+
+        return step if ik_cache else _with_env(step, VIBEIK_IK_CACHE="0")
+
+    return setup
+
+
+def _end_to_end(ik_cache: bool):
+    def setup(workdir: Path, stack: ExitStack):
+        from vibeik.cli import run
+
+        def step(i: int) -> None:
+            run(EXAMPLE_TEXT)
+
+        return step if ik_cache else _with_env(step, VIBEIK_IK_CACHE="0")
+
+    return setup
+
+
+def benchmarks(quick: bool = False) -> List[Benchmark]:
+    scale = 0.04 if quick else 0.2
+
+    def n(count: int) -> int:
+        return max(5, int(count * scale))
+
+    suite = [
+        Benchmark("parse_matrices", _parse_matrices, n(2000)),
+        Benchmark("extract_matrix", _extract_matrix, n(2000)),
+        Benchmark("extract_matrix_large", _extract_matrix_large, n(500)),
+    ]
+    for size in CATALOG_SIZES[:3] if quick else CATALOG_SIZES:
+        suite.append(Benchmark(f"build_resource_index_{size}", _catalog(size), n(max(10, 20000 // size)), warmup=1))
+    for kind in ("robot", "tool"):
+        for cache in ("memory", "parse"):
+            suite.append(Benchmark(f"load_{kind}_{cache}", _load(kind, cache), n(500)))
+    for cache in ("compiled", "parse", "parse_write"):
+        suite.append(Benchmark(f"load_robot_large_{cache}", _load("robot_large", cache), n(100)))
+    suite += [
+        Benchmark("rotation_from_orientation_rpy", _rotation("rpy"), n(5000)),
+        Benchmark("rotation_from_orientation_quaternion", _rotation("quaternion"), n(5000)),
+        Benchmark("batch_targets_1000_per_point", _batch_targets("per_point"), n(50)),
+        Benchmark("batch_targets_1000_pose_batch", _batch_targets("pose_batch"), n(50)),
+        Benchmark("encode_batch_1000_json", _encode_batch("json"), n(200)),
+        Benchmark("encode_batch_1000_raw", _encode_batch("raw"), n(200)),
+        Benchmark("solve_ik", _solve_ik("auto"), n(1000)),
+        Benchmark("solve_ik_numpy_lm", _solve_ik("numpy_lm"), n(300)),
+        # The warm-up solves each of the 512 poses once, so every timed call is a cache hit.
+        Benchmark("solve_ik_cached", _solve_ik("numpy_lm", use_cache=True), n(3000), warmup=512),
+        Benchmark("solve_route", _solve_route(ik_cache=False), n(300)),
+        Benchmark("solve_route_cached", _solve_route(ik_cache=True), n(300)),
+        Benchmark("end_to_end_cli_run", _end_to_end(ik_cache=False), n(500)),
+        Benchmark("end_to_end_cli_run_cached", _end_to_end(ik_cache=True), n(500)),
+    ]
+    return suite
+
+
+def run_suite(quick: bool = False, only: Optional[List[str]] = None, rounds: int = DEFAULT_ROUNDS) -> dict:
+    """Run the suite in an isolated cache directory without an LLM key."""
+    saved = dict(os.environ)
+    try:
+        with tempfile.TemporaryDirectory(prefix="vibeik-bench-") as tmp, ExitStack() as stack:
+            os.environ.pop("OPENAI_API_KEY", None)
+            os.environ.pop("VIBEIK_SOCKET", None)
+            os.environ.update(VIBEIK_WORKERS="1", VIBEIK_CACHE_DIR=str(Path(tmp) / "cache"))
+            benches = [bench for bench in benchmarks(quick)
+                       if not only or any(bench.name.startswith(prefix) for prefix in only)]
+            steps = {bench.name: bench.setup(Path(tmp), stack) for bench in benches}
+            results = measure(benches, steps, rounds)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "quick": quick,
+            "rounds": rounds,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    """Return the benchmarks whose best-round p50 regressed by more than ``tolerance``."""
+    regressions = []
+    for name, result in report["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference or not reference.get("best_round_p50_ms"):
+            continue
+        ratio = result["best_round_p50_ms"] / reference["best_round_p50_ms"]
+        if ratio > 1.0 + tolerance:
+            regressions.append({"name": name, "best_round_p50_ms": result["best_round_p50_ms"],
+                                "baseline_best_round_p50_ms": reference["best_round_p50_ms"], "ratio": ratio})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Run a tenth of the iterations and skip the 10k catalog")
+    parser.add_argument("--only", nargs="+", help="Run benchmarks whose names start with these prefixes")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed fractional increase of the best-round p50 before a regression is reported")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    args = parser.parse_args(argv)
+
+    report = run_suite(quick=args.quick, only=args.only)
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        suspects = compare(report, baseline, args.tolerance)
+        if suspects:
+            # Re-measure suspects once; a real regression reproduces, a noisy neighbour rarely does.
+            retry = run_suite(quick=args.quick, only=[suspect["name"] for suspect in suspects])
+            for name, result in retry["results"].items():
+                if result["best_round_p50_ms"] < report["results"][name]["best_round_p50_ms"]:
+                    report["results"][name] = result
+        report["regressions"] = compare(report, baseline, args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from .kinematics import dh_link_transforms, fkine_batch
+from .metrics import stage
+
+
+HALF_PI = math.pi / 2
+SINGULARITY_TOL = 1e-6
+
+
+@dataclass(frozen=True)
+class SphericalWristGeometry:
+    """Constants of a 6R arm whose last three joint axes meet in one point.
+
+    The supported family is the usual industrial layout (KUKA, PUMA, ABB):
+    ``alpha1 = +-pi/2``, ``alpha2 = 0`` (parallel shoulder/elbow axes),
+    ``alpha4, alpha5 = +-pi/2`` and ``a4 = a5 = a6 = d5 = 0``. ``alpha3`` and the
+    lateral offsets ``d2``/``d3`` are free.
+    """
+
+    dh: np.ndarray
+    sigma1: float
+    sigma4: float
+    wrist_flip: float
+    z_offset: float
+    l3: float
+    phi3: float
+
+
+@dataclass(frozen=True)
+class AnalyticSolution:
+    q: np.ndarray
+    singular: bool
+    # Flange position error found when the candidate was verified.
+    residual: float = 0.0
+
+
+def _is_close(value: float, expected: float, tol: float) -> bool:
+    return abs(math.remainder(value - expected, 2 * math.pi)) < tol
+
+
+def spherical_wrist_geometry(dh: np.ndarray, tol: float = 1e-9) -> Optional[SphericalWristGeometry]:
+    """Return the closed-form constants for ``dh``, or None if it does not conform."""
+    if dh.shape != (6, 4):
+        return None
+    alpha, a, _, d = (dh[:, i] for i in range(4))
+    if abs(a[3]) > tol or abs(a[4]) > tol or abs(a[5]) > tol or abs(d[4]) > tol:
+        return None
+    if not _is_close(alpha[1], 0.0, tol):
+        return None
+    for i in (0, 3, 4):
+        if not (_is_close(alpha[i], HALF_PI, tol) or _is_close(alpha[i], -HALF_PI, tol)):
+            return None
+    sa3 = math.sin(alpha[2])
+    l3 = math.hypot(a[2], sa3 * d[3])
+    if abs(a[1]) < tol or l3 < tol:
+        return None
+    return SphericalWristGeometry(
+        dh=dh,
+        sigma1=math.copysign(1.0, math.sin(alpha[0])),
+        sigma4=math.copysign(1.0, math.sin(alpha[3])),
+        wrist_flip=math.cos(alpha[3] + alpha[4]),
+        z_offset=d[1] + d[2] + math.cos(alpha[2]) * d[3],
+        l3=l3,
+        phi3=math.atan2(-sa3 * d[3], a[2]),
+    )
+
+
+def _rot_x(angle: float) -> np.ndarray:
+    c, s = math.cos(angle), math.sin(angle)
+    return np.array([[1.0, 0.0, 0.0], [0.0, c, -s], [0.0, s, c]])
+
+
+def _wrap(q: np.ndarray) -> np.ndarray:
+    return (q + np.pi) % (2 * np.pi) - np.pi
+
+
+def _arm_solutions(geometry: SphericalWristGeometry, wrist_center: np.ndarray):
+    """Yield ``(q1', q2', q3', singular)`` for the position sub-problem (up to 4)."""
+    alpha, a, _, d = (geometry.dh[:, i] for i in range(4))
+    px, py, pz = wrist_center
+    r = math.hypot(px, py)
+    k = geometry.sigma1 * geometry.z_offset
+    if r < abs(k) or r == 0.0:
+        return
+    beta = math.atan2(py, px)
+    shoulder = math.asin(k / r)
+    shoulder_singular = math.sqrt(max(r * r - k * k, 0.0)) < SINGULARITY_TOL
+    for q1 in (beta + shoulder, beta + math.pi - shoulder):
+        c1, s1 = math.cos(q1), math.sin(q1)
+        xp = c1 * px + s1 * py - a[0]
+        yp = geometry.sigma1 * (pz - d[0])
+        cos_psi = (xp * xp + yp * yp - a[1] ** 2 - geometry.l3**2) / (2 * a[1] * geometry.l3)
+        if abs(cos_psi) > 1.0 + 1e-12:
+            continue
+        cos_psi = max(-1.0, min(1.0, cos_psi))
+        psi_abs = math.acos(cos_psi)
+        elbow_singular = math.sin(psi_abs) < SINGULARITY_TOL
+        for psi in (psi_abs, -psi_abs):
+            q2 = math.atan2(yp, xp) - math.atan2(
+                geometry.l3 * math.sin(psi), a[1] + geometry.l3 * math.cos(psi)
+            )
+            q3 = psi - geometry.phi3
+            yield q1, q2, q3, shoulder_singular or elbow_singular
+            if elbow_singular:
+                break
+
+
+def _wrist_solutions(geometry: SphericalWristGeometry, wrist_rotation: np.ndarray):
+    """Yield ``(q4', q5', q6', singular)`` for ``Rz(q4')Rx(a4)Rz(q5')Rx(a5)Rz(q6')``."""
+    # Rx(a4) Rz(b) Rx(a5) == Ry(-sigma4 * b) Rx(a4 + a5), and Rx(a4 + a5) is either
+    # identity or a half turn, so the wrist reduces to a ZYZ Euler decomposition.
+    alpha = geometry.dh[:, 0]
+    n = wrist_rotation @ _rot_x(-(alpha[3] + alpha[4]))
+    sb = math.hypot(n[0, 2], n[1, 2])
+    if sb < SINGULARITY_TOL:
+        if n[2, 2] > 0:
+            zyz = [(0.0, 0.0, math.atan2(n[1, 0], n[0, 0]))]
+        else:
+            zyz = [(0.0, math.pi, math.atan2(n[1, 0], -n[0, 0]))]
+        singular = True
+    else:
+        b = math.atan2(sb, n[2, 2])
+        za = math.atan2(n[1, 2], n[0, 2])
+        zc = math.atan2(n[2, 1], -n[2, 0])
+        zyz = [(za, b, zc), (za + math.pi, -b, zc + math.pi)]
+        singular = False
+    for za, b, zc in zyz:
+        yield za, -geometry.sigma4 * b, geometry.wrist_flip * zc, singular
+
+
+def solve_spherical_wrist(
+    geometry: SphericalWristGeometry, target: np.ndarray, tol: float = 1e-6
+) -> List[AnalyticSolution]:
+    """Return every closed-form joint solution (up to 8) reaching the flange ``target``."""
+    dh = geometry.dh
+    alpha, _, offset, d = (dh[:, i] for i in range(4))
+    rotation = target[:3, :3]
+    # With a6 = 0 the flange frame is Rz(q6') Tz(d6) Rx(alpha6) past the wrist centre.
+    wrist_center = target[:3, 3] + rotation @ (_rot_x(-alpha[5]) @ np.array([0.0, 0.0, -d[5]]))
+    wrist_target = rotation @ _rot_x(-alpha[5])
+
+    candidates = []
+    for q1, q2, q3, arm_singular in _arm_solutions(geometry, wrist_center):
+        arm = np.array([q1, q2, q3]) - offset[:3]
+        links = dh_link_transforms(dh[:3], arm)[0]
+        r03 = (links[0] @ links[1] @ links[2])[:3, :3]
+        for q4, q5, q6, wrist_singular in _wrist_solutions(geometry, r03.T @ wrist_target):
+            wrist = np.array([q4, q5, q6]) - offset[3:]
+            candidates.append((np.concatenate([arm, wrist]), arm_singular or wrist_singular))
+    if not candidates:
+        return []
+
+    q_all = _wrap(np.array([q for q, _ in candidates]))
+    with stage("verify"):
+        poses = fkine_batch(dh, q_all)
+        position_error = np.linalg.norm(poses[:, :3, 3] - target[:3, 3], axis=1)
+        rotation_error = np.linalg.norm(poses[:, :3, :3] - rotation, axis=(1, 2))
+        valid = (position_error < tol) & (rotation_error < tol)
+    return [
+        AnalyticSolution(q=q_all[i], singular=candidates[i][1], residual=float(position_error[i]))
+        for i in np.flatnonzero(valid)
+    ]
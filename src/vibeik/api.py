@@ -1,79 +1,225 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import copy_context
+from functools import partial
+import json
+import os
 from pathlib import Path
-
-import numpy as np
-
-from fastapi import FastAPI
-
-from .ik import solve_ik
-from .kinematics import make_transform, rotation_from_orientation
-from .nl_parse import parse_instruction
-from .resources import build_resource_index, load_robot, load_tool
-from .types import SolveRequest, SolveResponse
+from typing import Optional, Tuple, Union
+
+from fastapi import FastAPI, Header, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from .config import env_int
+from .formats import FORMAT_JSON, MEDIA_TYPES, META_HEADER, encode, envelope, negotiate
+from .ik import SOLVER_AUTO, available_solvers, check_solver
+from .ik_cache import clear_ik_cache, ik_cache_stats
+from .llm import close_async_client, get_async_client
+from .metrics import collect_timings, render_metrics, track_request
+from .parallel import shutdown_pool
+from .parse_cache import clear_parse_cache, parse_cache_stats
+from .pipeline import resolve_resources_async, solve_batch_async, solve_instruction, solve_instruction_async
+from .profiling import PROFILE_HEADER, run_profiled, should_profile
+from .resources import shared_resource_index
+from .streaming import StreamSolver, TargetLineParser, aiter_lines
+from .types import BatchSolveRequest, BatchSolveResponse, SolveRequest, SolveResponse
 
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 RESOURCES_DIR = BASE_DIR / "RobotResources"
-
-app = FastAPI(title="Vibe IK Assistant", version="0.1.0")
+RESOURCE_INDEX = shared_resource_index(RESOURCES_DIR)
+
+_IK_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def ik_executor() -> ThreadPoolExecutor:
+    """Bounded pool for CPU-bound IK so the event loop keeps serving other requests.
+
+    Sized by ``VIBEIK_IK_THREADS`` (default: CPU count).
+    """
+    global _IK_EXECUTOR
+    if _IK_EXECUTOR is None:
+        workers = env_int("VIBEIK_IK_THREADS", os.cpu_count() or 1)
+        _IK_EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vibeik-ik")
+    return _IK_EXECUTOR
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _IK_EXECUTOR
+    # Build the index once at startup; requests only pay for change detection.
+    RESOURCE_INDEX.current()
+    ik_executor()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        try:
+            get_async_client(api_key)
+        except ModuleNotFoundError:
+            pass
+    yield
+    await close_async_client()
+    if _IK_EXECUTOR is not None:
+        _IK_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        _IK_EXECUTOR = None
+    shutdown_pool()
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves ``receive`` to the request body still being read.
+
+    Starlette's default listens for client disconnects on ``receive`` while
+    streaming, which would swallow the body chunks the generator consumes.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+app = FastAPI(title="Vibe IK Assistant", version="0.1.0", lifespan=lifespan)
+
+
+def _negotiated(
+    response: Union[SolveResponse, BatchSolveResponse], accept: Optional[str], degrees: bool
+) -> Union[SolveResponse, BatchSolveResponse, Response]:
+    """Return ``response`` as JSON, or encoded in the binary format the client's Accept header prefers."""
+    fmt = negotiate(accept)
+    if fmt == FORMAT_JSON:
+        return response
+    return Response(
+        encode(response, fmt, degrees=degrees),
+        media_type=MEDIA_TYPES[fmt],
+        headers={META_HEADER: json.dumps(envelope(response))},
+    )
 
 
 @app.post("/solve", response_model=SolveResponse)
-async def solve(request: SolveRequest) -> SolveResponse:
-    index = build_resource_index(RESOURCES_DIR)
-    try:
-        parsed = parse_instruction(request.text)
-    except ValueError as exc:
-        return SolveResponse(ok=False, warnings=[str(exc)])
-
-    robot_match = index.match_robot(parsed.robot_model)
-    if not robot_match:
-        return SolveResponse(ok=False, warnings=[f"Unknown robot model: {parsed.robot_model}"])
-    robot_name, robot_path = robot_match
-
-    tool_match = index.match_tool(parsed.tool_name)
-    if not tool_match:
-        return SolveResponse(ok=False, warnings=[f"Unknown tool: {parsed.tool_name}"])
-    tool_name, tool_path = tool_match
-
-    try:
-        robot = load_robot(robot_path)
-        tool = load_tool(tool_path)
-    except ValueError as exc:
-        return SolveResponse(ok=False, warnings=[str(exc)])
-
-    rotation = rotation_from_orientation(parsed.orientation)
-    translation = [parsed.target.x, parsed.target.y, parsed.target.z]
-    target = make_transform(rotation, translation)
-
-    # Tool defines flange -> TCP, so remove it to get the flange target.
-    flange_target = target @ np.linalg.inv(tool.tcp)
-
-    ik_result = solve_ik(robot.dh, flange_target)
-    if not ik_result.ok:
-        return SolveResponse(
-            ok=False,
-            warnings=[ik_result.warning or "IK failed"],
-            meta={
-                "robot_model": robot_name,
-                "tool_name": tool_name,
-                "residual_error": ik_result.residual_error,
-                "solver": "ikine_LM",
-            },
-        )
-
-    joint_angles = ik_result.joint_angles.tolist() if ik_result.joint_angles is not None else []
-    joint_angles_deg = [float(angle * 180.0 / 3.141592653589793) for angle in joint_angles]
-    return SolveResponse(
-        ok=True,
-        joint_angles_rad=joint_angles,
-        joint_angles_deg=joint_angles_deg,
-        warnings=[],
-        meta={
-            "robot_model": robot_name,
-            "tool_name": tool_name,
-            "residual_error": ik_result.residual_error,
-            "solver": "ikine_LM",
-        },
+async def solve(
+    request: SolveRequest,
+    http_response: Response,
+    profile: Optional[str] = Header(None, alias=PROFILE_HEADER),
+    accept: Optional[str] = Header(None),
+    degrees: bool = False,
+) -> Union[SolveResponse, Response]:
+    profile_id = None
+    with track_request("solve") as tracked, collect_timings():
+        if should_profile(profile):
+            response, profile_id = await _solve_profiled(request)
+        else:
+            response = await solve_instruction_async(
+                request.text, RESOURCE_INDEX.current(), ik_executor(),
+                use_parse_cache=request.use_parse_cache, include_timings=request.include_timings,
+                solver=request.solver,
+            )
+        tracked.outcome = "ok" if response.ok else "failed"
+        response = _negotiated(response, accept, degrees)
+    if profile_id is not None:
+        # Binary formats return their own Response, which does not carry http_response's headers.
+        target = response if isinstance(response, Response) else http_response
+        target.headers[PROFILE_HEADER] = profile_id
+    return response
+
+
+async def _solve_profiled(request: SolveRequest) -> Tuple[SolveResponse, str]:
+    """Run the whole solve on one executor thread so a single profiler sees every stage.
+
+    Returns the response and the profile's file stem.
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(
+        run_profiled, "solve", solve_instruction, request.text, RESOURCE_INDEX.current(),
+        use_parse_cache=request.use_parse_cache, include_timings=request.include_timings, solver=request.solver,
     )
+    response, report = await loop.run_in_executor(ik_executor(), copy_context().run, call)
+    return response, report.pstats_path.stem
+
+
+@app.post("/solve/batch", response_model=BatchSolveResponse)
+async def solve_batch_route(
+    request: BatchSolveRequest, accept: Optional[str] = Header(None), degrees: bool = False
+) -> Union[BatchSolveResponse, Response]:
+    with track_request("solve_batch") as tracked:
+        response = await solve_batch_async(request, RESOURCE_INDEX.current(), ik_executor())
+        tracked.outcome = "ok" if response.ok else "failed"
+        response = _negotiated(response, accept, degrees)
+    return response
+
+
+@app.get("/solvers")
+async def solvers_route() -> dict:
+    return {"solvers": available_solvers()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_route() -> PlainTextResponse:
+    """Process metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/parse")
+async def parse_cache_stats_route() -> dict:
+    stats = parse_cache_stats()
+    if stats is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "memory_hits": stats.memory.hits,
+        "disk_hits": stats.disk_hits,
+        "misses": stats.disk_misses,
+        "size": stats.memory.size,
+        "hit_rate": stats.hit_rate,
+    }
+
+
+@app.delete("/cache/parse")
+async def clear_parse_cache_route() -> dict:
+    clear_parse_cache()
+    return {"ok": True}
+
+
+@app.get("/cache/ik")
+async def ik_cache_stats_route() -> dict:
+    stats = ik_cache_stats()
+    if stats is None:
+        return {"enabled": False}
+    return {"enabled": True, "hits": stats.hits, "misses": stats.misses, "size": stats.size,
+            "hit_rate": stats.hit_rate}
+
+
+@app.delete("/cache/ik")
+async def clear_ik_cache_route() -> dict:
+    clear_ik_cache()
+    return {"ok": True}
+
+
+@app.post("/solve/stream")
+async def solve_stream_route(
+    request: Request, robot_model: str, tool_name: str, solver: str = SOLVER_AUTO
+) -> StreamingResponse:
+    """Stream one NDJSON result line per target read from a CSV or NDJSON request body."""
+    content_type = request.headers.get("content-type", "")
+    input_format = "csv" if "csv" in content_type else "ndjson"
+
+    async def lines():
+        with track_request("solve_stream") as tracked:
+            executor = ik_executor()
+            try:
+                check_solver(solver)
+                resources = await resolve_resources_async(RESOURCE_INDEX.current(), robot_model, tool_name, executor)
+            except ValueError as exc:
+                tracked.outcome = "failed"
+                yield SolveResponse(ok=False, warnings=[str(exc)]).model_dump_json() + "\n"
+                return
+            loop = asyncio.get_running_loop()
+            parser = TargetLineParser(input_format)
+            stream = await loop.run_in_executor(executor, StreamSolver, resources, solver)
+            async for line in aiter_lines(request.stream()):
+                point = await loop.run_in_executor(executor, stream.feed, parser, line)
+                if point is not None:
+                    if not point.ok:
+                        tracked.outcome = "failed"
+                    yield point.model_dump_json() + "\n"
+
+    return _DuplexStreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+import numpy as np
+
+
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe bounded LRU map with hit/miss counters and an optional TTL (seconds)."""
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._expires: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            if key in self._data:
+                if self.ttl is not None and self._expires[key] <= time.monotonic():
+                    del self._data[key]
+                    del self._expires[key]
+                else:
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return self._data[key]
+            self._misses += 1
+            return None
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], V]) -> V:
+        value = self.get(key)
+        if value is not None:
+            return value
+        # Build outside the lock; a concurrent duplicate build is harmless.
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            self._expires.pop(key, None)
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses,
+                              size=len(self._data), maxsize=self.maxsize)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+
+def array_digest(array: np.ndarray) -> str:
+    """Return a content hash of an array (shape and float64 values)."""
+    contiguous = np.ascontiguousarray(array, dtype=np.float64)
+    digest = hashlib.sha1(repr(contiguous.shape).encode())
+    digest.update(contiguous.tobytes())
+    return digest.hexdigest()
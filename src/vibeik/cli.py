@@ -1,99 +1,245 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import io
 import json
 from pathlib import Path
+import sys
+from typing import TYPE_CHECKING, Iterable, List, Optional, TextIO, Union
 
-import numpy as np
+from . import daemon
 
-from .ik import solve_ik
-from .kinematics import make_transform, rotation_from_orientation
-from .nl_parse import parse_instruction
-from .resources import build_resource_index, load_robot, load_tool
-from .types import SolveResponse
-
-from dotenv import load_dotenv
-load_dotenv()
+if TYPE_CHECKING:
+    from .poses import PoseBatch
+    from .resources import LiveResourceIndex
+    from .types import BatchSolveResponse, BatchTarget, SolveResponse
 
+# The solver modules (numpy, pydantic) are imported inside the functions that
+# need them, so a call forwarded to the daemon stays a thin stdlib client.
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 RESOURCES_DIR = BASE_DIR / "RobotResources"
+# Mirror streaming.INPUT_FORMATS and formats.FORMATS without importing the solver.
+INPUT_FORMATS = ("csv", "ndjson")
+OUTPUT_FORMATS = ("json", "npy", "raw", "msgpack")
+
+
+def resource_index() -> LiveResourceIndex:
+    from .resources import shared_resource_index
+
+    return shared_resource_index(RESOURCES_DIR)
+
+
+def __getattr__(name: str):
+    if name == "RESOURCE_INDEX":
+        return resource_index()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def run(text: str, use_parse_cache: bool = True, include_timings: bool = False,
+        solver: str = "auto") -> SolveResponse:
+    from .metrics import collect_timings
+    from .pipeline import solve_instruction
+
+    with collect_timings():
+        return solve_instruction(text, resource_index().current(), use_parse_cache=use_parse_cache,
+                                 include_timings=include_timings, solver=solver)
+
+
+def run_batch(
+    robot_model: str,
+    tool_name: str,
+    targets: Union[List[BatchTarget], PoseBatch],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    solver: str = "auto",
+) -> BatchSolveResponse:
+    from .pipeline import solve_batch, solve_pose_batch
+    from .poses import PoseBatch
+    from .types import BatchSolveRequest
 
+    if isinstance(targets, PoseBatch):
+        return solve_pose_batch(robot_model, tool_name, targets, resource_index().current(),
+                                workers=workers, chunk_size=chunk_size, solver=solver)
+    request = BatchSolveRequest(
+        robot_model=robot_model, tool_name=tool_name, targets=targets, workers=workers, chunk_size=chunk_size,
+        solver=solver,
+    )
+    return solve_batch(request, resource_index().current())
+
+
+def run_stream(robot_model: str, tool_name: str, lines: Iterable[str], out: TextIO,
+               input_format: str = "csv", solver: str = "auto") -> bool:
+    """Solve targets from ``lines`` and write one NDJSON result per point as it is solved."""
+    from .ik import check_solver
+    from .pipeline import resolve_resources
+    from .streaming import stream_solve
+    from .types import SolveResponse
 
-def run(text: str) -> SolveResponse:
-    index = build_resource_index(RESOURCES_DIR)
     try:
-        parsed = parse_instruction(text)
+        check_solver(solver)
+        resources = resolve_resources(resource_index().current(), robot_model, tool_name)
     except ValueError as exc:
-        return SolveResponse(ok=False, warnings=[str(exc)])
-
-    robot_match = index.match_robot(parsed.robot_model)
-    if not robot_match:
-        return SolveResponse(ok=False, warnings=[f"Unknown robot model: {parsed.robot_model}"])
-    robot_name, robot_path = robot_match
+        out.write(SolveResponse(ok=False, warnings=[str(exc)]).model_dump_json() + "\n")
+        return False
+    all_ok = True
+    for point in stream_solve(resources, lines, input_format, solver):
+        all_ok = all_ok and point.ok
+        out.write(point.model_dump_json() + "\n")
+        out.flush()
+    return all_ok
+
+
+def _open_targets(path: Path) -> TextIO:
+    if str(path) == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return path.open(newline="")
+
+
+def _input_format(path: Path, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    return "ndjson" if path.suffix.lower() in (".ndjson", ".jsonl") else "csv"
+
+
+def _print_batch(response: dict) -> None:
+    if response["warnings"]:
+        print("Warning: " + "; ".join(response["warnings"]))
+    for i, result in enumerate(response["results"]):
+        if result["ok"]:
+            print(f"{i}: ok residual={result['residual_error']:.3g} q={result['joint_angles_rad']}")
+        else:
+            print(f"{i}: failed ({result['warning']})")
+
+
+def _print_solve(response: dict) -> None:
+    timings = response["meta"].get("timings_ms")
+    if timings:
+        print("Timings (ms): " + ", ".join(f"{stage}={ms:.2f}" for stage, ms in timings.items()))
+    if not response["ok"]:
+        print("Warning: " + "; ".join(response["warnings"]))
+        return
+    print("Joint angles (rad):", response["joint_angles_rad"])
+    print("Joint angles (deg):", response["joint_angles_deg"])
 
-    tool_match = index.match_tool(parsed.tool_name)
-    if not tool_match:
-        return SolveResponse(ok=False, warnings=[f"Unknown tool: {parsed.tool_name}"])
-    tool_name, tool_path = tool_match
 
+def _serve(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="vibeik serve", description="Run the resident Vibe IK solver daemon")
+    parser.add_argument("--socket", type=Path, help="Unix socket path (default: VIBEIK_SOCKET or a per-user path)")
+    args = parser.parse_args(argv)
     try:
-        robot = load_robot(robot_path)
-        tool = load_tool(tool_path)
+        daemon.serve(args.socket)
     except ValueError as exc:
-        return SolveResponse(ok=False, warnings=[str(exc)])
-
-    rotation = rotation_from_orientation(parsed.orientation)
-    translation = np.array([parsed.target.x, parsed.target.y, parsed.target.z])
-    target = make_transform(rotation, translation)
-
-    flange_target = target @ np.linalg.inv(tool.tcp)
-    ik_result = solve_ik(robot.dh, flange_target)
-    if not ik_result.ok:
-        return SolveResponse(
-            ok=False,
-            warnings=[ik_result.warning or "IK failed"],
-            meta={
-                "robot_model": robot_name,
-                "tool_name": tool_name,
-                "residual_error": ik_result.residual_error,
-                "solver": "ikine_LM",
-            },
-        )
-
-    joint_angles = ik_result.joint_angles.tolist() if ik_result.joint_angles is not None else []
-    joint_angles_deg = [float(angle * 180.0 / np.pi) for angle in joint_angles]
-    return SolveResponse(
-        ok=True,
-        joint_angles_rad=joint_angles,
-        joint_angles_deg=joint_angles_deg,
-        warnings=[],
-        meta={
-            "robot_model": robot_name,
-            "tool_name": tool_name,
-            "residual_error": ik_result.residual_error,
-            "solver": "ikine_LM",
-        },
-    )
+        parser.error(str(exc))
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Vibe IK Assistant CLI")
-    parser.add_argument("text", help="Natural language instruction")
-    parser.add_argument("--json", action="store_true", help="Emit JSON output")
-    args = parser.parse_args()
+def main(argv: Optional[List[str]] = None) -> None:
+    from dotenv import load_dotenv
 
-    response = run(args.text)
-    if args.json:
-        print(response.json())
+    load_dotenv()
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        _serve(argv[1:])
         return
-
-    if not response.ok:
-        print("Warning: " + "; ".join(response.warnings))
+    parser = argparse.ArgumentParser(description="Vibe IK Assistant CLI (run 'serve' to start the daemon)")
+    parser.add_argument("text", nargs="?", help="Natural language instruction")
+    parser.add_argument("--json", action="store_true", help="Emit JSON output")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS,
+                        help="Write results to stdout as JSON or a binary npy, raw or msgpack payload")
+    parser.add_argument("--degrees", action="store_true", help="Include joint angles in degrees in binary output")
+    parser.add_argument("--no-parse-cache", action="store_true", help="Always send the instruction to the LLM parser")
+    parser.add_argument("--targets", type=Path, help="CSV of target poses to solve as one batch ('-' for stdin with --stream)")
+    parser.add_argument("--robot", help="Robot model for --targets")
+    parser.add_argument("--tool", help="Tool name for --targets")
+    parser.add_argument("--workers", type=int, help="Worker processes for --targets (default: VIBEIK_WORKERS or 1)")
+    parser.add_argument("--chunk-size", type=int, help="Targets per worker task for --targets")
+    parser.add_argument("--stream", action="store_true", help="Solve --targets incrementally and write NDJSON to stdout")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, help="Format of --targets (default: from file suffix)")
+    parser.add_argument("--no-daemon", action="store_true", help="Solve in this process even if a daemon is running")
+    parser.add_argument("--timings", action="store_true", help="Report how long each solve stage took")
+    parser.add_argument("--solver", default="auto",
+                        help="IK backend: auto (default), analytic, numpy_lm or ikine_LM")
+    parser.add_argument("--profile", action="store_true",
+                        help="Solve in this process under cProfile and write pstats and collapsed stacks "
+                             "to VIBEIK_PROFILE_DIR")
+    args = parser.parse_args(argv)
+    if args.profile:
+        from .profiling import run_profiled
+
+        _, report = run_profiled("cli", _run_args, parser, args, use_daemon=False)
+        print(f"Profile written to {report.pstats_path} and {report.collapsed_path}", file=sys.stderr)
         return
-
-    print("Joint angles (rad):", response.joint_angles_rad)
-    print("Joint angles (deg):", response.joint_angles_deg)
+    _run_args(parser, args, use_daemon=not args.no_daemon)
+
+
+def _run_args(parser: argparse.ArgumentParser, args: argparse.Namespace, use_daemon: bool) -> None:
+    if args.targets:
+        if not (args.robot and args.tool):
+            parser.error("--targets requires --robot and --tool")
+        with _open_targets(args.targets) as handle:
+            if args.stream:
+                if args.format not in (None, "json"):
+                    parser.error("--stream always writes NDJSON; --format applies to single solves and batches")
+                input_format = _input_format(args.targets, args.input_format)
+                header = {"command": "stream", "robot_model": args.robot, "tool_name": args.tool,
+                          "input_format": input_format, "solver": args.solver}
+                if not use_daemon or daemon.stream(header, handle, sys.stdout) is None:
+                    run_stream(args.robot, args.tool, handle, sys.stdout, input_format, args.solver)
+                return
+            text = handle.read()
+        reply = None
+        if use_daemon:
+            reply = daemon.request({"command": "batch", "robot_model": args.robot, "tool_name": args.tool,
+                                    "targets_csv": text, "workers": args.workers, "chunk_size": args.chunk_size,
+                                    "solver": args.solver})
+        if reply is None:
+            from .poses import read_pose_csv
+
+            try:
+                targets = read_pose_csv(io.StringIO(text))
+            except ValueError as exc:
+                parser.error(str(exc))
+            reply = run_batch(args.robot, args.tool, targets, workers=args.workers,
+                              chunk_size=args.chunk_size, solver=args.solver).model_dump_json()
+        _emit(parser, reply, args, _print_batch, batch=True)
+        return
+    if not args.text:
+        parser.error("an instruction or --targets is required")
+
+    reply = None
+    if use_daemon:
+        reply = daemon.request({"command": "solve", "text": args.text, "use_parse_cache": not args.no_parse_cache,
+                                "include_timings": args.timings, "solver": args.solver})
+    if reply is None:
+        reply = run(args.text, use_parse_cache=not args.no_parse_cache,
+                    include_timings=args.timings, solver=args.solver).model_dump_json()
+    _emit(parser, reply, args, _print_solve, batch=False)
+
+
+def _emit(parser: argparse.ArgumentParser, reply: str, args: argparse.Namespace, printer, batch: bool) -> None:
+    payload = json.loads(reply)
+    if "error" in payload:
+        parser.error(payload["error"])
+    if args.format not in (None, "json"):
+        try:
+            data = _encode_reply(reply, args.format, args.degrees, batch)
+        except ValueError as exc:
+            parser.error(str(exc))
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    elif args.json or args.format == "json":
+        print(reply)
+    else:
+        printer(payload)
+
+
+def _encode_reply(reply: str, output_format: str, degrees: bool, batch: bool) -> bytes:
+    from .formats import encode
+    from .types import BatchSolveResponse, SolveResponse
+
+    response_type = BatchSolveResponse if batch else SolveResponse
+    return encode(response_type.model_validate_json(reply), output_format, degrees=degrees)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+
+_DISABLED = {"", "0", "off", "false", "none"}
+
+
+def cache_dir() -> Optional[Path]:
+    """Return the on-disk cache directory, or None when disk caching is disabled.
+
+    Controlled by ``VIBEIK_CACHE_DIR``; defaults to ``~/.cache/vibeik``.
+    """
+    value = os.getenv("VIBEIK_CACHE_DIR")
+    if value is None:
+        return Path.home() / ".cache" / "vibeik"
+    if value.strip().lower() in _DISABLED:
+        return None
+    return Path(value).expanduser()
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in _DISABLED
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from exc
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be a number, got {value!r}") from exc
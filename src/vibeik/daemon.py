@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+import signal
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+from typing import Iterable, Optional, TextIO
+
+
+CONNECT_TIMEOUT = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def socket_path() -> Path:
+    """``VIBEIK_SOCKET``, else ``vibeik.sock`` in ``$XDG_RUNTIME_DIR`` or a private per-user temp directory."""
+    configured = os.getenv("VIBEIK_SOCKET")
+    if configured:
+        return Path(configured).expanduser()
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "vibeik.sock"
+    return _fallback_dir() / "vibeik.sock"
+
+
+def _fallback_dir() -> Path:
+    return Path(tempfile.gettempdir()) / f"vibeik-{os.getuid()}"
+
+
+# Client side: stdlib only, so forwarding a call never imports numpy or pydantic.
+
+
+def _connect(path: Optional[Path]) -> Optional[socket.socket]:
+    path = path or socket_path()
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        # Someone else's socket could answer with anything; solve in-process instead.
+        logger.warning("Ignoring %s: not a socket owned by this user", path)
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def request(payload: dict, path: Optional[Path] = None) -> Optional[str]:
+    """Send one command and return the daemon's JSON reply, or None when no daemon is listening."""
+    sock = _connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as conn:
+        conn.write(json.dumps(payload).encode() + b"\n")
+        conn.flush()
+        reply = conn.readline()
+    if not reply:
+        raise ConnectionError("vibeik daemon closed the connection without replying")
+    return reply.decode().rstrip("\n")
+
+
+def stream(payload: dict, lines: Iterable[str], out: TextIO, path: Optional[Path] = None) -> Optional[bool]:
+    """Forward target lines to the daemon and copy its NDJSON results to ``out`` as they arrive.
+
+    Returns whether every point solved, or None when no daemon is listening
+    (in which case ``lines`` is left unread).
+    """
+    sock = _connect(path)
+    if sock is None:
+        return None
+
+    def _send() -> None:
+        try:
+            with sock.makefile("wb") as writer:
+                writer.write(json.dumps(payload).encode() + b"\n")
+                for line in lines:
+                    writer.write(line.rstrip("\r\n").encode() + b"\n")
+                writer.flush()
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    # Send from a thread so neither side blocks on a full socket buffer.
+    sender = threading.Thread(target=_send, daemon=True)
+    sender.start()
+    all_ok = True
+    with sock, sock.makefile("r", encoding="utf-8") as reader:
+        for line in reader:
+            all_ok = all_ok and bool(json.loads(line).get("ok"))
+            out.write(line)
+            out.flush()
+    sender.join()
+    return all_ok
+
+
+def ping(path: Optional[Path] = None) -> bool:
+    try:
+        return request({"command": "ping"}, path) is not None
+    except ConnectionError:
+        return False
+
+
+# Server side.
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            header = json.loads(line)
+            if header.get("command") == "stream":
+                self._stream(header)
+                return
+            reply = _dispatch(header)
+        except Exception as exc:
+            # Always answer; a dropped connection leaves the client with nothing to report.
+            if not isinstance(exc, (ValueError, KeyError, TypeError)):
+                logger.exception("vibeik daemon request failed")
+            reply = _error_reply(exc)
+        self.wfile.write(reply.encode() + b"\n")
+
+    def _stream(self, header: dict) -> None:
+        import io
+
+        from .cli import run_stream
+
+        lines = io.TextIOWrapper(self.rfile, encoding="utf-8", newline="")
+        out = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+        try:
+            run_stream(header["robot_model"], header["tool_name"], lines, out, header.get("input_format", "csv"),
+                       header.get("solver", "auto"))
+        finally:
+            lines.detach()
+            out.detach()
+
+
+def _error_reply(exc: BaseException) -> str:
+    return json.dumps({"ok": False, "error": str(exc) or type(exc).__name__})
+
+
+def _dispatch(header: dict) -> str:
+    import io
+
+    from .cli import run, run_batch
+    from .poses import read_pose_csv
+
+    command = header.get("command")
+    if command == "ping":
+        return json.dumps({"ok": True, "pid": os.getpid()})
+    if command == "solve":
+        return run(header["text"], use_parse_cache=header.get("use_parse_cache", True),
+                   include_timings=header.get("include_timings", False),
+                   solver=header.get("solver", "auto")).model_dump_json()
+    if command == "batch":
+        targets = read_pose_csv(io.StringIO(header["targets_csv"]))
+        return run_batch(header["robot_model"], header["tool_name"], targets,
+                         workers=header.get("workers"), chunk_size=header.get("chunk_size"),
+                         solver=header.get("solver", "auto")).model_dump_json()
+    raise ValueError(f"Unknown daemon command: {command}")
+
+
+class SolverDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves CLI calls from one warm process; each connection runs on its own thread."""
+
+    daemon_threads = True
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # Bind under a 0600 umask so the socket is never reachable by others, not even briefly.
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(path), _Handler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def start_daemon(path: Optional[Path] = None) -> SolverDaemon:
+    """Bind the daemon socket, replacing a stale socket file left by a dead daemon.
+
+    Anything at ``path`` other than a socket is left alone and refused.
+    """
+    path = path or socket_path()
+    if path.parent == _fallback_dir():
+        _private_dir(path.parent)
+    else:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        info = None
+    if info is not None:
+        if not stat.S_ISSOCK(info.st_mode):
+            raise ValueError(f"{path} exists and is not a socket; refusing to replace it")
+        if ping(path):
+            raise ValueError(f"A vibeik daemon is already listening on {path}")
+        path.unlink()
+    return SolverDaemon(path)
+
+
+def _private_dir(directory: Path) -> None:
+    # The shared temp dir is world writable: the directory must be ours and closed to others.
+    directory.mkdir(mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise ValueError(f"{directory} must be a directory owned by this user with mode 0700")
+
+
+def warm_caches() -> None:
+    """Build what the first solves would otherwise pay for.
+
+    That is every robot and tool in the compiled resource cache, each robot's
+    seed index and the reachability map of each robot+tool pair (as many as
+    the in-memory map cache holds). All of them persist to the cache
+    directory, so a restarted daemon mostly just loads them.
+    """
+    from .cli import resource_index
+    from .config import env_flag
+    from .reachability import MAP_CACHE_SIZE, reachability_map
+    from .resources import load_robot, load_tool
+    from .seeds import seed_index
+
+    index = resource_index().current()
+    robots = [robot for robot in (_load_or_none(load_robot, path) for path in index.robots.values()) if robot]
+    tools = [tool for tool in (_load_or_none(load_tool, path) for path in index.tools.values()) if tool]
+    if env_flag("VIBEIK_SEED_INDEX", True):
+        for robot in robots:
+            seed_index(robot.dh)
+    pairs = [(robot, tool) for robot in robots for tool in tools]
+    for robot, tool in pairs[:MAP_CACHE_SIZE]:
+        reachability_map(robot.dh, tool.tcp)
+
+
+def _load_or_none(load, path: Path):
+    try:
+        return load(path)
+    except ValueError:
+        return None
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def serve(path: Optional[Path] = None) -> None:
+    """Run the daemon until SIGINT or SIGTERM."""
+    server = start_daemon(path)
+    signal.signal(signal.SIGTERM, _interrupt)
+    threading.Thread(target=warm_caches, daemon=True).start()
+    print(f"vibeik daemon listening on {server.path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from importlib.util import find_spec
+import io
+from itertools import chain
+import struct
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from .types import BatchSolveResponse, SolveResponse
+
+
+FORMAT_JSON = "json"
+FORMAT_NPY = "npy"
+FORMAT_RAW = "raw"
+FORMAT_MSGPACK = "msgpack"
+FORMATS = (FORMAT_JSON, FORMAT_NPY, FORMAT_RAW, FORMAT_MSGPACK)
+
+MEDIA_TYPES = {
+    FORMAT_JSON: "application/json",
+    FORMAT_NPY: "application/x-npy",
+    FORMAT_RAW: "application/octet-stream",
+    FORMAT_MSGPACK: "application/msgpack",
+}
+_MEDIA_FORMATS = {media: fmt for fmt, media in MEDIA_TYPES.items()}
+_MEDIA_FORMATS.update({"application/x-msgpack": FORMAT_MSGPACK, "application/vnd.msgpack": FORMAT_MSGPACK})
+
+# Response header carrying ok, warnings and meta for the npy and raw formats.
+META_HEADER = "X-Vibeik-Meta"
+
+# magic, rows, joints, flags; followed by packed little-endian records (see :func:`records`).
+RAW_MAGIC = b"VIK1"
+RAW_HEADER = struct.Struct("<4sIHH")
+RAW_FLAG_DEGREES = 1
+
+AnyResponse = Union[SolveResponse, BatchSolveResponse]
+
+
+def msgpack_available() -> bool:
+    return find_spec("msgpack") is not None
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick the response format for an ``Accept`` header; JSON unless a binary type is preferred.
+
+    Highest ``q`` wins, then the first listed. MessagePack is only offered when
+    the ``msgpack`` package is installed.
+    """
+    if not accept:
+        return FORMAT_JSON
+    candidates = []
+    for position, item in enumerate(accept.split(",")):
+        media, *params = (part.strip() for part in item.split(";"))
+        fmt = _MEDIA_FORMATS.get(media.lower())
+        if fmt is None or (fmt == FORMAT_MSGPACK and not msgpack_available()):
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, fmt))
+    return min(candidates)[2] if candidates else FORMAT_JSON
+
+
+def _rows(response: AnyResponse):
+    if isinstance(response, BatchSolveResponse):
+        return [(point.ok, point.joint_angles_rad, point.residual_error) for point in response.results]
+    return [(response.ok, response.joint_angles_rad, response.meta.residual_error)]
+
+
+def records(response: AnyResponse, degrees: bool = False) -> np.ndarray:
+    """One packed little-endian record per target: ``ok`` (u1), ``residual_error`` (f8) and
+    ``joint_angles_rad`` (f8 x joints), plus ``joint_angles_deg`` when ``degrees``.
+
+    Failed targets have NaN angles; an unknown residual is NaN.
+    """
+    rows = _rows(response)
+    joints = max((len(angles) for _, angles, _ in rows if angles), default=0)
+    fields = [("ok", "u1"), ("residual_error", "<f8"), ("joint_angles_rad", "<f8", (joints,))]
+    if degrees:
+        fields.append(("joint_angles_deg", "<f8", (joints,)))
+    table = np.zeros(len(rows), dtype=fields)
+    table["ok"] = [ok for ok, _, _ in rows]
+    table["residual_error"] = [np.nan if residual is None else residual for _, _, residual in rows]
+    angles = np.full((len(rows), joints), np.nan)
+    solved = [i for i, (_, row_angles, _) in enumerate(rows) if row_angles]
+    if solved:
+        # One flat pass over the nested lists; np.array on them is about twice as slow.
+        flat = chain.from_iterable(rows[i][1] for i in solved)
+        angles[solved] = np.fromiter(flat, dtype=float, count=len(solved) * joints).reshape(-1, joints)
+    table["joint_angles_rad"] = angles
+    if degrees:
+        table["joint_angles_deg"] = np.degrees(table["joint_angles_rad"])
+    return table
+
+
+def envelope(response: AnyResponse) -> dict:
+    """The non-array part of a response: ok, warnings and meta (without the raw LLM reply)."""
+    return {
+        "ok": response.ok,
+        "warnings": response.warnings,
+        "meta": response.meta.model_dump(exclude_none=True, exclude={"raw"}),
+    }
+
+
+def encode(response: AnyResponse, fmt: str, degrees: bool = False) -> bytes:
+    """Serialize ``response`` as ``npy``, ``raw`` or ``msgpack``; degrees only when asked for."""
+    if fmt == FORMAT_JSON:
+        return response.model_dump_json().encode()
+    table = records(response, degrees)
+    if fmt == FORMAT_NPY:
+        buffer = io.BytesIO()
+        np.save(buffer, table, allow_pickle=False)
+        return buffer.getvalue()
+    if fmt == FORMAT_RAW:
+        joints = table.dtype["joint_angles_rad"].shape[0]
+        header = RAW_HEADER.pack(RAW_MAGIC, len(table), joints, RAW_FLAG_DEGREES if degrees else 0)
+        return header + table.tobytes()
+    if fmt == FORMAT_MSGPACK:
+        if not msgpack_available():
+            raise ValueError("MessagePack output needs the msgpack package (pip install msgpack)")
+        import msgpack
+
+        payload = envelope(response)
+        payload.update(
+            joints=table.dtype["joint_angles_rad"].shape[0],
+            point_ok=table["ok"].astype(bool).tolist(),
+            residual_error=table["residual_error"].tobytes(),
+            joint_angles_rad=table["joint_angles_rad"].tobytes(),
+        )
+        if degrees:
+            payload["joint_angles_deg"] = table["joint_angles_deg"].tobytes()
+        if isinstance(response, BatchSolveResponse):
+            payload["point_warnings"] = [point.warning for point in response.results]
+        return msgpack.packb(payload, use_bin_type=True)
+    raise ValueError(f"Unknown output format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+
+def read_raw(data: bytes) -> Tuple[np.ndarray, bool]:
+    """Parse a ``raw`` payload back into its records and whether it carries degrees."""
+    magic, count, joints, flags = RAW_HEADER.unpack_from(data)
+    if magic != RAW_MAGIC:
+        raise ValueError("Not a vibeik raw payload")
+    degrees = bool(flags & RAW_FLAG_DEGREES)
+    fields = [("ok", "u1"), ("residual_error", "<f8"), ("joint_angles_rad", "<f8", (joints,))]
+    if degrees:
+        fields.append(("joint_angles_deg", "<f8", (joints,)))
+    return np.frombuffer(data, dtype=fields, count=count, offset=RAW_HEADER.size), degrees
@@ -1,10 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 import numpy as np
 
+from .analytic_ik import SphericalWristGeometry, solve_spherical_wrist, spherical_wrist_geometry
+from .cache import CacheStats, LRUCache, array_digest
+from .config import env_flag
+from .ik_cache import clear_ik_cache, ik_cache
+from .kinematics import fkine_jacobian, singularity_measure
+from .lm_solver import lm_solver
+from .metrics import stage
+from .seeds import seed_index
+
+
+SOLVER_AUTO = "auto"
+SOLVER_ANALYTIC = "analytic"
+SOLVER_NUMPY_LM = "numpy_lm"
+SOLVER_LM = "ikine_LM"
+SEED_CANDIDATES = 4
+RESIDUAL_TOLERANCE = 1e-3
+# On singularity_measure, which tracks 1 / cond(J); matches the former cond(J) > 1e6 check.
+SINGULARITY_TOLERANCE = 1e-6
+
 
 @dataclass(frozen=True)
 class IKResult:
@@ -12,6 +31,10 @@ class IKResult:
     joint_angles: Optional[np.ndarray]
     residual_error: Optional[float]
     warning: Optional[str]
+    solver: Optional[str] = None
+    solutions: Optional[np.ndarray] = None
+    iterations: Optional[int] = None
+    cache_hit: bool = False
 
 
 def _build_robot_from_dh(dh: np.ndarray):
@@ -23,35 +46,220 @@ def _build_robot_from_dh(dh: np.ndarray):
     return rtb.DHRobot(links, name="Robot")
 
 
-def solve_ik(dh: np.ndarray, target: np.ndarray) -> IKResult:
-    major_version = int(np.__version__.split(".")[0])
-    if major_version >= 2:
+MODEL_CACHE_SIZE = 16
+_MODEL_CACHE: LRUCache = LRUCache(maxsize=MODEL_CACHE_SIZE)
+
+
+def get_robot_model(dh: np.ndarray):
+    """Return a cached DHRobot for ``dh``, building it on first use."""
+    key = array_digest(dh)
+    return _MODEL_CACHE.get_or_create(key, lambda: _build_robot_from_dh(dh))
+
+
+def invalidate_model_cache(dh: Optional[np.ndarray] = None) -> None:
+    """Drop the cached model for ``dh``, or every cached model when omitted."""
+    if dh is None:
+        _MODEL_CACHE.clear()
+        return
+    _MODEL_CACHE.invalidate(array_digest(dh))
+
+
+def model_cache_stats() -> CacheStats:
+    return _MODEL_CACHE.stats()
+
+
+SolverBackend = Callable[[np.ndarray, np.ndarray, Optional[np.ndarray]], IKResult]
+_BACKENDS: Dict[str, SolverBackend] = {}
+
+
+def register_solver(name: str, backend: SolverBackend) -> None:
+    """Make ``backend(dh, target, q0) -> IKResult`` selectable as ``solver=name``.
+
+    Sharded batches solve in worker processes, which only see backends
+    registered at import time of a module they load.
+    """
+    if name == SOLVER_AUTO:
+        raise ValueError(f"{SOLVER_AUTO!r} is reserved for automatic solver selection")
+    _BACKENDS[name] = backend
+    # Cached results may come from a backend this name used to refer to.
+    clear_ik_cache()
+
+
+def available_solvers() -> List[str]:
+    return [SOLVER_AUTO, *_BACKENDS]
+
+
+def check_solver(name: str) -> str:
+    """Return ``name`` if it is a registered solver (or ``auto``), else raise ValueError."""
+    if name != SOLVER_AUTO and name not in _BACKENDS:
+        raise ValueError(f"Unknown IK solver: {name} (available: {', '.join(available_solvers())})")
+    return name
+
+
+def solve_ik(
+    dh: np.ndarray,
+    target: np.ndarray,
+    solver: str = SOLVER_AUTO,
+    q0: Optional[np.ndarray] = None,
+    use_cache: bool = True,
+) -> IKResult:
+    """Solve IK for the flange ``target`` with a registered backend.
+
+    ``solver="auto"`` uses the closed-form spherical-wrist solver when the DH
+    table conforms and the NumPy LM solver otherwise. ``q0`` seeds the
+    iterative solvers and picks the closest analytic branch. Repeated
+    (robot, solver, target, seed) combinations are answered from the IK result
+    cache and flagged with ``cache_hit``.
+    """
+    check_solver(solver)
+    cache = ik_cache() if use_cache else None
+    if cache is None:
+        return _solve_uncached(dh, target, solver, q0)
+    key = cache.key(dh, solver, target, q0)
+    cached = cache.get(key)
+    if cached is not None:
+        return replace(cached, cache_hit=True)
+    result = _solve_uncached(dh, target, solver, q0)
+    cache.put(key, result)
+    return result
+
+
+def _solve_uncached(dh: np.ndarray, target: np.ndarray, solver: str, q0: Optional[np.ndarray]) -> IKResult:
+    if solver == SOLVER_AUTO:
+        geometry = spherical_wrist_geometry(dh)
+        if geometry is not None:
+            return _solve_analytic(geometry, target, q0)
+        solver = SOLVER_NUMPY_LM
+    return _BACKENDS[solver](dh, target, q0)
+
+
+def solve_targets(
+    dh: np.ndarray,
+    targets: Iterable[np.ndarray],
+    q0: Optional[np.ndarray] = None,
+    solver: str = SOLVER_AUTO,
+) -> List[IKResult]:
+    """Solve flange targets in order, seeding each from the last good solution."""
+    results = []
+    seed = q0
+    for target in targets:
+        result = solve_ik(dh, target, solver=solver, q0=seed)
+        if result.ok:
+            seed = result.joint_angles
+        results.append(result)
+    return results
+
+
+def _analytic_backend(dh: np.ndarray, target: np.ndarray, q0: Optional[np.ndarray]) -> IKResult:
+    geometry = spherical_wrist_geometry(dh)
+    if geometry is None:
+        return IKResult(
+            ok=False,
+            joint_angles=None,
+            residual_error=None,
+            warning="Robot kinematics do not have a spherical wrist",
+            solver=SOLVER_ANALYTIC,
+        )
+    return _solve_analytic(geometry, target, q0)
+
+
+def _solve_analytic(geometry: SphericalWristGeometry, target: np.ndarray, q0: Optional[np.ndarray]) -> IKResult:
+    solutions = solve_spherical_wrist(geometry, target)
+    if not solutions:
+        return IKResult(ok=False, joint_angles=None, residual_error=None,
+                        warning="Target unreachable or residual too large", solver=SOLVER_ANALYTIC)
+
+    seed = np.zeros(6) if q0 is None else np.asarray(q0, dtype=float)
+    distance = [np.linalg.norm((s.q - seed + np.pi) % (2 * np.pi) - np.pi) for s in solutions]
+    ordered = [solutions[i] for i in np.argsort(distance)]
+    all_q = np.array([s.q for s in ordered])
+    regular = [s for s in ordered if not s.singular]
+    chosen = regular[0] if regular else ordered[0]
+    # solve_spherical_wrist already verified every branch with one batched FK pass.
+    residual = chosen.residual
+    if not regular:
+        return IKResult(ok=False, joint_angles=None, residual_error=residual,
+                        warning="Solution near singularity", solver=SOLVER_ANALYTIC, solutions=all_q)
+    return IKResult(ok=True, joint_angles=chosen.q, residual_error=residual, warning=None,
+                    solver=SOLVER_ANALYTIC, solutions=all_q)
+
+
+def _lm_seeds(dh: np.ndarray, target: np.ndarray, q0: Optional[np.ndarray]) -> Iterator[np.ndarray]:
+    """Seeds to try in order: the caller's q0, then the nearest workspace samples.
+
+    Lazy, so a q0 that converges never queries the seed index.
+    """
+    if q0 is not None:
+        yield np.asarray(q0, dtype=float)
+    if env_flag("VIBEIK_SEED_INDEX", True):
+        yield from seed_index(dh).nearest(target, k=SEED_CANDIDATES)
+    elif q0 is None:
+        yield np.zeros(dh.shape[0])
+
+
+def lm_available() -> bool:
+    """roboticstoolbox-python does not work with NumPy 2.x."""
+    return int(np.__version__.split(".")[0]) < 2
+
+
+def _solve_lm(dh: np.ndarray, target: np.ndarray, q0: Optional[np.ndarray]) -> IKResult:
+    if not lm_available():
         return IKResult(
             ok=False,
             joint_angles=None,
             residual_error=None,
             warning="roboticstoolbox-python is incompatible with NumPy 2.x in this environment",
+            solver=SOLVER_LM,
         )
     from spatialmath import SE3
 
-    robot = _build_robot_from_dh(dh)
+    robot = get_robot_model(dh)
     target_se3 = SE3(target)
-    q0 = np.zeros(robot.n)
-    solution = robot.ikine_LM(target_se3, q0=q0)
-    success = getattr(solution, "success", False)
-    q = getattr(solution, "q", None)
+    iterations = 0
+    for seed in _lm_seeds(dh, target, q0):
+        solution = robot.ikine_LM(target_se3, q0=seed)
+        iterations += int(getattr(solution, "iterations", 0) or 0)
+        success = getattr(solution, "success", False)
+        q = getattr(solution, "q", None)
+        if success and q is not None:
+            break
     if not success or q is None:
-        return IKResult(ok=False, joint_angles=None, residual_error=None, warning="IK solver failed")
+        return IKResult(ok=False, joint_angles=None, residual_error=None, warning="IK solver failed",
+                        solver=SOLVER_LM, iterations=iterations)
+    return _verified(dh, target, np.asarray(q, dtype=float), SOLVER_LM, iterations)
+
+
+def _solve_numpy_lm(dh: np.ndarray, target: np.ndarray, q0: Optional[np.ndarray]) -> IKResult:
+    solver = lm_solver(dh)
+    iterations = 0
+    for seed in _lm_seeds(dh, target, q0):
+        solution = solver.solve(target, seed)
+        iterations += solution.iterations
+        if solution.success:
+            break
+    if not solution.success:
+        return IKResult(ok=False, joint_angles=None, residual_error=None, warning="IK solver failed",
+                        solver=SOLVER_NUMPY_LM, iterations=iterations)
+    return _verified(dh, target, solution.q, SOLVER_NUMPY_LM, iterations)
+
 
-    fk = robot.fkine(q)
-    position_error = np.linalg.norm(fk.t - target_se3.t)
-    residual = float(position_error)
-    if residual > 1e-3:
-        return IKResult(ok=False, joint_angles=None, residual_error=residual, warning="Target unreachable or residual too large")
+def _verified(dh: np.ndarray, target: np.ndarray, q: np.ndarray, solver: str, iterations: int) -> IKResult:
+    """Check an iterative solution's residual and distance from singularity."""
+    with stage("verify"):
+        # One pass over the link transforms instead of fkine, jacob0 and an SVD for cond.
+        pose, jacobian = fkine_jacobian(dh, q)
+        residual = float(np.linalg.norm(pose[:3, 3] - target[:3, 3]))
+        measure = float(singularity_measure(jacobian))
+    if residual > RESIDUAL_TOLERANCE:
+        return IKResult(ok=False, joint_angles=None, residual_error=residual,
+                        warning="Target unreachable or residual too large", solver=solver, iterations=iterations)
+    if measure < SINGULARITY_TOLERANCE:
+        return IKResult(ok=False, joint_angles=None, residual_error=residual,
+                        warning="Solution near singularity", solver=solver, iterations=iterations)
+    return IKResult(ok=True, joint_angles=q, residual_error=residual, warning=None, solver=solver,
+                    iterations=iterations)
 
-    jacobian = robot.jacob0(q)
-    condition = np.linalg.cond(jacobian)
-    if condition > 1e6:
-        return IKResult(ok=False, joint_angles=None, residual_error=residual, warning="Solution near singularity")
 
-    return IKResult(ok=True, joint_angles=q, residual_error=residual, warning=None)
+register_solver(SOLVER_ANALYTIC, _analytic_backend)
+register_solver(SOLVER_NUMPY_LM, _solve_numpy_lm)
+register_solver(SOLVER_LM, _solve_lm)
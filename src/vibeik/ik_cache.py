@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from dataclasses import replace
+import threading
+from typing import TYPE_CHECKING, Hashable, Optional
+
+import numpy as np
+
+from .cache import CacheStats, LRUCache, array_digest
+from .config import env_flag, env_float, env_int
+
+if TYPE_CHECKING:
+    from .ik import IKResult
+
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_POSITION_TOLERANCE = 1e-6
+DEFAULT_ANGLE_TOLERANCE = 1e-6
+
+
+class IKResultCache:
+    """Bounded LRU of IK results keyed by robot, solver, quantized flange target and seed.
+
+    Positions are quantized to ``position_tolerance`` metres, and rotation
+    matrix entries and seed angles to ``angle_tolerance`` (roughly radians),
+    so poses that agree to within the tolerances share an entry.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttl: Optional[float] = None,
+        position_tolerance: float = DEFAULT_POSITION_TOLERANCE,
+        angle_tolerance: float = DEFAULT_ANGLE_TOLERANCE,
+    ) -> None:
+        if position_tolerance <= 0 or angle_tolerance <= 0:
+            raise ValueError("IK cache tolerances must be positive")
+        self.position_tolerance = position_tolerance
+        self.angle_tolerance = angle_tolerance
+        self._results: LRUCache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def key(self, dh: np.ndarray, solver: str, target: np.ndarray, q0: Optional[np.ndarray]) -> Hashable:
+        values = [target[:3, 3] / self.position_tolerance, target[:3, :3].ravel() / self.angle_tolerance]
+        if q0 is not None:
+            values.append(np.asarray(q0, dtype=float) / self.angle_tolerance)
+        quantized = np.rint(np.concatenate(values)).astype(np.int64)
+        return array_digest(dh), solver, q0 is None, quantized.tobytes()
+
+    def get(self, key: Hashable) -> Optional["IKResult"]:
+        return self._results.get(key)
+
+    def put(self, key: Hashable, result: "IKResult") -> None:
+        # Hits hand the stored arrays to every caller, so keep read-only copies.
+        self._results.put(key, replace(
+            result, joint_angles=_read_only(result.joint_angles), solutions=_read_only(result.solutions),
+        ))
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def stats(self) -> CacheStats:
+        return self._results.stats()
+
+
+def _read_only(values: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if values is None:
+        return None
+    values = np.array(values, dtype=float)
+    values.setflags(write=False)
+    return values
+
+
+_CACHE: Optional[IKResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def ik_cache() -> Optional[IKResultCache]:
+    """Return the process-wide IK result cache, or None when ``VIBEIK_IK_CACHE=0``.
+
+    ``VIBEIK_IK_CACHE_SIZE``, ``VIBEIK_IK_CACHE_TTL`` (seconds, default: no
+    expiry), ``VIBEIK_IK_CACHE_POSITION_TOL`` and ``VIBEIK_IK_CACHE_ANGLE_TOL``
+    are read when the cache is created, i.e. on first use and after
+    :func:`reset_ik_cache`.
+    """
+    global _CACHE
+    if not env_flag("VIBEIK_IK_CACHE", True):
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                ttl = env_float("VIBEIK_IK_CACHE_TTL", 0.0)
+                _CACHE = IKResultCache(
+                    maxsize=env_int("VIBEIK_IK_CACHE_SIZE", DEFAULT_MAXSIZE),
+                    ttl=ttl if ttl > 0 else None,
+                    position_tolerance=env_float("VIBEIK_IK_CACHE_POSITION_TOL", DEFAULT_POSITION_TOLERANCE),
+                    angle_tolerance=env_float("VIBEIK_IK_CACHE_ANGLE_TOL", DEFAULT_ANGLE_TOLERANCE),
+                )
+    return _CACHE
+
+
+def clear_ik_cache() -> None:
+    if _CACHE is not None:
+        _CACHE.clear()
+
+
+def reset_ik_cache() -> None:
+    """Drop the cache so the next lookup re-reads its settings from the environment."""
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = None
+
+
+def ik_cache_stats() -> Optional[CacheStats]:
+    cache = ik_cache()
+    return cache.stats() if cache is not None else None
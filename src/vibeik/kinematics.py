@@ -29,8 +29,7 @@ def rotation_from_orientation(orientation: Orientation | None) -> np.ndarray:
     if orientation is None:
         return default_rotation()
     if orientation.quaternion:
-        q = orientation.quaternion
-        w, x, y, z = q
+        w, x, y, z = np.asarray(orientation.quaternion, dtype=float) / np.linalg.norm(orientation.quaternion)
         return np.array(
             [
                 [1 - 2 * (y**2 + z**2), 2 * (x * y - z * w), 2 * (x * z + y * w)],
@@ -53,3 +52,166 @@ def rotation_from_orientation(orientation: Orientation | None) -> np.ndarray:
             ]
         )
     return default_rotation()
+
+
+def rotations_from_quaternions(quaternions: np.ndarray) -> np.ndarray:
+    """``(N, 4)`` ``w, x, y, z`` quaternions to ``(N, 3, 3)`` rotations, as :func:`rotation_from_orientation`.
+
+    Quaternions are normalized first; a zero quaternion raises ValueError.
+    """
+    quaternions = np.asarray(quaternions, dtype=float)
+    norms = np.linalg.norm(quaternions, axis=1, keepdims=True)
+    if (norms == 0).any():
+        raise ValueError("Quaternion orientations must be non-zero")
+    w, x, y, z = (quaternions / norms).T
+    rotations = np.empty((len(w), 3, 3))
+    rotations[:, 0, 0] = 1 - 2 * (y**2 + z**2)
+    rotations[:, 0, 1] = 2 * (x * y - z * w)
+    rotations[:, 0, 2] = 2 * (x * z + y * w)
+    rotations[:, 1, 0] = 2 * (x * y + z * w)
+    rotations[:, 1, 1] = 1 - 2 * (x**2 + z**2)
+    rotations[:, 1, 2] = 2 * (y * z - x * w)
+    rotations[:, 2, 0] = 2 * (x * z - y * w)
+    rotations[:, 2, 1] = 2 * (y * z + x * w)
+    rotations[:, 2, 2] = 1 - 2 * (x**2 + y**2)
+    return rotations
+
+
+def rotations_from_rpy(rpy: np.ndarray) -> np.ndarray:
+    """``(N, 3)`` roll, pitch, yaw angles to ``(N, 3, 3)`` rotations ``Rz(yaw) Ry(pitch) Rx(roll)``."""
+    angles = np.asarray(rpy, dtype=float).T
+    cr, cp, cy = np.cos(angles)
+    sr, sp, sy = np.sin(angles)
+    rotations = np.empty((angles.shape[1], 3, 3))
+    rotations[:, 0, 0] = cy * cp
+    rotations[:, 0, 1] = cy * sp * sr - sy * cr
+    rotations[:, 0, 2] = cy * sp * cr + sy * sr
+    rotations[:, 1, 0] = sy * cp
+    rotations[:, 1, 1] = sy * sp * sr + cy * cr
+    rotations[:, 1, 2] = sy * sp * cr - cy * sr
+    rotations[:, 2, 0] = -sp
+    rotations[:, 2, 1] = cp * sr
+    rotations[:, 2, 2] = cp * cr
+    return rotations
+
+
+def make_transforms(rotations: np.ndarray, translations: np.ndarray) -> np.ndarray:
+    """Stack ``(N, 3, 3)`` rotations and ``(N, 3)`` translations into ``(N, 4, 4)`` transforms."""
+    transforms = np.zeros((len(rotations), 4, 4))
+    transforms[:, :3, :3] = rotations
+    transforms[:, :3, 3] = translations
+    transforms[:, 3, 3] = 1.0
+    return transforms
+
+
+def dh_link_transforms(dh: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Return standard-DH link transforms for a batch of joint vectors.
+
+    ``dh`` rows are ``(alpha, a, theta_offset, d)`` as loaded from the robot
+    ``.m`` files; ``q`` is ``(N, n)``. The result is ``(N, n, 4, 4)`` with
+    ``T_i = Rz(q_i + theta_i) Tz(d_i) Tx(a_i) Rx(alpha_i)``.
+    """
+    q = np.atleast_2d(np.asarray(q, dtype=float))
+    alpha, a, offset, d = (dh[:, i] for i in range(4))
+    theta = q + offset
+    ct = np.cos(theta)
+    st = np.sin(theta)
+    ca = np.cos(alpha)
+    sa = np.sin(alpha)
+    links = np.zeros(q.shape + (4, 4))
+    links[..., 0, 0] = ct
+    links[..., 0, 1] = -st * ca
+    links[..., 0, 2] = st * sa
+    links[..., 0, 3] = a * ct
+    links[..., 1, 0] = st
+    links[..., 1, 1] = ct * ca
+    links[..., 1, 2] = -ct * sa
+    links[..., 1, 3] = a * st
+    links[..., 2, 1] = sa
+    links[..., 2, 2] = ca
+    links[..., 2, 3] = d
+    links[..., 3, 3] = 1.0
+    return links
+
+
+def fkine_batch(dh: np.ndarray, q: np.ndarray, tool: np.ndarray | None = None) -> np.ndarray:
+    """Forward kinematics for ``(N, n)`` joint vectors.
+
+    Returns ``(N, 4, 4)`` flange poses, or TCP poses when the 4x4 flange->TCP
+    ``tool`` transform is given.
+    """
+    links = dh_link_transforms(dh, q)
+    pose = links[:, 0]
+    for i in range(1, links.shape[1]):
+        pose = pose @ links[:, i]
+    if tool is not None:
+        pose = pose @ tool
+    return pose
+
+
+def fkine(dh: np.ndarray, q: np.ndarray, tool: np.ndarray | None = None) -> np.ndarray:
+    """Single-configuration convenience wrapper around :func:`fkine_batch`."""
+    return fkine_batch(dh, np.asarray(q, dtype=float)[None, :], tool)[0]
+
+
+def fkine_jacobian_batch(
+    dh: np.ndarray, q: np.ndarray, tool: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Poses and base-frame geometric Jacobians for ``(N, n)`` joint vectors in one pass.
+
+    Returns ``(N, 4, 4)`` poses and ``(N, 6, n)`` Jacobians (linear rows
+    first, as ``jacob0``) of the flange, or of the TCP when ``tool`` is given.
+    Both come from the same chain of link transforms.
+    """
+    links = dh_link_transforms(dh, q)
+    count, joints = links.shape[:2]
+    # Joint i turns about z of frame i-1; frame -1 is the base.
+    axes = np.empty((count, joints, 3))
+    origins = np.empty((count, joints, 3))
+    axes[:, 0] = (0.0, 0.0, 1.0)
+    origins[:, 0] = 0.0
+    pose = links[:, 0]
+    for i in range(1, joints):
+        axes[:, i] = pose[:, :3, 2]
+        origins[:, i] = pose[:, :3, 3]
+        pose = pose @ links[:, i]
+    if tool is not None:
+        pose = pose @ tool
+    lever = pose[:, None, :3, 3] - origins
+    jacobian = np.empty((count, 6, joints))
+    # z x r written out; np.cross costs more than the rest of the routine for small N.
+    jacobian[:, 0] = axes[..., 1] * lever[..., 2] - axes[..., 2] * lever[..., 1]
+    jacobian[:, 1] = axes[..., 2] * lever[..., 0] - axes[..., 0] * lever[..., 2]
+    jacobian[:, 2] = axes[..., 0] * lever[..., 1] - axes[..., 1] * lever[..., 0]
+    jacobian[:, 3:] = axes.transpose(0, 2, 1)
+    return pose, jacobian
+
+
+def fkine_jacobian(
+    dh: np.ndarray, q: np.ndarray, tool: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Single-configuration wrapper around :func:`fkine_jacobian_batch`."""
+    poses, jacobians = fkine_jacobian_batch(dh, np.asarray(q, dtype=float)[None, :], tool)
+    return poses[0], jacobians[0]
+
+
+def singularity_measure(jacobian: np.ndarray) -> np.ndarray:
+    """Normalized manipulability of ``(..., 6, n)`` Jacobians: 1 is isotropic, 0 singular.
+
+    The volume ``|det J|`` (the Gram determinant's root when J is not square)
+    over the product of the column norms, which bounds it by Hadamard's
+    inequality. It needs no SVD and does not depend on how long the links are.
+    Near a singularity it tracks ``1 / cond(J)`` to within a small factor.
+    """
+    jacobian = np.asarray(jacobian, dtype=float)
+    rows, cols = jacobian.shape[-2:]
+    transposed = np.swapaxes(jacobian, -1, -2)
+    if rows == cols:
+        volume = np.abs(np.linalg.det(jacobian))
+    else:
+        gram = transposed @ jacobian if cols < rows else jacobian @ transposed
+        volume = np.sqrt(np.clip(np.linalg.det(gram), 0.0, None))
+    # Columns span the joint space when n <= 6, rows the task space otherwise.
+    squares = np.square(jacobian).sum(axis=-2 if cols <= rows else -1)
+    norms = np.sqrt(np.prod(squares, axis=-1))
+    return np.divide(volume, norms, out=np.zeros_like(volume), where=norms > 0)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from .config import env_float, env_int
+
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_CONNECTIONS = 20
+
+_CLIENT: Any = None
+_ASYNC_CLIENT: Any = None
+_LOCK = threading.Lock()
+
+
+def llm_timeout() -> float:
+    return env_float("VIBEIK_LLM_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def _limits():
+    import httpx
+
+    connections = env_int("VIBEIK_LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)
+    return httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+
+
+def get_client(api_key: str):
+    """Return the shared synchronous OpenAI client, creating it on first use."""
+    global _CLIENT
+    from openai import DefaultHttpxClient, OpenAI
+
+    with _LOCK:
+        if _CLIENT is None or _CLIENT.api_key != api_key:
+            _CLIENT = OpenAI(
+                api_key=api_key,
+                timeout=llm_timeout(),
+                http_client=DefaultHttpxClient(limits=_limits()),
+            )
+        return _CLIENT
+
+
+def get_async_client(api_key: str):
+    """Return the shared, connection-pooled AsyncOpenAI client.
+
+    ``VIBEIK_LLM_TIMEOUT`` (seconds) and ``VIBEIK_LLM_MAX_CONNECTIONS`` configure
+    it. The API opens it at startup; other callers create it lazily.
+    """
+    global _ASYNC_CLIENT
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    with _LOCK:
+        if _ASYNC_CLIENT is None or _ASYNC_CLIENT.api_key != api_key:
+            _ASYNC_CLIENT = AsyncOpenAI(
+                api_key=api_key,
+                timeout=llm_timeout(),
+                http_client=DefaultAsyncHttpxClient(limits=_limits()),
+            )
+        return _ASYNC_CLIENT
+
+
+async def close_async_client() -> None:
+    global _ASYNC_CLIENT
+    with _LOCK:
+        client, _ASYNC_CLIENT = _ASYNC_CLIENT, None
+    if client is not None:
+        await client.close()
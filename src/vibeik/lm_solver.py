@@ -0,0 +1,197 @@
+"""Levenberg-Marquardt IK for revolute DH chains on plain ndarrays.
+
+Works on any NumPy version, unlike roboticstoolbox's ``ikine_LM``, and keeps
+every per-iteration array in buffers owned by the solver, so the loop creates
+no SE3 objects and almost no temporaries.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import threading
+from typing import Optional
+
+import numpy as np
+
+from .cache import LRUCache, array_digest
+from .config import env_float, env_int
+
+
+DEFAULT_MAX_ITERATIONS = 100
+# On 0.5 * |e|^2 with e = (position error in m, rotation error in rad).
+DEFAULT_TOLERANCE = 1e-12
+INITIAL_DAMPING = 1e-3
+MIN_DAMPING = 1e-9
+MAX_DAMPING = 1e8
+HALF_PI = math.pi / 2
+
+
+@dataclass(frozen=True)
+class LMSolution:
+    q: np.ndarray
+    success: bool
+    iterations: int
+    error: float
+
+
+def default_max_iterations() -> int:
+    return env_int("VIBEIK_LM_MAX_ITERATIONS", DEFAULT_MAX_ITERATIONS)
+
+
+def default_tolerance() -> float:
+    return env_float("VIBEIK_LM_TOLERANCE", DEFAULT_TOLERANCE)
+
+
+class NumpyLMSolver:
+    """Damped least-squares IK for one DH table. Not thread-safe; see :func:`lm_solver`."""
+
+    def __init__(self, dh: np.ndarray) -> None:
+        dh = np.asarray(dh, dtype=float)
+        n = dh.shape[0]
+        alpha, self._a, self._offset, d = (dh[:, i].copy() for i in range(4))
+        self._ca = np.cos(alpha)
+        self._sa = np.sin(alpha)
+        self._neg_ca = -self._ca
+        self._neg_sa = -self._sa
+        self.joints = n
+
+        self._theta = np.empty(n)
+        self._ct = np.empty(n)
+        self._st = np.empty(n)
+        self._links = np.zeros((n, 4, 4))
+        self._links[:, 2, 1] = self._sa
+        self._links[:, 2, 2] = self._ca
+        self._links[:, 2, 3] = d
+        self._links[:, 3, 3] = 1.0
+        # Two frame chains: the accepted iterate and the trial step.
+        self._frames = np.empty((n, 4, 4))
+        self._trial_frames = np.empty((n, 4, 4))
+        self._axes = np.empty((n, 3))
+        self._axes[0] = (0.0, 0.0, 1.0)
+        self._origins = np.zeros((n, 3))
+        self._lever = np.empty((n, 3))
+        self._jacobian = np.empty((6, n))
+        self._scratch = np.empty(n)
+        self._normal = np.empty((n, n))
+        self._normal_diagonal = np.empty(n)
+        self._gradient = np.empty(n)
+        self._error = np.empty(6)
+        self._trial_error = np.empty(6)
+        self._relative = np.empty((3, 3))
+        self._q = np.empty(n)
+        self._trial_q = np.empty(n)
+
+    def _forward(self, q: np.ndarray, frames: np.ndarray) -> None:
+        links = self._links
+        np.add(q, self._offset, out=self._theta)
+        np.cos(self._theta, out=self._ct)
+        np.sin(self._theta, out=self._st)
+        links[:, 0, 0] = self._ct
+        np.multiply(self._st, self._neg_ca, out=links[:, 0, 1])
+        np.multiply(self._st, self._sa, out=links[:, 0, 2])
+        np.multiply(self._ct, self._a, out=links[:, 0, 3])
+        links[:, 1, 0] = self._st
+        np.multiply(self._ct, self._ca, out=links[:, 1, 1])
+        np.multiply(self._ct, self._neg_sa, out=links[:, 1, 2])
+        np.multiply(self._st, self._a, out=links[:, 1, 3])
+        frames[0] = links[0]
+        for i in range(1, self.joints):
+            np.matmul(frames[i - 1], links[i], out=frames[i])
+
+    def _pose_error(self, frames: np.ndarray, target: np.ndarray, out: np.ndarray) -> float:
+        """Fill ``out`` with (position error, angle-axis rotation error); return 0.5 * |out|^2."""
+        pose = frames[-1]
+        np.subtract(target[:3, 3], pose[:3, 3], out=out[:3])
+        relative = np.matmul(target[:3, :3], pose[:3, :3].T, out=self._relative)
+        lx = relative[2, 1] - relative[1, 2]
+        ly = relative[0, 2] - relative[2, 0]
+        lz = relative[1, 0] - relative[0, 1]
+        length = math.sqrt(lx * lx + ly * ly + lz * lz)
+        trace = relative[0, 0] + relative[1, 1] + relative[2, 2]
+        if length > 1e-12:
+            scale = math.atan2(length, trace - 1.0) / length
+            out[3], out[4], out[5] = lx * scale, ly * scale, lz * scale
+        elif trace > 0.0:
+            out[3:] = 0.0
+        else:
+            # A half turn: the axis is read off the diagonal.
+            out[3] = HALF_PI * (relative[0, 0] + 1.0)
+            out[4] = HALF_PI * (relative[1, 1] + 1.0)
+            out[5] = HALF_PI * (relative[2, 2] + 1.0)
+        return 0.5 * float(np.dot(out, out))
+
+    def _fill_jacobian(self, frames: np.ndarray) -> None:
+        axes, origins, lever, jacobian, scratch = self._axes, self._origins, self._lever, self._jacobian, self._scratch
+        axes[1:] = frames[:-1, :3, 2]
+        origins[1:] = frames[:-1, :3, 3]
+        np.subtract(frames[-1, :3, 3], origins, out=lever)
+        for row, (i, j) in enumerate(((1, 2), (2, 0), (0, 1))):
+            np.multiply(axes[:, i], lever[:, j], out=jacobian[row])
+            np.multiply(axes[:, j], lever[:, i], out=scratch)
+            np.subtract(jacobian[row], scratch, out=jacobian[row])
+        jacobian[3:] = axes.T
+
+    def solve(
+        self,
+        target: np.ndarray,
+        q0: Optional[np.ndarray] = None,
+        max_iterations: Optional[int] = None,
+        tolerance: Optional[float] = None,
+    ) -> LMSolution:
+        """Minimise the pose error to the flange ``target`` starting from ``q0``.
+
+        Stops once ``0.5 * |e|^2`` is at most ``tolerance`` (``VIBEIK_LM_TOLERANCE``)
+        or after ``max_iterations`` steps (``VIBEIK_LM_MAX_ITERATIONS``).
+        """
+        max_iterations = default_max_iterations() if max_iterations is None else max_iterations
+        tolerance = default_tolerance() if tolerance is None else tolerance
+        target = np.asarray(target, dtype=float)
+        q, trial_q = self._q, self._trial_q
+        if q0 is None:
+            q.fill(0.0)
+        else:
+            q[:] = q0
+        self._forward(q, self._frames)
+        cost = self._pose_error(self._frames, target, self._error)
+        damping = INITIAL_DAMPING
+        diagonal = self._normal.reshape(-1)[:: self.joints + 1]
+        iterations = 0
+        refresh_jacobian = True
+        while cost > tolerance and iterations < max_iterations and damping < MAX_DAMPING:
+            iterations += 1
+            if refresh_jacobian:
+                self._fill_jacobian(self._frames)
+                np.matmul(self._jacobian.T, self._jacobian, out=self._normal)
+                self._normal_diagonal[:] = diagonal
+                np.matmul(self._jacobian.T, self._error, out=self._gradient)
+            np.add(self._normal_diagonal, damping, out=diagonal)
+            step = np.linalg.solve(self._normal, self._gradient)
+            np.add(q, step, out=trial_q)
+            self._forward(trial_q, self._trial_frames)
+            trial_cost = self._pose_error(self._trial_frames, target, self._trial_error)
+            refresh_jacobian = trial_cost < cost
+            if refresh_jacobian:
+                q, trial_q = trial_q, q
+                self._frames, self._trial_frames = self._trial_frames, self._frames
+                self._error, self._trial_error = self._trial_error, self._error
+                cost = trial_cost
+                damping = max(damping * 0.5, MIN_DAMPING)
+            else:
+                damping *= 10.0
+        self._q, self._trial_q = q, trial_q
+        solution = (q + np.pi) % (2 * np.pi) - np.pi
+        return LMSolution(q=solution, success=cost <= tolerance, iterations=iterations,
+                          error=math.sqrt(2.0 * cost))
+
+
+# Solvers per thread; bounded so a long-lived process that sees many DH tables does not grow forever.
+SOLVER_CACHE_SIZE = 8
+_LOCAL = threading.local()
+
+
+def lm_solver(dh: np.ndarray) -> NumpyLMSolver:
+    """Return this thread's solver for ``dh``; buffers are reused across calls."""
+    solvers: Optional[LRUCache] = getattr(_LOCAL, "solvers", None)
+    if solvers is None:
+        solvers = _LOCAL.solvers = LRUCache(maxsize=SOLVER_CACHE_SIZE)
+    return solvers.get_or_create(array_digest(dh), lambda: NumpyLMSolver(dh))
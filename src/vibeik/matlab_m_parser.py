@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import ast
+from functools import lru_cache
 import math
+import operator
 import re
 from dataclasses import dataclass
-from typing import Dict, Iterable, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 
@@ -14,13 +17,26 @@ class ParsedMatrix:
     value: np.ndarray
 
 
+# ``[^\]]*`` rather than a lazy ``.*?``: numeric bodies never contain ``]``, and the
+# character class lets the regex skip a large lookup table in one step.
 MATRIX_PATTERN = re.compile(
-    r"(?P<name>[A-Za-z_][A-Za-z0-9_]*)\s*=\s*\[(?P<body>.*?)\]\s*(?P<transpose>'?)\s*;",
-    re.DOTALL,
+    r"(?P<name>[A-Za-z_][A-Za-z0-9_]*)\s*=\s*\[(?P<body>[^\]]*)\]\s*(?P<transpose>'?)\s*;"
 )
 
+_CONSTANTS = {"pi": math.pi}
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
 
 def _strip_comments(text: str) -> str:
+    if "%" not in text:
+        return text
     lines = []
     for line in text.splitlines():
         if "%" in line:
@@ -36,36 +52,80 @@ def _normalize_body(body: str) -> str:
     return body
 
 
-def _parse_matrix_body(body: str) -> np.ndarray:
-    rows = []
-    for row_text in body.split(";"):
-        row_text = row_text.strip()
-        if not row_text:
-            continue
-        tokens = row_text.split()
-        row = [_safe_eval(token) for token in tokens]
-        rows.append(row)
+def _body_rows(body: str) -> List[List[str]]:
+    rows = [row.split() for row in body.split(";")]
+    rows = [row for row in rows if row]
     if not rows:
         raise ValueError("No rows detected in MATLAB matrix")
-    return np.array(rows, dtype=float)
+    width = len(rows[0])
+    if any(len(row) != width for row in rows):
+        raise ValueError("MATLAB matrix rows have different lengths")
+    return rows
+
+
+def _evaluate_rows(rows: List[List[str]]) -> np.ndarray:
+    width = len(rows[0])
+    tokens = [token for row in rows for token in row]
+    try:
+        # Fast path: plain numeric literals convert in one NumPy call.
+        values = np.array(tokens, dtype=float)
+    except ValueError:
+        values = np.array([_evaluate_token(token) for token in tokens], dtype=float)
+    return values.reshape(len(rows), width)
+
+
+@lru_cache(maxsize=4096)
+def _evaluate_token(token: str) -> float:
+    """Evaluate one matrix entry such as ``-pi/2`` or ``2^-3``; results are memoized per token."""
+    try:
+        return float(token)
+    except ValueError:
+        pass
+    try:
+        tree = ast.parse(token.replace("^", "**"), mode="eval")
+        return float(_fold(tree.body))
+    except (SyntaxError, TypeError, ValueError, ZeroDivisionError, OverflowError) as exc:
+        raise ValueError(f"Unsupported MATLAB expression: {token!r}") from exc
+
+
+def _fold(node: ast.AST) -> float:
+    # Only numbers, the constants above and arithmetic; anything else is rejected.
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        # Floats, so an oversized power overflows instead of growing a huge int.
+        return float(node.value)
+    if isinstance(node, ast.Name) and node.id in _CONSTANTS:
+        return _CONSTANTS[node.id]
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_fold(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        return _BINARY_OPERATORS[type(node.op)](_fold(node.left), _fold(node.right))
+    raise ValueError(f"Unsupported MATLAB syntax: {type(node).__name__}")
+
 
+def _matrix_from_rows(match: re.Match, rows: List[List[str]]) -> np.ndarray:
+    matrix = _evaluate_rows(rows)
+    return matrix.T if match.group("transpose") else matrix
 
-def _safe_eval(expr: str) -> float:
-    allowed = {"pi": math.pi}
-    return float(eval(expr, {"__builtins__": {}}, allowed))
+
+def _matrix_from_match(match: re.Match) -> np.ndarray:
+    return _matrix_from_rows(match, _body_rows(_normalize_body(match.group("body"))))
+
+
+def _shape(match: re.Match, rows: List[List[str]]) -> Tuple[int, int]:
+    shape = (len(rows), len(rows[0]))
+    return shape[::-1] if match.group("transpose") else shape
+
+
+def _scan_matrices(text: str) -> Dict[str, re.Match]:
+    """Locate each assignment without evaluating it; a later assignment to a name wins."""
+    matches: Dict[str, re.Match] = {}
+    for match in MATRIX_PATTERN.finditer(_strip_comments(text)):
+        matches[match.group("name")] = match
+    return matches
 
 
 def parse_matrices(text: str) -> Dict[str, np.ndarray]:
-    cleaned = _strip_comments(text)
-    matrices: Dict[str, np.ndarray] = {}
-    for match in MATRIX_PATTERN.finditer(cleaned):
-        name = match.group("name")
-        body = _normalize_body(match.group("body"))
-        matrix = _parse_matrix_body(body)
-        if match.group("transpose"):
-            matrix = matrix.T
-        matrices[name] = matrix
-    return matrices
+    return {name: _matrix_from_match(match) for name, match in _scan_matrices(text).items()}
 
 
 def extract_matrix(
@@ -73,15 +133,26 @@ def extract_matrix(
     preferred_names: Iterable[str],
     expected_shape: Optional[Tuple[int, int]] = None,
 ) -> ParsedMatrix:
-    matrices = parse_matrices(text)
+    """Return the first of ``preferred_names`` with ``expected_shape``, else the first matrix of that shape.
+
+    Shapes are checked on the tokens, and only the matrix that is returned is
+    evaluated, so large lookup tables elsewhere in the file cost a regex scan
+    rather than a parse.
+    """
+    matches = _scan_matrices(text)
     for name in preferred_names:
-        if name in matrices:
-            matrix = matrices[name]
-            if expected_shape and matrix.shape != expected_shape:
+        if name in matches:
+            match = matches[name]
+            rows = _body_rows(_normalize_body(match.group("body")))
+            if expected_shape and _shape(match, rows) != expected_shape:
                 continue
-            return ParsedMatrix(name=name, value=matrix)
+            return ParsedMatrix(name=name, value=_matrix_from_rows(match, rows))
     if expected_shape:
-        for name, matrix in matrices.items():
-            if matrix.shape == expected_shape:
-                return ParsedMatrix(name=name, value=matrix)
+        for name, match in matches.items():
+            try:
+                rows = _body_rows(_normalize_body(match.group("body")))
+            except ValueError:
+                continue
+            if _shape(match, rows) == expected_shape:
+                return ParsedMatrix(name=name, value=_matrix_from_rows(match, rows))
     raise ValueError("Required MATLAB matrix not found")
@@ -0,0 +1,301 @@
+"""Per-request stage timings and process-wide metrics in the Prometheus text format.
+
+Stdlib only, so the CLI can time its stages without importing anything heavy.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds; spans a cached analytic solve up to a slow LLM round trip.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(tuple(labels[name] for name in self.labels), 0.0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., +Inf count], sum.
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple([labels[name] for name in self.labels])
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][slot] += 1
+            entry[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(tuple(labels[name] for name in self.labels))
+            return sum(entry[0]) if entry else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        bucket_labels = self.labels + ("le",)
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(bucket_labels, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[object] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """Register a callable that renders extra exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REQUESTS = REGISTRY.counter("vibeik_requests_total", "Requests handled, by route and outcome.", ("route", "outcome"))
+REQUEST_SECONDS = REGISTRY.histogram("vibeik_request_duration_seconds", "Request latency by route.", ("route",))
+STAGE_SECONDS = REGISTRY.histogram("vibeik_stage_duration_seconds", "Time spent in each solve stage.", ("stage",))
+IK_SOLVES = REGISTRY.counter("vibeik_ik_solves_total", "IK solves by solver and outcome.", ("solver", "outcome"))
+IK_CACHE_HITS = REGISTRY.counter("vibeik_ik_cache_hits_total", "IK results served from the IK result cache.",
+                                 ("solver", "outcome"))
+IK_ITERATIONS = REGISTRY.counter("vibeik_ik_iterations_total", "Iterations spent by iterative IK solvers.",
+                                 ("solver",))
+LLM_CALLS = REGISTRY.counter("vibeik_llm_calls_total", "LLM requests by purpose and outcome.",
+                             ("purpose", "outcome"))
+
+
+_TIMINGS: ContextVar[Optional[Dict[str, float]]] = ContextVar("vibeik_timings", default=None)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Collect :class:`stage` durations (milliseconds) into the yielded dict.
+
+    Nested calls share the outermost dict, so a route can time the index
+    lookup and the pipeline can add the rest. Work handed to an executor must
+    run in a copy of the current context to be recorded.
+    """
+    timings = _TIMINGS.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = {}
+    token = _TIMINGS.set(timings)
+    try:
+        yield timings
+    finally:
+        _TIMINGS.reset(token)
+
+
+class stage:
+    """Time a ``with`` block as stage ``name``; repeated stages accumulate.
+
+    A plain class rather than ``@contextmanager``: it wraps every IK solve, so
+    the generator overhead would show up in batch throughput.
+    """
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self._start
+        STAGE_SECONDS.observe(elapsed, stage=self.name)
+        timings = _TIMINGS.get()
+        if timings is not None:
+            timings[self.name] = timings.get(self.name, 0.0) + elapsed * 1e3
+
+
+class RequestRecord:
+    __slots__ = ("outcome",)
+
+    def __init__(self) -> None:
+        self.outcome = "ok"
+
+
+@contextmanager
+def track_request(route: str) -> Iterator[RequestRecord]:
+    """Count and time one request; set ``outcome`` on the yielded record ("ok" by default)."""
+    record = RequestRecord()
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record.outcome = "error"
+        raise
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, route=route)
+        REQUESTS.inc(route=route, outcome=record.outcome)
+
+
+@contextmanager
+def llm_call(purpose: str) -> Iterator[None]:
+    """Count an LLM request and time it as the ``llm`` stage."""
+    outcome = "error"
+    try:
+        with stage("llm"):
+            yield
+        outcome = "ok"
+    finally:
+        LLM_CALLS.inc(purpose=purpose, outcome=outcome)
+
+
+def record_ik(results) -> None:
+    """Count IK results (anything with ``ok``, ``solver``, ``iterations`` and ``cache_hit``).
+
+    Results without a solver never reached IK (e.g. rejected as unreachable)
+    and are not counted. Cache hits are counted separately from solves.
+    """
+    for result in results:
+        if not result.solver:
+            continue
+        outcome = "ok" if result.ok else "failed"
+        if getattr(result, "cache_hit", False):
+            IK_CACHE_HITS.inc(solver=result.solver, outcome=outcome)
+            continue
+        IK_SOLVES.inc(solver=result.solver, outcome=outcome)
+        if result.iterations:
+            IK_ITERATIONS.inc(result.iterations, solver=result.solver)
+
+
+def _cache_lines() -> List[str]:
+    from .ik import model_cache_stats
+    from .ik_cache import ik_cache_stats
+    from .parse_cache import parse_cache_stats
+    from .resources import resource_cache_stats
+
+    model_stats = model_cache_stats()
+    caches = {"robot_model": (model_stats.hits, model_stats.misses)}
+    for name, stats in resource_cache_stats().items():
+        caches[f"{name[:-1]}_resource"] = (stats.hits, stats.misses)
+    parse_stats = parse_cache_stats()
+    if parse_stats is not None:
+        caches["parse"] = (parse_stats.memory.hits + parse_stats.disk_hits, parse_stats.disk_misses)
+    ik_stats = ik_cache_stats()
+    if ik_stats is not None:
+        caches["ik_result"] = (ik_stats.hits, ik_stats.misses)
+
+    lines = []
+    for suffix, kind, documentation, value in (
+        ("hits_total", "counter", "Cache lookups served from the cache.", lambda hits, misses: hits),
+        ("misses_total", "counter", "Cache lookups that had to compute the value.", lambda hits, misses: misses),
+        ("hit_ratio", "gauge", "Hits over lookups since start-up.",
+         lambda hits, misses: hits / (hits + misses) if hits + misses else 0.0),
+    ):
+        name = f"vibeik_cache_{suffix}"
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for cache, (hits, misses) in caches.items():
+            lines.append(f"{name}{_format_labels(('cache',), (cache,))} {_format_value(value(hits, misses))}")
+    return lines
+
+
+REGISTRY.add_collector(_cache_lines)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+import json
+import os
+import re
+from typing import Dict, List, Mapping, Optional, Set
+
+import numpy as np
+
+from .config import env_float, env_int
+
+
+DEFAULT_SYNONYMS = {"drilling": "drill"}
+DEFAULT_MIN_SCORE = 0.6
+DEFAULT_TOP_K = 5
+# A local match is accepted only when it leads the runner-up by this much.
+AMBIGUITY_MARGIN = 0.1
+
+_STOPWORDS = frozenset({"a", "an", "the", "of", "for", "with", "tool", "robot"})
+_TOKEN = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    key: str
+    display: str
+    score: float
+
+
+def synonym_table() -> Dict[str, str]:
+    """Default synonyms, extended by the JSON object in ``VIBEIK_SYNONYMS`` (a file path)."""
+    table = dict(DEFAULT_SYNONYMS)
+    path = os.getenv("VIBEIK_SYNONYMS")
+    if path:
+        with open(path, encoding="utf-8") as handle:
+            extra = json.load(handle)
+        if not isinstance(extra, dict):
+            raise ValueError("VIBEIK_SYNONYMS must point to a JSON object")
+        table.update({str(src).lower(): str(dst).lower() for src, dst in extra.items()})
+    return table
+
+
+def min_match_score() -> float:
+    return env_float("VIBEIK_MATCH_MIN_SCORE", DEFAULT_MIN_SCORE)
+
+
+def llm_top_k() -> int:
+    return env_int("VIBEIK_MATCH_TOP_K", DEFAULT_TOP_K)
+
+
+class NameMatcher:
+    """Token and trigram inverted indexes over resource names.
+
+    Candidates are scored by the Dice overlap of their token and trigram sets
+    with the query, or, for short queries contained in a longer name, by how
+    much of the query they cover. Postings are integer arrays, so a lookup is
+    a few ``bincount`` calls regardless of catalog size.
+    """
+
+    def __init__(self, display_names: Mapping[str, str], synonyms: Optional[Mapping[str, str]] = None) -> None:
+        self.synonyms = dict(DEFAULT_SYNONYMS if synonyms is None else synonyms)
+        self._keys = list(display_names)
+        self._displays = [display_names[key] for key in self._keys]
+        # Position of each entry in display-name order, used to break score ties.
+        self._display_rank = np.argsort(np.argsort(np.array(self._displays, dtype=object)))
+        tokens: Dict[str, List[int]] = defaultdict(list)
+        trigrams: Dict[str, List[int]] = defaultdict(list)
+        n_tokens, n_grams = [], []
+        for entry, display in enumerate(self._displays):
+            name_tokens = self._tokenize(display)
+            name_grams = _trigrams("".join(name_tokens))
+            for token in name_tokens:
+                tokens[token].append(entry)
+            for gram in name_grams:
+                trigrams[gram].append(entry)
+            n_tokens.append(len(name_tokens))
+            n_grams.append(len(name_grams))
+        self._tokens = {token: np.array(ids, dtype=np.intp) for token, ids in tokens.items()}
+        self._trigrams = {gram: np.array(ids, dtype=np.intp) for gram, ids in trigrams.items()}
+        self._n_tokens = np.array(n_tokens, dtype=float)
+        self._n_grams = np.array(n_grams, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _tokenize(self, text: str) -> List[str]:
+        tokens = (self.synonyms.get(token, token) for token in _TOKEN.findall(text.lower()))
+        return list(dict.fromkeys(token for token in tokens if token not in _STOPWORDS))
+
+    def _hits(self, postings: Dict[str, np.ndarray], features) -> np.ndarray:
+        lists = [postings[feature] for feature in features if feature in postings]
+        if not lists:
+            return np.zeros(len(self._keys))
+        return np.bincount(np.concatenate(lists), minlength=len(self._keys)).astype(float)
+
+    def rank(self, query: str, limit: Optional[int] = None) -> List[NameMatch]:
+        tokens = self._tokenize(query)
+        grams = _trigrams("".join(tokens))
+        if not self._keys or not tokens:
+            return []
+        token_hits = self._hits(self._tokens, tokens)
+        gram_hits = self._hits(self._trigrams, grams)
+        candidates = np.flatnonzero((token_hits > 0) | (gram_hits > 0))
+        if candidates.size == 0:
+            return []
+        shared_tokens, shared_grams = token_hits[candidates], gram_hits[candidates]
+        # Mean of the token and trigram Dice coefficients.
+        dice = (shared_tokens / (len(tokens) + self._n_tokens[candidates])
+                + shared_grams / (len(grams) + self._n_grams[candidates]))
+        coverage = 0.45 * (shared_tokens / len(tokens) + shared_grams / max(len(grams), 1))
+        scores = np.maximum(dice, coverage)
+        order = np.lexsort((self._display_rank[candidates], -scores))
+        if limit is not None:
+            order = order[:limit]
+        return [NameMatch(self._keys[candidates[i]], self._displays[candidates[i]], float(scores[i]))
+                for i in order]
+
+    def best(self, query: str, min_score: Optional[float] = None) -> Optional[NameMatch]:
+        """Return the top match when it clears ``min_score`` and is not ambiguous."""
+        ranked = self.rank(query, limit=2)
+        threshold = min_match_score() if min_score is None else min_score
+        if not ranked or ranked[0].score < threshold:
+            return None
+        if len(ranked) > 1 and ranked[0].score - ranked[1].score < AMBIGUITY_MARGIN:
+            return None
+        return ranked[0]
+
+    def ties(self, query: str, min_score: Optional[float] = None, limit: Optional[int] = None) -> List[NameMatch]:
+        """Matches within ``AMBIGUITY_MARGIN`` of a top match that clears ``min_score``.
+
+        More than one entry means :meth:`best` declined to choose between them.
+        """
+        ranked = self.rank(query)
+        threshold = min_match_score() if min_score is None else min_score
+        if not ranked or ranked[0].score < threshold:
+            return []
+        tied = [match for match in ranked if ranked[0].score - match.score < AMBIGUITY_MARGIN]
+        return tied if limit is None else tied[:limit]
+
+
+def _trigrams(text: str) -> Set[str]:
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
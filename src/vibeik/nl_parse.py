@@ -2,27 +2,101 @@ from __future__ import annotations
 
 import json
 import os
-import re
-from typing import Optional
-
-from openai import OpenAI
+from typing import TYPE_CHECKING, Optional
 
+from .llm import get_async_client, get_client
+from .metrics import llm_call
+from .rule_parse import RuleParse, min_confidence, parse_with_rules
 from .types import Orientation, ParsedInstruction, TargetPosition
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+LLM_MODEL = "gpt-5-mini"
 
 SYSTEM_PROMPT = """You are a helpful parser for robot inverse kinematics instructions.
 Return ONLY JSON that matches the schema exactly."""
 
 
-def parse_instruction(text: str) -> ParsedInstruction:
+def parse_instruction(text: str, use_cache: bool = True) -> ParsedInstruction:
+    """Parse ``text`` with the deterministic grammar, asking the LLM only when unsure.
+
+    The LLM is called when the rules fail or score below
+    ``VIBEIK_PARSE_MIN_CONFIDENCE`` and ``OPENAI_API_KEY`` is set.
+    """
+    rules = parse_with_rules(text)
+    if rules.parsed is not None and rules.confidence >= min_confidence():
+        return rules.parsed
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        cache = _parse_cache() if use_cache else None
+        key = _cache_key(text)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        parsed = _parse_with_llm(text, api_key)
+        if cache is not None:
+            cache.put(key, parsed)
+        return parsed
+    return _rules_or_raise(rules)
+
+
+async def parse_instruction_async(
+    text: str, use_cache: bool = True, executor: Optional[Executor] = None
+) -> ParsedInstruction:
+    """Like :func:`parse_instruction`, but awaits the LLM on the shared async client.
+
+    The SQLite-backed parse cache is read and written in ``executor``.
+    """
+    import asyncio
+
+    rules = parse_with_rules(text)
+    if rules.parsed is not None and rules.confidence >= min_confidence():
+        return rules.parsed
     api_key = os.getenv("OPENAI_API_KEY")
     if api_key:
-        return _parse_with_llm(text, api_key)
-    return _parse_with_fallback(text)
+        loop = asyncio.get_running_loop()
+        cache = await loop.run_in_executor(executor, _parse_cache) if use_cache else None
+        key = _cache_key(text)
+        if cache is not None:
+            cached = await loop.run_in_executor(executor, cache.get, key)
+            if cached is not None:
+                return cached
+        parsed = await _parse_with_llm_async(text, api_key)
+        if cache is not None:
+            await loop.run_in_executor(executor, cache.put, key, parsed)
+        return parsed
+    return _rules_or_raise(rules)
+
+
+def _parse_cache():
+    # Only LLM parses are cached, so SQLite is loaded on that path alone.
+    from .parse_cache import parse_cache
+
+    return parse_cache()
+
+
+def _cache_key(text: str) -> str:
+    from .parse_cache import normalize_instruction
+
+    return f"{LLM_MODEL}:{normalize_instruction(text)}"
 
 
 def _parse_with_llm(text: str, api_key: str) -> ParsedInstruction:
-    client = OpenAI(api_key=api_key)
+    with llm_call("parse"):
+        response = get_client(api_key).responses.create(**_llm_request(text))
+    return _instruction_from_output(response.output_text)
+
+
+async def _parse_with_llm_async(text: str, api_key: str) -> ParsedInstruction:
+    with llm_call("parse"):
+        response = await get_async_client(api_key).responses.create(**_llm_request(text))
+    return _instruction_from_output(response.output_text)
+
+
+def _llm_request(text: str) -> dict:
     schema = {
         "type": "object",
         "properties": {
@@ -59,8 +133,8 @@ def _parse_with_llm(text: str, api_key: str) -> ParsedInstruction:
         "required": ["robot_model", "tool_name", "target", "orientation", "task"],
         "additionalProperties": False,
     }
-    response = client.responses.create(
-        model="gpt-5-mini",
+    return dict(
+        model=LLM_MODEL,
         input=[
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": text},
@@ -74,7 +148,10 @@ def _parse_with_llm(text: str, api_key: str) -> ParsedInstruction:
             }
         },
     )
-    payload = json.loads(response.output_text)
+
+
+def _instruction_from_output(output_text: str) -> ParsedInstruction:
+    payload = json.loads(output_text)
     orientation = None
     if payload.get("orientation"):
         orientation = Orientation(**payload["orientation"])
@@ -87,33 +164,8 @@ def _parse_with_llm(text: str, api_key: str) -> ParsedInstruction:
     )
 
 
-def _parse_with_fallback(text: str) -> ParsedInstruction:
-    robot_match = re.search(r"(?:using|use)\s+the\s+(.+?)\s+robot", text, re.IGNORECASE)
-    if not robot_match:
-        robot_match = re.search(r"(?:using|use)\s+(.+?)\s+robot", text, re.IGNORECASE)
-    tool_match = None
-    tool_candidates = list(re.finditer(r"(?:an|a)\s+([A-Za-z0-9_ .-]+?)\s+tool", text, re.IGNORECASE))
-    if tool_candidates:
-        tool_match = tool_candidates[-1]
-    position_match = re.search(r"\[([^\]]+)\]", text)
-
-    if not (robot_match and tool_match and position_match):
+def _rules_or_raise(rules: RuleParse) -> ParsedInstruction:
+    # Without an API key a low-confidence parse beats no parse at all.
+    if rules.parsed is None:
         raise ValueError("Unable to parse instruction without OPENAI_API_KEY")
-
-    robot_model = robot_match.group(1).strip()
-    tool_name = tool_match.group(1).strip()
-    coords = [coord.strip() for coord in position_match.group(1).split(",")]
-    values = []
-    for coord in coords:
-        coord = coord.replace("m", "").strip()
-        values.append(float(coord))
-    if len(values) != 3:
-        raise ValueError("Expected three coordinates for target position")
-
-    return ParsedInstruction(
-        robot_model=robot_model,
-        tool_name=tool_name,
-        target=TargetPosition(x=values[0], y=values[1], z=values[2]),
-        orientation=None,
-        task=None,
-    )
+    return rules.parsed
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .config import env_int
+from .ik import SOLVER_AUTO, IKResult, solve_targets
+
+
+DEFAULT_CHUNK_SIZE = 256
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def default_workers() -> int:
+    return env_int("VIBEIK_WORKERS", 1)
+
+
+def pool_size() -> int:
+    """Processes in the shared pool: ``VIBEIK_WORKERS``, else the CPU count.
+
+    Per-request ``workers`` values are clamped to this.
+    """
+    return max(1, env_int("VIBEIK_WORKERS", os.cpu_count() or 1))
+
+
+def default_chunk_size() -> int:
+    return env_int("VIBEIK_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # One pool for the whole process; it is never resized, so concurrent batches
+    # can share it without one cancelling another's chunks.
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn keeps workers independent of the parent's threads (uvicorn, executors).
+            context = multiprocessing.get_context("spawn")
+            _POOL = ProcessPoolExecutor(max_workers=pool_size(), mp_context=context)
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    """Stop the pool once its queued chunks have finished."""
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def _solve_chunk(dh: np.ndarray, targets: np.ndarray, solver: str) -> List[IKResult]:
+    # Runs in a worker; its model cache is per process and stays warm across chunks.
+    return solve_targets(dh, targets, solver=solver)
+
+
+def solve_targets_parallel(
+    dh: np.ndarray,
+    targets: Sequence[np.ndarray],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    solver: str = SOLVER_AUTO,
+) -> List[IKResult]:
+    """Shard flange targets across a process pool and return results in input order.
+
+    Each chunk is warm-started sequentially inside its worker, and at most
+    ``workers`` (clamped to :func:`pool_size`) chunks of this batch run at once.
+    Batches that fit in one chunk, or ``workers <= 1``, are solved in-process.
+    """
+    workers = min(default_workers() if workers is None else workers, pool_size())
+    chunk_size = default_chunk_size() if chunk_size is None else chunk_size
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if workers <= 1 or len(targets) <= chunk_size:
+        return solve_targets(dh, targets, solver=solver)
+
+    stacked = np.asarray(targets, dtype=float)
+    chunks = [stacked[start:start + chunk_size] for start in range(0, len(stacked), chunk_size)]
+    pool = _get_pool()
+    results: List[IKResult] = []
+    pending = deque()
+    for chunk in chunks:
+        if len(pending) >= workers:
+            results.extend(pending.popleft().result())
+        pending.append(pool.submit(_solve_chunk, dh, chunk, solver))
+    while pending:
+        results.extend(pending.popleft().result())
+    return results
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .cache import CacheStats, LRUCache
+from .config import cache_dir, env_flag, env_float, env_int
+from .types import ParsedInstruction
+
+
+DEFAULT_TTL = 7 * 24 * 3600.0
+DEFAULT_MAXSIZE = 1024
+
+
+def normalize_instruction(text: str) -> str:
+    """Collapse whitespace so trivially reformatted prompts share a cache entry."""
+    return " ".join(text.split())
+
+
+@dataclass(frozen=True)
+class ParseCacheStats:
+    memory: CacheStats
+    disk_hits: int
+    disk_misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.memory.hits + self.disk_hits
+        total = hits + self.disk_misses
+        return hits / total if total else 0.0
+
+
+class ParseCache:
+    """In-memory LRU with TTL in front of a SQLite store shared by all workers."""
+
+    def __init__(self, path: Optional[Path], maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._memory: LRUCache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_hits = 0
+        self._disk_misses = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parses (key TEXT PRIMARY KEY, payload TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[ParsedInstruction]:
+        parsed = self._memory.get(key)
+        if parsed is not None:
+            return parsed
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = None
+                if conn is not None:
+                    row = conn.execute(
+                        "SELECT payload FROM parses WHERE key = ? AND created > ?",
+                        (key, time.time() - self.ttl),
+                    ).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self._disk_misses += 1
+                return None
+            self._disk_hits += 1
+        parsed = ParsedInstruction.model_validate_json(row[0])
+        self._memory.put(key, parsed)
+        return parsed
+
+    def put(self, key: str, parsed: ParsedInstruction) -> None:
+        self._memory.put(key, parsed)
+        with self._lock:
+            try:
+                conn = self._connection()
+                if conn is not None:
+                    with conn:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO parses (key, payload, created) VALUES (?, ?, ?)",
+                            (key, parsed.model_dump_json(), time.time()),
+                        )
+            except sqlite3.Error:
+                return
+
+    def clear(self) -> None:
+        self._memory.clear()
+        with self._lock:
+            self._disk_hits = 0
+            self._disk_misses = 0
+            try:
+                conn = self._connection()
+                if conn is not None:
+                    with conn:
+                        conn.execute("DELETE FROM parses")
+            except sqlite3.Error:
+                return
+
+    def stats(self) -> ParseCacheStats:
+        return ParseCacheStats(memory=self._memory.stats(), disk_hits=self._disk_hits,
+                               disk_misses=self._disk_misses)
+
+
+_CACHE: Optional[ParseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def parse_cache() -> Optional[ParseCache]:
+    """Return the process-wide parse cache, or None when ``VIBEIK_PARSE_CACHE=0``.
+
+    The SQLite file lives in the cache directory; ``VIBEIK_PARSE_CACHE_TTL``
+    (seconds) and ``VIBEIK_PARSE_CACHE_SIZE`` tune expiry and the LRU bound.
+    """
+    global _CACHE
+    if not env_flag("VIBEIK_PARSE_CACHE", True):
+        return None
+    base = cache_dir()
+    path = base / "parse_cache.sqlite3" if base is not None else None
+    with _CACHE_LOCK:
+        if _CACHE is None or _CACHE.path != path:
+            _CACHE = ParseCache(
+                path,
+                maxsize=env_int("VIBEIK_PARSE_CACHE_SIZE", DEFAULT_MAXSIZE),
+                ttl=env_float("VIBEIK_PARSE_CACHE_TTL", DEFAULT_TTL),
+            )
+        return _CACHE
+
+
+def clear_parse_cache() -> None:
+    cache = parse_cache()
+    if cache is not None:
+        cache.clear()
+
+
+def parse_cache_stats() -> Optional[ParseCacheStats]:
+    cache = parse_cache()
+    return cache.stats() if cache is not None else None
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+
+from .ik import SOLVER_AUTO, IKResult, check_solver, solve_ik
+from .kinematics import make_transform, rotation_from_orientation
+from .metrics import collect_timings, record_ik, stage
+from .nl_parse import parse_instruction, parse_instruction_async
+from .poses import PoseBatch
+from .reachability import UNREACHABLE_WARNING, reachability_map
+from .resources import ResourceIndex, RobotResource, ToolResource, load_robot, load_tool
+from .types import (
+    BatchPointResult,
+    BatchSolveRequest,
+    BatchSolveResponse,
+    Orientation,
+    ParsedInstruction,
+    SolveResponse,
+    TargetPosition,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+@dataclass(frozen=True)
+class ResolvedResources:
+    robot_name: str
+    tool_name: str
+    robot: RobotResource
+    tool: ToolResource
+
+
+def resolve_resources(index: ResourceIndex, robot_model: str, tool_name: str) -> ResolvedResources:
+    with stage("match"):
+        robot_match = index.match_robot(robot_model)
+        if not robot_match:
+            raise ValueError(_no_match("robot model", robot_model, index.robot_ties(robot_model)))
+        tool_match = index.match_tool(tool_name)
+    return _load_resources(index, robot_match, tool_match, tool_name)
+
+
+async def resolve_resources_async(
+    index: ResourceIndex, robot_model: str, tool_name: str, executor: Optional[Executor] = None
+) -> ResolvedResources:
+    """Match names on the event loop (awaiting the LLM if needed) and load the files in ``executor``."""
+    import asyncio
+
+    with stage("match"):
+        robot_match = index.match_robot(robot_model)
+        if not robot_match:
+            raise ValueError(_no_match("robot model", robot_model, index.robot_ties(robot_model)))
+        tool_match = await index.match_tool_async(tool_name)
+    loop = asyncio.get_running_loop()
+    # File reads, MATLAB parsing and cache writes block, so keep them off the loop.
+    return await loop.run_in_executor(executor, copy_context().run, _load_resources, index, robot_match,
+                                      tool_match, tool_name)
+
+
+def _no_match(kind: str, name: str, ties) -> str:
+    if len(ties) > 1:
+        return f"Ambiguous {kind}: {name} (candidates: {', '.join(ties)})"
+    return f"Unknown {kind}: {name}"
+
+
+def _load_resources(index: ResourceIndex, robot_match, tool_match, tool_name: str) -> ResolvedResources:
+    robot_display, robot_path = robot_match
+    if not tool_match:
+        raise ValueError(_no_match("tool", tool_name, index.tool_ties(tool_name)))
+    tool_display, tool_path = tool_match
+    with stage("load"):
+        return ResolvedResources(
+            robot_name=robot_display,
+            tool_name=tool_display,
+            robot=load_robot(robot_path),
+            tool=load_tool(tool_path),
+        )
+
+
+def flange_target(resources: ResolvedResources, position: TargetPosition,
+                  orientation: Optional[Orientation]) -> np.ndarray:
+    rotation = rotation_from_orientation(orientation)
+    translation = np.array([position.x, position.y, position.z])
+    target = make_transform(rotation, translation)
+    # Tool defines flange -> TCP, so remove it to get the flange target.
+    return target @ resources.tool.tcp_inv
+
+
+def reachable_mask(resources: ResolvedResources, positions: np.ndarray) -> np.ndarray:
+    """Return which TCP positions may be reachable; all True when the map is disabled."""
+    reach = reachability_map(resources.robot.dh, resources.tool.tcp)
+    if reach is None:
+        return np.ones(len(positions), dtype=bool)
+    return reach.reachable(positions)
+
+
+def is_reachable(resources: ResolvedResources, position: np.ndarray) -> bool:
+    with stage("reachability"):
+        return bool(reachable_mask(resources, position[None, :])[0])
+
+
+UNREACHABLE_RESULT = IKResult(ok=False, joint_angles=None, residual_error=None, warning=UNREACHABLE_WARNING)
+
+
+def solve_instruction(
+    text: str,
+    index: ResourceIndex,
+    use_parse_cache: bool = True,
+    include_timings: bool = False,
+    solver: str = SOLVER_AUTO,
+) -> SolveResponse:
+    """Parse, resolve and solve ``text``; ``include_timings`` adds per-stage milliseconds to the meta."""
+    with collect_timings() as timings:
+        try:
+            check_solver(solver)
+            with stage("parse"):
+                parsed = parse_instruction(text, use_cache=use_parse_cache)
+            resources = resolve_resources(index, parsed.robot_model, parsed.tool_name)
+        except ValueError as exc:
+            response = SolveResponse(ok=False, warnings=[str(exc)])
+        else:
+            response = solve_parsed(parsed, resources, solver)
+    return _with_timings(response, timings) if include_timings else response
+
+
+async def solve_instruction_async(
+    text: str,
+    index: ResourceIndex,
+    executor: Optional[Executor] = None,
+    use_parse_cache: bool = True,
+    include_timings: bool = False,
+    solver: str = SOLVER_AUTO,
+) -> SolveResponse:
+    """Await the LLM steps on the event loop and run file, cache and IK work in ``executor``."""
+    import asyncio
+
+    with collect_timings() as timings:
+        try:
+            check_solver(solver)
+            with stage("parse"):
+                parsed = await parse_instruction_async(text, use_cache=use_parse_cache, executor=executor)
+            resources = await resolve_resources_async(index, parsed.robot_model, parsed.tool_name, executor)
+        except ValueError as exc:
+            response = SolveResponse(ok=False, warnings=[str(exc)])
+        else:
+            loop = asyncio.get_running_loop()
+            # Run in a copy of this context so the executor thread records into ``timings``.
+            response = await loop.run_in_executor(executor, copy_context().run, solve_parsed, parsed, resources,
+                                                solver)
+    return _with_timings(response, timings) if include_timings else response
+
+
+def _with_timings(response: SolveResponse, timings: Dict[str, float]) -> SolveResponse:
+    response.meta.timings_ms = dict(timings)
+    return response
+
+
+def solve_parsed(
+    parsed: ParsedInstruction, resources: ResolvedResources, solver: str = SOLVER_AUTO
+) -> SolveResponse:
+    meta = {"robot_model": resources.robot_name, "tool_name": resources.tool_name}
+    position = np.array([parsed.target.x, parsed.target.y, parsed.target.z])
+    if not is_reachable(resources, position):
+        return SolveResponse(ok=False, warnings=[UNREACHABLE_WARNING], meta=meta)
+
+    target = flange_target(resources, parsed.target, parsed.orientation)
+    timer = stage("ik")
+    with timer:
+        ik_result = solve_ik(resources.robot.dh, target, solver=solver)
+        if ik_result.cache_hit:
+            # A lookup, not a solve; keep it out of the ik latency histogram.
+            timer.name = "ik_cache"
+    record_ik([ik_result])
+    meta.update(residual_error=ik_result.residual_error, solver=ik_result.solver, cache_hit=ik_result.cache_hit)
+    if not ik_result.ok:
+        return SolveResponse(ok=False, warnings=[ik_result.warning or "IK failed"], meta=meta)
+
+    joint_angles = ik_result.joint_angles.tolist() if ik_result.joint_angles is not None else []
+    joint_angles_deg = [float(angle * 180.0 / np.pi) for angle in joint_angles]
+    return SolveResponse(
+        ok=True,
+        joint_angles_rad=joint_angles,
+        joint_angles_deg=joint_angles_deg,
+        warnings=[],
+        meta=meta,
+    )
+
+
+def point_result(result: IKResult) -> BatchPointResult:
+    return BatchPointResult(
+        ok=result.ok,
+        joint_angles_rad=result.joint_angles.tolist() if result.ok else None,
+        residual_error=result.residual_error,
+        warning=result.warning,
+    )
+
+
+def solve_batch(request: BatchSolveRequest, index: ResourceIndex) -> BatchSolveResponse:
+    try:
+        poses = PoseBatch.from_targets(request.targets)
+    except ValueError as exc:
+        return BatchSolveResponse(ok=False, warnings=[str(exc)])
+    return solve_pose_batch(
+        request.robot_model, request.tool_name, poses, index,
+        workers=request.workers, chunk_size=request.chunk_size, solver=request.solver,
+    )
+
+
+def solve_pose_batch(
+    robot_model: str,
+    tool_name: str,
+    poses: PoseBatch,
+    index: ResourceIndex,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    solver: str = SOLVER_AUTO,
+) -> BatchSolveResponse:
+    """Solve a :class:`PoseBatch` without building a model per pose."""
+    try:
+        check_solver(solver)
+        resources = resolve_resources(index, robot_model, tool_name)
+    except ValueError as exc:
+        return BatchSolveResponse(ok=False, warnings=[str(exc)])
+    return solve_resolved_poses(resources, poses, workers=workers, chunk_size=chunk_size, solver=solver)
+
+
+async def solve_batch_async(
+    request: BatchSolveRequest, index: ResourceIndex, executor: Optional[Executor] = None
+) -> BatchSolveResponse:
+    import asyncio
+
+    try:
+        check_solver(request.solver)
+        resources = await resolve_resources_async(index, request.robot_model, request.tool_name, executor)
+    except ValueError as exc:
+        return BatchSolveResponse(ok=False, warnings=[str(exc)])
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, solve_resolved_batch, request, resources)
+
+
+def solve_resolved_batch(request: BatchSolveRequest, resources: ResolvedResources) -> BatchSolveResponse:
+    try:
+        poses = PoseBatch.from_targets(request.targets)
+    except ValueError as exc:
+        return BatchSolveResponse(ok=False, warnings=[str(exc)])
+    return solve_resolved_poses(
+        resources, poses, workers=request.workers, chunk_size=request.chunk_size, solver=request.solver,
+    )
+
+
+def solve_resolved_poses(
+    resources: ResolvedResources,
+    poses: PoseBatch,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    solver: str = SOLVER_AUTO,
+) -> BatchSolveResponse:
+    # Imported here so single solves never load multiprocessing.
+    from .parallel import solve_targets_parallel
+
+    with stage("reachability"):
+        reachable = reachable_mask(resources, poses.positions)
+    # One vectorized conversion for every reachable pose instead of a transform per point.
+    targets = poses.take(reachable).flange_targets(resources.tool.tcp_inv)
+    with stage("ik"):
+        solved = solve_targets_parallel(
+            resources.robot.dh, targets, workers=workers, chunk_size=chunk_size, solver=solver,
+        )
+    record_ik(solved)
+    solved = iter(solved)
+    # Unreachable targets are rejected up front and never reach the solver.
+    results = [next(solved) if ok else UNREACHABLE_RESULT for ok in reachable]
+    solvers = sorted({result.solver for result in results if result.solver})
+    failed = sum(1 for result in results if not result.ok)
+    warnings = [f"{failed} of {len(results)} targets failed"] if failed else []
+    return BatchSolveResponse(
+        ok=not failed,
+        results=[point_result(result) for result in results],
+        warnings=warnings,
+        meta={
+            "robot_model": resources.robot_name,
+            "tool_name": resources.tool_name,
+            "solver": ", ".join(solvers) or None,
+            "cache_hits": sum(1 for result in results if result.cache_hit),
+        },
+    )
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from typing import Optional, Sequence, TextIO
+
+import numpy as np
+
+from .kinematics import default_rotation, make_transforms, rotations_from_quaternions, rotations_from_rpy
+from .types import BatchTarget
+
+
+POSITION_COLUMNS = ("x", "y", "z")
+ORIENTATION_COLUMNS = ("roll", "pitch", "yaw")
+QUATERNION_COLUMNS = ("qw", "qx", "qy", "qz")
+
+
+@dataclass(frozen=True)
+class PoseBatch:
+    """N TCP target poses held in contiguous arrays instead of one model per pose.
+
+    ``positions`` is ``(N, 3)`` metres. ``quaternions`` (``(N, 4)``, ``w, x, y, z``)
+    and ``rpy`` (``(N, 3)`` radians) are optional and NaN in rows that do not
+    use them. As for a single :class:`Orientation`, a quaternion wins over RPY
+    and a row with neither gets the default tool rotation.
+    """
+
+    positions: np.ndarray
+    quaternions: Optional[np.ndarray] = None
+    rpy: Optional[np.ndarray] = None
+
+    def __post_init__(self) -> None:
+        positions = np.ascontiguousarray(self.positions, dtype=float).reshape(-1, 3)
+        object.__setattr__(self, "positions", positions)
+        for name, width in (("quaternions", 4), ("rpy", 3)):
+            values = getattr(self, name)
+            if values is None:
+                continue
+            values = np.ascontiguousarray(values, dtype=float)
+            if values.shape != (len(positions), width):
+                raise ValueError(f"PoseBatch {name} must have shape ({len(positions)}, {width})")
+            object.__setattr__(self, name, values)
+        if self.quaternions is not None and (np.abs(self.quaternions).sum(axis=1) == 0).any():
+            raise ValueError("Quaternion orientations must be non-zero")
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @classmethod
+    def from_targets(cls, targets: Sequence[BatchTarget]) -> "PoseBatch":
+        count = len(targets)
+        positions = np.empty((count, 3))
+        quaternions: Optional[np.ndarray] = None
+        rpy: Optional[np.ndarray] = None
+        for i, target in enumerate(targets):
+            positions[i] = (target.x, target.y, target.z)
+            orientation = target.orientation
+            if orientation is None:
+                continue
+            if orientation.quaternion:
+                if len(orientation.quaternion) != 4:
+                    raise ValueError("Quaternion orientations need four components (w, x, y, z)")
+                if quaternions is None:
+                    quaternions = np.full((count, 4), np.nan)
+                quaternions[i] = orientation.quaternion
+            elif orientation.roll is not None and orientation.pitch is not None and orientation.yaw is not None:
+                if rpy is None:
+                    rpy = np.full((count, 3), np.nan)
+                rpy[i] = (orientation.roll, orientation.pitch, orientation.yaw)
+        return cls(positions, quaternions, rpy)
+
+    @classmethod
+    def from_rows(cls, columns: Sequence[str], rows: Sequence[Sequence[str]]) -> "PoseBatch":
+        """Build from CSV cells; ``columns`` must include x, y and z."""
+        index = {name.strip(): i for i, name in enumerate(columns)}
+        if not set(POSITION_COLUMNS) <= index.keys():
+            raise ValueError("Targets CSV needs a header with x, y and z columns")
+
+        def column(name: str, required: bool) -> np.ndarray:
+            i = index[name]
+            cells = [row[i].strip() if i < len(row) else "" for row in rows]
+            if not required:
+                cells = [cell or "nan" for cell in cells]
+            try:
+                return np.array(cells, dtype=float)
+            except ValueError:
+                bad = next(cell for cell in cells if not _is_float(cell))
+                raise ValueError(f"could not convert {name}={bad!r} to a number") from None
+
+        def optional_block(names: Sequence[str]) -> Optional[np.ndarray]:
+            if not set(names) <= index.keys():
+                return None
+            block = np.column_stack([column(name, required=False) for name in names]).reshape(-1, len(names))
+            # Partially filled rows count as absent, as for a single Orientation.
+            block[~np.isfinite(block).all(axis=1)] = np.nan
+            return block
+
+        positions = np.column_stack([column(name, required=True) for name in POSITION_COLUMNS])
+        return cls(positions.reshape(-1, 3), optional_block(QUATERNION_COLUMNS), optional_block(ORIENTATION_COLUMNS))
+
+    def take(self, rows: np.ndarray) -> "PoseBatch":
+        """Select rows by boolean mask or index array."""
+        return PoseBatch(
+            self.positions[rows],
+            None if self.quaternions is None else self.quaternions[rows],
+            None if self.rpy is None else self.rpy[rows],
+        )
+
+    def rotations(self) -> np.ndarray:
+        rotations = np.repeat(default_rotation()[None], len(self), axis=0)
+        for values, convert in ((self.rpy, rotations_from_rpy), (self.quaternions, rotations_from_quaternions)):
+            if values is None:
+                continue
+            rows = ~np.isnan(values).any(axis=1)
+            if rows.any():
+                rotations[rows] = convert(values[rows])
+        return rotations
+
+    def transforms(self) -> np.ndarray:
+        """``(N, 4, 4)`` TCP target transforms."""
+        return make_transforms(self.rotations(), self.positions)
+
+    def flange_targets(self, tcp_inv: np.ndarray) -> np.ndarray:
+        """``(N, 4, 4)`` flange targets: every TCP target times the tool's inverse in one matmul."""
+        return self.transforms() @ tcp_inv
+
+
+def _is_float(cell: str) -> bool:
+    try:
+        float(cell)
+    except ValueError:
+        return False
+    return True
+
+
+def read_pose_csv(handle: TextIO) -> PoseBatch:
+    """Read a targets CSV (x,y,z plus optional roll,pitch,yaw or qw,qx,qy,qz) straight into arrays."""
+    reader = csv.reader(handle)
+    header = next(reader, None)
+    if not header or not set(POSITION_COLUMNS) <= {name.strip() for name in header}:
+        raise ValueError("Targets CSV needs a header with x, y and z columns")
+    rows = [row for row in reader if row]
+    try:
+        return PoseBatch.from_rows(header, rows)
+    except ValueError as exc:
+        # Re-parse line by line only to name the offending line.
+        for line_number, row in enumerate(rows, start=2):
+            try:
+                PoseBatch.from_rows(header, [row])
+            except ValueError as row_exc:
+                raise ValueError(f"Targets CSV line {line_number}: {row_exc}") from exc
+        raise
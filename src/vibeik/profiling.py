@@ -0,0 +1,163 @@
+"""Opt-in cProfile capture of single CLI runs and API requests.
+
+Nothing here is imported or evaluated unless profiling was asked for, apart
+from :func:`should_profile`, which is a header check and two env lookups.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+import os
+from pathlib import Path
+import random
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import uuid
+
+from .config import cache_dir, env_flag, env_int
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Vibeik-Profile"
+# Collapsed stacks deeper than this are truncated, and paths under a microsecond are
+# dropped; without both, walking a large call graph explodes combinatorially.
+MAX_STACK_DEPTH = 64
+MIN_STACK_SECONDS = 1e-6
+DEFAULT_MAX_PROFILES = 100
+_ENABLED_VALUES = {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+    pstats_path: Path
+    collapsed_path: Path
+
+
+def profile_dir() -> Path:
+    """``VIBEIK_PROFILE_DIR``, else ``profiles`` in the cache directory (or the temp dir)."""
+    configured = os.getenv("VIBEIK_PROFILE_DIR")
+    if configured:
+        return Path(configured).expanduser()
+    base = cache_dir()
+    if base is None:
+        return Path(tempfile.gettempdir()) / "vibeik-profiles"
+    return base / "profiles"
+
+
+def profile_sample_rate() -> float:
+    """Fraction of API requests profiled without the header (``VIBEIK_PROFILE_SAMPLE_RATE``, default 0)."""
+    return _parse_sample_rate(os.getenv("VIBEIK_PROFILE_SAMPLE_RATE", ""))
+
+
+@lru_cache(maxsize=8)
+def _parse_sample_rate(value: str) -> float:
+    # Parsed once per distinct value; a typo disables sampling instead of failing every request.
+    if not value.strip():
+        return 0.0
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = float("nan")
+    if not 0.0 <= rate <= 1.0:
+        logger.warning("Ignoring VIBEIK_PROFILE_SAMPLE_RATE=%r: expected a number between 0 and 1", value)
+        return 0.0
+    return rate
+
+
+def should_profile(header: Optional[str]) -> bool:
+    """Profile this request? The header only counts with ``VIBEIK_PROFILE_ALLOW_HEADER=1``.
+
+    Otherwise any client could make the server profile and write files on demand.
+    """
+    if header is not None and header.strip().lower() in _ENABLED_VALUES:
+        if env_flag("VIBEIK_PROFILE_ALLOW_HEADER"):
+            return True
+    rate = profile_sample_rate()
+    return rate > 0.0 and random.random() < rate
+
+
+def run_profiled(label: str, func: Callable[..., Any], *args: Any,
+                 directory: Optional[Path] = None, **kwargs: Any) -> Tuple[Any, ProfileReport]:
+    """Call ``func`` under cProfile and write ``<label>-<time>-<id>.pstats`` and ``.collapsed``.
+
+    The dumps are written even when ``func`` raises. Only the calling thread
+    is profiled. The oldest profiles beyond ``VIBEIK_PROFILE_MAX_FILES``
+    (default 100, 0 for no limit) are then deleted.
+    """
+    import cProfile
+
+    directory = directory or profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{label}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    report = ProfileReport(directory / f"{stem}.pstats", directory / f"{stem}.collapsed")
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(str(report.pstats_path))
+        report.collapsed_path.write_text("".join(f"{stack} {value}\n" for stack, value in collapsed_stacks(profiler)))
+        _prune(directory, env_int("VIBEIK_PROFILE_MAX_FILES", DEFAULT_MAX_PROFILES))
+    return result, report
+
+
+def _prune(directory: Path, keep: int) -> None:
+    if keep <= 0:
+        return
+    dumps = []
+    for dump in directory.glob("*.pstats"):
+        try:
+            dumps.append((dump.stat().st_mtime_ns, dump))
+        except FileNotFoundError:
+            pass  # Pruned by a concurrent request.
+    dumps.sort()
+    for _, dump in dumps[:-keep]:
+        dump.unlink(missing_ok=True)
+        dump.with_suffix(".collapsed").unlink(missing_ok=True)
+
+
+def _frame_name(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def collapsed_stacks(profiler) -> List[Tuple[str, int]]:
+    """Fold the profiler's call graph into ``a;b;c`` stacks with self time in microseconds.
+
+    cProfile keeps caller/callee edges rather than whole stacks, so each
+    function's time is split across its callers in proportion to the time
+    spent on each edge, the approximation flame-graph tools use for pstats.
+    """
+    import pstats
+
+    stats: Dict[Any, tuple] = pstats.Stats(profiler).stats
+    callees: Dict[Any, List[Any]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+    roots = [func for func, entry in stats.items() if not entry[4]]
+
+    folded: Dict[str, float] = {}
+
+    def walk(func, inclusive: float, path: List[str], on_path: set) -> None:
+        _, _, self_time, total_time, _ = stats[func]
+        path = path + [_frame_name(func)]
+        stack = ";".join(path)
+        share = inclusive / total_time if total_time else 0.0
+        folded[stack] = folded.get(stack, 0.0) + self_time * share
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee in callees.get(func, ()):
+            if callee in on_path:
+                continue
+            edge_time = stats[callee][4][func][3] * share
+            if edge_time >= MIN_STACK_SECONDS:
+                walk(callee, edge_time, path, on_path | {callee})
+
+    for root in roots:
+        walk(root, stats[root][3], [], {root})
+    return sorted((stack, round(seconds * 1e6)) for stack, seconds in folded.items() if seconds >= MIN_STACK_SECONDS)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import tempfile
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .cache import LRUCache, array_digest
+from .config import cache_dir, env_flag, env_float, env_int
+from .kinematics import fkine_batch
+
+
+DEFAULT_VOXEL_SIZE = 0.1
+DEFAULT_MARGIN = 2
+DEFAULT_SAMPLES = 200000
+_SAMPLE_CHUNK = 20000
+
+UNREACHABLE_WARNING = "Target outside reachable workspace"
+
+
+class ReachabilityMap:
+    """Voxel bitset of TCP positions reachable by a robot+tool pair.
+
+    Voxels touched by sampled configurations are dilated by ``margin`` voxels so
+    that borderline targets are passed on to the solver instead of rejected.
+    """
+
+    def __init__(self, origin: np.ndarray, voxel_size: float, shape: Tuple[int, int, int],
+                 bits: np.ndarray, margin: int) -> None:
+        self.origin = np.asarray(origin, dtype=float)
+        self.voxel_size = float(voxel_size)
+        self.shape = tuple(int(n) for n in shape)
+        self.bits = bits
+        self.margin = int(margin)
+        self._strides = np.array([self.shape[1] * self.shape[2], self.shape[2], 1])
+
+    @classmethod
+    def build(cls, dh: np.ndarray, tcp: np.ndarray, voxel_size: float = DEFAULT_VOXEL_SIZE,
+              margin: int = DEFAULT_MARGIN, samples: int = DEFAULT_SAMPLES,
+              rng_seed: int = 0) -> "ReachabilityMap":
+        rng = np.random.default_rng(rng_seed)
+        positions = []
+        for start in range(0, samples, _SAMPLE_CHUNK):
+            q = rng.uniform(-np.pi, np.pi, size=(min(_SAMPLE_CHUNK, samples - start), dh.shape[0]))
+            positions.append(fkine_batch(dh, q, tcp)[:, :3, 3])
+        points = np.concatenate(positions)
+
+        origin = points.min(axis=0) - (margin + 1) * voxel_size
+        extent = points.max(axis=0) + (margin + 1) * voxel_size - origin
+        shape = tuple(np.ceil(extent / voxel_size).astype(int) + 1)
+        grid = np.zeros(shape, dtype=bool)
+        cells = np.floor((points - origin) / voxel_size).astype(int)
+        grid[cells[:, 0], cells[:, 1], cells[:, 2]] = True
+        grid = _dilate(grid, margin)
+        return cls(origin, voxel_size, shape, np.packbits(grid.ravel()), margin)
+
+    def reachable(self, positions: np.ndarray) -> np.ndarray:
+        """Vectorized O(1) lookup for ``(N, 3)`` TCP positions."""
+        positions = np.atleast_2d(positions)
+        cells = np.floor((positions - self.origin) / self.voxel_size).astype(int)
+        inside = np.all((cells >= 0) & (cells < self.shape), axis=1)
+        flat = np.where(inside, cells @ self._strides, 0)
+        bit = (self.bits[flat >> 3] >> (7 - (flat & 7))) & 1
+        return inside & bit.astype(bool)
+
+    def is_reachable(self, position: np.ndarray) -> bool:
+        return bool(self.reachable(np.asarray(position)[None, :3])[0])
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temp file per writer, so processes saving the same map cannot clobber each other's.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, origin=self.origin, voxel_size=self.voxel_size, shape=np.array(self.shape),
+                         bits=self.bits, margin=self.margin)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "ReachabilityMap":
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(npz["origin"], float(npz["voxel_size"]), tuple(npz["shape"]),
+                       npz["bits"], int(npz["margin"]))
+
+
+def _dilate(grid: np.ndarray, margin: int) -> np.ndarray:
+    """Grow the occupied voxels by ``margin`` along each axis (a cube dilation)."""
+    for axis in range(grid.ndim):
+        source = grid
+        grid = source.copy()
+        for step in range(1, margin + 1):
+            lead = [slice(None)] * source.ndim
+            trail = [slice(None)] * source.ndim
+            lead[axis] = slice(step, None)
+            trail[axis] = slice(None, -step)
+            grid[tuple(lead)] |= source[tuple(trail)]
+            grid[tuple(trail)] |= source[tuple(lead)]
+    return grid
+
+
+MAP_CACHE_SIZE = 16
+_MAPS: LRUCache = LRUCache(maxsize=MAP_CACHE_SIZE)
+
+
+def reachability_map(dh: np.ndarray, tcp: np.ndarray) -> Optional[ReachabilityMap]:
+    """Return the cached map for a robot+tool, or None when the check is disabled.
+
+    Configured by ``VIBEIK_REACHABILITY`` (on/off), ``VIBEIK_REACH_VOXEL`` (metres),
+    ``VIBEIK_REACH_MARGIN`` (voxels) and ``VIBEIK_REACH_SAMPLES``.
+    """
+    if not env_flag("VIBEIK_REACHABILITY", True):
+        return None
+    voxel_size = env_float("VIBEIK_REACH_VOXEL", DEFAULT_VOXEL_SIZE)
+    margin = env_int("VIBEIK_REACH_MARGIN", DEFAULT_MARGIN)
+    samples = env_int("VIBEIK_REACH_SAMPLES", DEFAULT_SAMPLES)
+    key = f"{array_digest(dh)}-{array_digest(tcp)}-{voxel_size:g}-{margin}-{samples}"
+
+    def _load_or_build() -> ReachabilityMap:
+        base = cache_dir()
+        store = base / "reach" / f"{key}.npz" if base is not None else None
+        if store is not None and store.exists():
+            try:
+                return ReachabilityMap.load(store)
+            except (OSError, ValueError, KeyError):
+                pass
+        reach = ReachabilityMap.build(dh, tcp, voxel_size=voxel_size, margin=margin, samples=samples)
+        if store is not None:
+            try:
+                reach.save(store)
+            except OSError:
+                pass
+        return reach
+
+    return _MAPS.get_or_create(key, _load_or_build)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from .cache import CacheStats, LRUCache
+from .config import cache_dir
+
+
+T = TypeVar("T")
+Arrays = Dict[str, np.ndarray]
+FileStamp = Tuple[int, int]
+
+# Store layout: magic, one JSON header line, then the raw array bytes back to back.
+# Unlike ``.npz`` there is no zip container to open, so a hit costs one read.
+_MAGIC = b"VIKRC1\n"
+_SUFFIX = ".bin"
+# Below this source size the regex parse is about as fast as reading the store back.
+PERSIST_MIN_BYTES = 32 * 1024
+
+
+def _file_stamp(path: Path) -> FileStamp:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class CompiledResourceCache(Generic[T]):
+    """Two-level cache for resources compiled from MATLAB ``.m`` files.
+
+    Level one is an in-memory LRU of built resource objects, validated against
+    the file's mtime and size. Level two is one raw array file per resource in
+    the on-disk cache directory, keyed by path and validated by mtime/size or,
+    when those changed, by a content hash, so new workers skip the regex parse.
+    Sources smaller than ``persist_min_bytes`` are cheap to parse and skip level two.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        compile_text: Callable[[Path, str], Arrays],
+        build: Callable[[Path, Arrays], T],
+        maxsize: int = 256,
+        persist_min_bytes: int = PERSIST_MIN_BYTES,
+    ) -> None:
+        self.namespace = namespace
+        self._compile_text = compile_text
+        self._build = build
+        self.persist_min_bytes = persist_min_bytes
+        self._memory: LRUCache = LRUCache(maxsize=maxsize)
+
+    def load(self, path: Path) -> T:
+        stamp = _file_stamp(path)
+        key = str(path.resolve())
+        cached = self._memory.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        arrays = self._load_arrays(path, key, stamp)
+        for array in arrays.values():
+            array.setflags(write=False)
+        resource = self._build(path, arrays)
+        self._memory.put(key, (stamp, resource))
+        return resource
+
+    def clear(self, disk: bool = False) -> None:
+        self._memory.clear()
+        if disk:
+            directory = self._directory()
+            if directory is not None and directory.exists():
+                # Also drops stores left behind by older layouts.
+                for file in directory.iterdir():
+                    if file.is_file():
+                        file.unlink(missing_ok=True)
+
+    def stats(self) -> CacheStats:
+        return self._memory.stats()
+
+    def _directory(self) -> Optional[Path]:
+        base = cache_dir()
+        if base is None:
+            return None
+        return base / "resources" / self.namespace
+
+    def _store_path(self, key: str) -> Optional[Path]:
+        directory = self._directory()
+        if directory is None:
+            return None
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return directory / f"{name}{_SUFFIX}"
+
+    def _load_arrays(self, path: Path, key: str, stamp: FileStamp) -> Arrays:
+        if stamp[1] < self.persist_min_bytes:
+            return self._compile_text(path, path.read_text())
+        store = self._store_path(key)
+        stored = _read_store(store) if store is not None else None
+        if stored is not None:
+            meta, arrays = stored
+            if (meta["_mtime_ns"], meta["_size"]) == stamp:
+                return arrays
+        data = path.read_bytes()
+        digest = _content_hash(data)
+        if stored is not None and stored[0]["_sha256"] == digest:
+            arrays = stored[1]
+        else:
+            arrays = self._compile_text(path, data.decode())
+        if store is not None:
+            _write_store(store, arrays, stamp, digest)
+        return arrays
+
+
+def _read_store(store: Path) -> Optional[Tuple[dict, Arrays]]:
+    try:
+        data = store.read_bytes()
+    except OSError:
+        return None
+    if not data.startswith(_MAGIC):
+        return None
+    end = data.find(b"\n", len(_MAGIC))
+    if end < 0:
+        return None
+    try:
+        header = json.loads(data[len(_MAGIC):end])
+        meta = {key: header[key] for key in ("_mtime_ns", "_size", "_sha256")}
+        arrays = {}
+        offset = end + 1
+        for name, dtype, shape in header["arrays"]:
+            array = np.frombuffer(data, dtype=np.dtype(dtype), count=int(np.prod(shape)), offset=offset)
+            arrays[name] = array.reshape(shape)
+            offset += array.nbytes
+    except (KeyError, TypeError, ValueError):
+        return None
+    if offset != len(data):
+        return None
+    return meta, arrays
+
+
+def _write_store(store: Path, arrays: Arrays, stamp: FileStamp, digest: str) -> None:
+    # The disk layer is best effort: a read-only or full cache dir must not fail a load.
+    try:
+        store.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=store.parent, suffix=".tmp")
+    except OSError:
+        return
+    contiguous = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    header = {
+        "_mtime_ns": stamp[0],
+        "_size": stamp[1],
+        "_sha256": digest,
+        "arrays": [[name, array.dtype.str, list(array.shape)] for name, array in contiguous.items()],
+    }
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_MAGIC + json.dumps(header).encode() + b"\n")
+            for array in contiguous.values():
+                handle.write(array.tobytes())
+        os.replace(tmp_name, store)
+    except OSError:
+        Path(tmp_name).unlink(missing_ok=True)
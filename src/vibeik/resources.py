@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
+import logging
 import os
 from pathlib import Path
-import re
-from typing import Dict, Optional
+import threading
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 
+from .cache import CacheStats
 from .matlab_m_parser import extract_matrix
+from .metrics import llm_call, stage
+from .name_match import NameMatcher, llm_top_k, synonym_table
+from .resource_cache import CompiledResourceCache
+
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -18,6 +26,13 @@ class ResourceIndex:
     tools: Dict[str, Path]
     display_robot_names: Dict[str, str]
     display_tool_names: Dict[str, str]
+    robot_matcher: NameMatcher = field(init=False, repr=False, compare=False)
+    tool_matcher: NameMatcher = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        synonyms = synonym_table()
+        object.__setattr__(self, "robot_matcher", NameMatcher(self.display_robot_names, synonyms))
+        object.__setattr__(self, "tool_matcher", NameMatcher(self.display_tool_names, synonyms))
 
     def resolve_robot(self, name: str) -> Optional[Path]:
         return self.robots.get(_normalize_name(name))
@@ -29,21 +44,47 @@ class ResourceIndex:
         match = _match_resource(name, self.robots, self.display_robot_names)
         if match:
             return match
-        normalized = _normalize_name(name)
-        for key, display in self.display_robot_names.items():
-            if normalized and normalized in key:
-                return display, self.robots[key]
+        best = self.robot_matcher.best(name)
+        if best is not None:
+            return best.display, self.robots[best.key]
+        _warn_if_ambiguous("robot", name, self.robot_ties(name))
         return None
 
     def match_tool(self, name: str) -> Optional[tuple[str, Path]]:
+        match, candidates = self._match_tool_locally(name)
+        if match or not candidates:
+            return match
+        return self._tool_by_display_name(_llm_pick_candidate(name, candidates))
+
+    async def match_tool_async(self, name: str) -> Optional[tuple[str, Path]]:
+        match, candidates = self._match_tool_locally(name)
+        if match or not candidates:
+            return match
+        return self._tool_by_display_name(await _llm_pick_candidate_async(name, candidates))
+
+    def _match_tool_locally(self, name: str) -> Tuple[Optional[tuple[str, Path]], list[str]]:
+        """Return a confident local match, or the top-k names to hand to the LLM."""
         match = _match_resource(name, self.tools, self.display_tool_names)
         if match:
-            return match
+            return match, []
+        best = self.tool_matcher.best(name)
+        if best is not None:
+            return (best.display, self.tools[best.key]), []
         if not os.getenv("OPENAI_API_KEY"):
-            return None
-        if not self.display_tool_names:
-            return None
-        chosen = _llm_pick_candidate(name, list(self.display_tool_names.values()))
+            # Without the LLM there is nobody to break a tie; guessing could pick the wrong tool.
+            _warn_if_ambiguous("tool", name, self.tool_ties(name))
+            return None, []
+        ranked = self.tool_matcher.rank(name, limit=llm_top_k())
+        return None, [match.display for match in ranked]
+
+    def robot_ties(self, name: str) -> list[str]:
+        """Robots that match ``name`` equally well; more than one means the match was refused."""
+        return [match.display for match in self.robot_matcher.ties(name, limit=llm_top_k())]
+
+    def tool_ties(self, name: str) -> list[str]:
+        return [match.display for match in self.tool_matcher.ties(name, limit=llm_top_k())]
+
+    def _tool_by_display_name(self, chosen: Optional[str]) -> Optional[tuple[str, Path]]:
         if not chosen:
             return None
         reverse_map = {display: key for key, display in self.display_tool_names.items()}
@@ -66,6 +107,17 @@ class RobotResource:
 class ToolResource:
     name: str
     tcp: np.ndarray
+    tcp_inv: np.ndarray = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.tcp_inv is None:
+            object.__setattr__(self, "tcp_inv", np.linalg.inv(self.tcp))
+
+
+def _warn_if_ambiguous(kind: str, name: str, candidates: list[str]) -> None:
+    if len(candidates) > 1:
+        logger.warning("Ambiguous %s name %r matches %s equally well; not picking one",
+                       kind, name, ", ".join(candidates))
 
 
 def _normalize_name(name: str) -> str:
@@ -83,20 +135,9 @@ def _scan_directory(path: Path) -> Dict[str, Path]:
 def _match_resource(
     name: str, resources: Dict[str, Path], display_names: Dict[str, str]
 ) -> Optional[tuple[str, Path]]:
-    lowered = name.lower()
-    for key, display in display_names.items():
-        if display.lower() == lowered:
-            return display, resources[key]
     normalized = _normalize_name(name)
     if normalized in resources:
         return display_names[normalized], resources[normalized]
-    synonyms = {"drilling": "drill"}
-    alt_name = name
-    for src, dst in synonyms.items():
-        alt_name = re.sub(src, dst, alt_name, flags=re.IGNORECASE)
-    alt_normalized = _normalize_name(alt_name)
-    if alt_normalized in resources:
-        return display_names[alt_normalized], resources[alt_normalized]
     return None
 
 
@@ -107,10 +148,34 @@ def _llm_pick_candidate(query: str, candidates: list[str]) -> Optional[str]:
     if not api_key:
         return None
     try:
-        from openai import OpenAI
+        from .llm import get_client
+
+        client = get_client(api_key)
+    except ModuleNotFoundError:
+        return None
+    with llm_call("tool_match"):
+        response = client.responses.create(**_tool_match_request(query, candidates))
+    return _candidate_from_output(response.output_text, candidates)
+
+
+async def _llm_pick_candidate_async(query: str, candidates: list[str]) -> Optional[str]:
+    if not candidates:
+        return None
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    try:
+        from .llm import get_async_client
+
+        client = get_async_client(api_key)
     except ModuleNotFoundError:
         return None
-    client = OpenAI(api_key=api_key)
+    with llm_call("tool_match"):
+        response = await client.responses.create(**_tool_match_request(query, candidates))
+    return _candidate_from_output(response.output_text, candidates)
+
+
+def _tool_match_request(query: str, candidates: list[str]) -> dict:
     schema = {
         "type": "object",
         "properties": {
@@ -124,23 +189,26 @@ def _llm_pick_candidate(query: str, candidates: list[str]) -> Optional[str]:
         "required": ["tool_id"],
         "additionalProperties": False,
     }
-    response = client.responses.create(
-    model="gpt-5-mini",
-    input=[
-        {"role": "system", "content": "Select the best matching tool_id from the provided list. Return null if none match."},
-        {"role": "user", "content": f"Query: {query}\nCandidates: {candidates}"},
-    ],
-    text={
-        "format": {
-            "type": "json_schema",
-            "name": "tool_match",
-            "strict": True,
-            "schema": schema,
-        }
-    },
+    return dict(
+        model="gpt-5-mini",
+        input=[
+            {"role": "system", "content": "Select the best matching tool_id from the provided list. Return null if none match."},
+            {"role": "user", "content": f"Query: {query}\nCandidates: {candidates}"},
+        ],
+        text={
+            "format": {
+                "type": "json_schema",
+                "name": "tool_match",
+                "strict": True,
+                "schema": schema,
+            }
+        },
     )
+
+
+def _candidate_from_output(output_text: str, candidates: list[str]) -> Optional[str]:
     try:
-        payload = json.loads(response.output_text)
+        payload = json.loads(output_text)
     except json.JSONDecodeError:
         return None
     tool_id = payload.get("tool_id")
@@ -161,19 +229,141 @@ def build_resource_index(base_dir: Path) -> ResourceIndex:
                          display_tool_names=display_tool_names)
 
 
-def load_robot(path: Path) -> RobotResource:
-    text = path.read_text()
+FileStamp = Tuple[int, int]
+
+
+class _DirectoryState:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.dir_mtime: Optional[int] = None
+        self.stamps: Dict[str, FileStamp] = {}
+        self.entries: Dict[str, Path] = {}
+
+    def refresh(self) -> bool:
+        """Re-index only the ``.m`` files added, removed or changed since the last call."""
+        try:
+            dir_mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            changed = bool(self.entries)
+            self.dir_mtime = None
+            self.stamps = {}
+            self.entries = {}
+            return changed
+        if dir_mtime == self.dir_mtime:
+            return False
+        self.dir_mtime = dir_mtime
+
+        stamps: Dict[str, FileStamp] = {}
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.startswith(".") or not entry.name.endswith(".m"):
+                    continue
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                stamps[entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = False
+        for filename in self.stamps.keys() - stamps.keys():
+            key = _normalize_name(Path(filename).stem)
+            if self.entries.get(key) == self.path / filename:
+                del self.entries[key]
+            changed = True
+        for filename, stamp in stamps.items():
+            if self.stamps.get(filename) == stamp:
+                continue
+            file = self.path / filename
+            self.entries[_normalize_name(file.stem)] = file
+            changed = True
+        self.stamps = stamps
+        return changed
+
+
+class LiveResourceIndex:
+    """A ResourceIndex that stays current with the resource directories.
+
+    Each call to :meth:`current` stats the two resource directories and only
+    lists them again when their mtime changed, so the request path does not
+    grow with the size of the resource library.
+    """
+
+    def __init__(self, base_dir: Path) -> None:
+        self.base_dir = base_dir
+        self._robots = _DirectoryState(base_dir / "RobotModels")
+        self._tools = _DirectoryState(base_dir / "Tools")
+        self._lock = threading.Lock()
+        self._index: Optional[ResourceIndex] = None
+
+    def current(self) -> ResourceIndex:
+        with stage("index"), self._lock:
+            robots_changed = self._robots.refresh()
+            tools_changed = self._tools.refresh()
+            if self._index is None or robots_changed or tools_changed:
+                robots = dict(self._robots.entries)
+                tools = dict(self._tools.entries)
+                self._index = ResourceIndex(
+                    robots=robots,
+                    tools=tools,
+                    display_robot_names={k: v.stem for k, v in robots.items()},
+                    display_tool_names={k: v.stem for k, v in tools.items()},
+                )
+            return self._index
+
+
+_LIVE_INDEXES: Dict[Path, LiveResourceIndex] = {}
+_LIVE_INDEXES_LOCK = threading.Lock()
+
+
+def shared_resource_index(base_dir: Path) -> LiveResourceIndex:
+    """Return the process-wide live index for ``base_dir``."""
+    key = base_dir.resolve()
+    with _LIVE_INDEXES_LOCK:
+        live = _LIVE_INDEXES.get(key)
+        if live is None:
+            live = LiveResourceIndex(key)
+            _LIVE_INDEXES[key] = live
+        return live
+
+
+def _compile_robot(path: Path, text: str) -> Dict[str, np.ndarray]:
     try:
         parsed = extract_matrix(text, ["DH", "dh", "DH_table"], expected_shape=(6, 4))
     except ValueError as exc:
         raise ValueError(f"Robot file {path.name} is missing a DH matrix") from exc
-    return RobotResource(name=path.stem, dh=parsed.value)
+    return {"dh": parsed.value}
 
 
-def load_tool(path: Path) -> ToolResource:
-    text = path.read_text()
+def _compile_tool(path: Path, text: str) -> Dict[str, np.ndarray]:
     try:
         parsed = extract_matrix(text, ["T_TCP", "TCP", "tcp", "tool"], expected_shape=(4, 4))
     except ValueError as exc:
         raise ValueError(f"Tool file {path.name} is missing a TCP transform") from exc
-    return ToolResource(name=path.stem, tcp=parsed.value)
+    return {"tcp": parsed.value, "tcp_inv": np.linalg.inv(parsed.value)}
+
+
+_ROBOT_CACHE: CompiledResourceCache[RobotResource] = CompiledResourceCache(
+    "robots", _compile_robot, lambda path, arrays: RobotResource(name=path.stem, dh=arrays["dh"])
+)
+_TOOL_CACHE: CompiledResourceCache[ToolResource] = CompiledResourceCache(
+    "tools",
+    _compile_tool,
+    lambda path, arrays: ToolResource(name=path.stem, tcp=arrays["tcp"], tcp_inv=arrays["tcp_inv"]),
+)
+
+
+def load_robot(path: Path) -> RobotResource:
+    return _ROBOT_CACHE.load(path)
+
+
+def load_tool(path: Path) -> ToolResource:
+    return _TOOL_CACHE.load(path)
+
+
+def clear_resource_cache(disk: bool = False) -> None:
+    """Forget loaded robots/tools; with ``disk=True`` also delete compiled files."""
+    _ROBOT_CACHE.clear(disk=disk)
+    _TOOL_CACHE.clear(disk=disk)
+
+
+def resource_cache_stats() -> Dict[str, CacheStats]:
+    return {"robots": _ROBOT_CACHE.stats(), "tools": _TOOL_CACHE.stats()}
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import re
+from typing import List, Optional, Tuple
+
+from .config import env_float
+from .types import Orientation, ParsedInstruction, TargetPosition
+
+
+DEFAULT_MIN_CONFIDENCE = 0.8
+
+_NUM = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_LENGTH_UNIT = r"(?:mm|cm|m|millimet(?:er|re)s?|centimet(?:er|re)s?|met(?:er|re)s?)\b"
+_ANGLE_UNIT = r"(?:°|deg(?:rees?)?\b|rad(?:ians?)?\b)"
+_SEP = r"\s*[,;]?\s*"
+
+_STOPWORDS = r"(?:of|the|an?|to|at|with|and|robot|tool)\b"
+_NAME_WORD = rf"(?!{_STOPWORDS})[\w.-]+"
+
+_ROBOT_PATTERNS = [
+    re.compile(r"\b(?:using|use|with)\s+(?:the|an?|my)\s+(.+?)\s+robot\b", re.IGNORECASE),
+    re.compile(r"\brobot\s*(?:[:=]|named|called)\s*[\"']?([\w .-]+?)[\"']?(?=[,;]|\.\s|\.$|\s+(?:and|with|to|at)\b|$)",
+               re.IGNORECASE),
+    re.compile(r"\b(?:using|use)\s+(.+?)\s+robot\b", re.IGNORECASE),
+]
+_TOOL_PATTERNS = [
+    re.compile(rf"\b(?:an?|the|my)\s+((?:{_NAME_WORD}\s+){{0,3}}{_NAME_WORD})\s+tool\b", re.IGNORECASE),
+    re.compile(r"\btool\s*(?:[:=]|named|called)\s*[\"']?([\w .-]+?)[\"']?(?=[,;]|\.\s|\.$|\s+(?:and|with|to|at)\b|$)",
+               re.IGNORECASE),
+]
+
+_COORD = rf"({_NUM})\s*({_LENGTH_UNIT})?"
+_BRACKET_VECTOR = re.compile(
+    rf"(?:\b(to|at)\s+)?[\[(]\s*{_COORD}{_SEP}{_COORD}{_SEP}{_COORD}\s*[\])]\s*({_LENGTH_UNIT})?",
+    re.IGNORECASE,
+)
+_BARE_VECTOR = re.compile(
+    rf"\b(to|at)\s+{_COORD}\s*,\s*{_COORD}\s*,\s*{_COORD}",
+    re.IGNORECASE,
+)
+_NAMED_VECTOR = re.compile(
+    rf"\bx\s*[=:]\s*{_COORD}{_SEP}y\s*[=:]\s*{_COORD}{_SEP}z\s*[=:]\s*{_COORD}",
+    re.IGNORECASE,
+)
+
+_ANGLE = rf"({_NUM})\s*({_ANGLE_UNIT})?"
+_RPY_VECTOR = re.compile(
+    rf"\b(?:rpy|roll\s*[,/-]?\s*pitch\s*[,/-]?\s*yaw)\s*(?:of|[=:])?\s*"
+    rf"[\[(]\s*{_ANGLE}{_SEP}{_ANGLE}{_SEP}{_ANGLE}\s*[\])]\s*({_ANGLE_UNIT})?",
+    re.IGNORECASE,
+)
+_RPY_NAMED = {
+    axis: re.compile(rf"\b{axis}\s*(?:of|[=:])?\s*{_ANGLE}", re.IGNORECASE)
+    for axis in ("roll", "pitch", "yaw")
+}
+_QUATERNION = re.compile(
+    rf"\b(?:quaternion|quat)\s*(?:\(?\s*w\s*,\s*x\s*,\s*y\s*,\s*z\s*\)?)?\s*(?:of|[=:])?\s*"
+    rf"[\[(]\s*({_NUM}){_SEP}({_NUM}){_SEP}({_NUM}){_SEP}({_NUM})\s*[\])]",
+    re.IGNORECASE,
+)
+# Outside the names and the target vector, any length or these words make the vector an
+# offset, a waypoint or a point in another frame rather than the target.
+_RELATIVE_TARGET = re.compile(
+    rf"(?<![\w.]){_NUM}\s*{_LENGTH_UNIT}"
+    r"|\b(?:above|below|beneath|under|over|left|right|behind|front|offset|relative|frame|from|then"
+    r"|away|closer|further|past|beyond|shift\w*)\b",
+    re.IGNORECASE,
+)
+_ORIENTATION_HINT = re.compile(
+    r"\b(?:orient\w*|rotat\w*|tilt\w*|facing|pointing|roll|pitch|yaw|quaternion|quat|rpy|euler)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class RuleParse:
+    """Outcome of the deterministic parser: the instruction (if any) and a 0..1 confidence."""
+
+    parsed: Optional[ParsedInstruction]
+    confidence: float
+
+
+def min_confidence() -> float:
+    """Confidence needed to skip the LLM (``VIBEIK_PARSE_MIN_CONFIDENCE``)."""
+    return env_float("VIBEIK_PARSE_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE)
+
+
+def parse_with_rules(text: str) -> RuleParse:
+    """Parse an instruction with the deterministic grammar.
+
+    Understands ``mm``/``cm``/``m`` coordinates in brackets, ``x=.. y=.. z=..`` or
+    after "to"/"at", plus roll/pitch/yaw (``deg`` or ``rad``) and ``w, x, y, z``
+    quaternion orientations. Each ambiguity lowers the confidence.
+    """
+    penalty = 0.0
+
+    robot, robot_spans, robot_penalty = _find_name(text, _ROBOT_PATTERNS)
+    tool, tool_spans, tool_penalty = _find_name(text, _TOOL_PATTERNS)
+    if robot is None or tool is None:
+        return RuleParse(None, 0.0)
+    penalty += robot_penalty + tool_penalty
+
+    orientation, spans, orientation_penalty = _find_orientation(text)
+    penalty += orientation_penalty
+
+    masked = _mask(text, spans)
+    target, target_spans, target_penalty = _find_target(masked)
+    if target is None:
+        return RuleParse(None, 0.0)
+    penalty += target_penalty
+
+    if _RELATIVE_TARGET.search(_mask(masked, robot_spans + tool_spans + target_spans)):
+        # "100mm above [..]", "relative to ..", "in the tool frame": the vector is not the
+        # target itself, and the grammar cannot apply the offset or frame, so defer to the LLM.
+        return RuleParse(None, 0.0)
+
+    parsed = ParsedInstruction(robot_model=robot, tool_name=tool, target=target, orientation=orientation, task=None)
+    return RuleParse(parsed, max(0.0, 1.0 - penalty))
+
+
+Span = Tuple[int, int]
+
+
+def _mask(text: str, spans: List[Span]) -> str:
+    for start, end in spans:
+        text = text[:start] + " " * (end - start) + text[end:]
+    return text
+
+
+def _find_name(text: str, patterns: List[re.Pattern]) -> Tuple[Optional[str], List[Span], float]:
+    for rank, pattern in enumerate(patterns):
+        matches = [match for match in pattern.finditer(text) if match.group(1).strip()]
+        if matches:
+            names = [match.group(1).strip() for match in matches]
+            penalty = 0.1 * rank
+            if len({name.lower() for name in names}) > 1:
+                penalty += 0.4
+            return names[-1], [match.span(1) for match in matches], penalty
+    return None, [], 0.0
+
+
+def _length(value: str, unit: str) -> float:
+    unit = unit.lower()
+    if unit.startswith(("mm", "milli")):
+        return float(value) * 1e-3
+    if unit.startswith("c"):
+        return float(value) * 1e-2
+    return float(value)
+
+
+def _vector_units(
+    units: List[Optional[str]], trailing_unit: Optional[str], listed: bool
+) -> Optional[List[Optional[str]]]:
+    """Units per component, or None when only some components have one.
+
+    A unit after a bracket applies to every component, as does a unit on only
+    the last component of a listed ``a, b, c mm`` vector.
+    """
+    if trailing_unit:
+        units = [unit or trailing_unit for unit in units]
+    elif listed and units[-1] and not any(units[:-1]):
+        units = [units[-1]] * len(units)
+    if any(units) and not all(units):
+        return None
+    return units
+
+
+def _find_target(text: str) -> Tuple[Optional[TargetPosition], List[Span], float]:
+    candidates = []
+    spans = []
+    for match in _BRACKET_VECTOR.finditer(text):
+        preposition, *groups = match.groups()
+        candidates.append((match.start(), groups[:6], groups[6], preposition is not None, True))
+        spans.append(match.span())
+    for match in _BARE_VECTOR.finditer(text):
+        candidates.append((match.start(), list(match.groups()[1:]), None, True, True))
+        spans.append(match.span())
+    for match in _NAMED_VECTOR.finditer(text):
+        candidates.append((match.start(), list(match.groups()), None, True, False))
+        spans.append(match.span())
+    if not candidates:
+        return None, [], 0.0
+
+    vectors = []
+    for _, groups, trailing_unit, anchored, listed in sorted(candidates, key=lambda candidate: candidate[0]):
+        units = _vector_units(list(groups[1::2]), trailing_unit, listed)
+        if units is None:
+            # "[1500 mm, 100, 1000]": guessing the missing units would move the robot
+            # somewhere nobody asked for, so leave the instruction to the LLM.
+            return None, [], 0.0
+        # Unitless coordinates are read as metres.
+        values = [_length(value, unit or "m") for value, unit in zip(groups[0::2], units)]
+        vectors.append((values, all(units), anchored))
+
+    penalty = 0.0
+    if len({tuple(round(v, 9) for v in values) for values, _, _ in vectors}) > 1:
+        penalty += 0.5
+    values, all_units, anchored = vectors[-1]
+    if not all_units:
+        # Metres is only a guess; keep it below the default threshold.
+        penalty += 0.3
+    if not anchored:
+        penalty += 0.1
+    return TargetPosition(x=values[0], y=values[1], z=values[2]), spans, penalty
+
+
+def _angle(value: str, unit: Optional[str], default_unit: Optional[str]) -> Tuple[float, bool]:
+    unit = (unit or default_unit or "").lower()
+    if not unit:
+        return float(value), False
+    if unit.startswith("rad"):
+        return float(value), True
+    return math.radians(float(value)), True
+
+
+def _find_orientation(text: str) -> Tuple[Optional[Orientation], List[Tuple[int, int]], float]:
+    match = _QUATERNION.search(text)
+    if match:
+        w, x, y, z = (float(value) for value in match.groups())
+        norm = math.sqrt(w * w + x * x + y * y + z * z)
+        if norm < 1e-9:
+            return None, [match.span()], 1.0
+        quaternion = [w / norm, x / norm, y / norm, z / norm]
+        return Orientation(quaternion=quaternion), [match.span()], 0.0
+
+    match = _RPY_VECTOR.search(text)
+    if match:
+        groups = match.groups()
+        angles = [_angle(value, unit, groups[6]) for value, unit in zip(groups[0:6:2], groups[1:6:2])]
+        return _rpy(angles), [match.span()], _angle_penalty(angles)
+
+    named = {axis: pattern.search(text) for axis, pattern in _RPY_NAMED.items()}
+    if all(named.values()):
+        angles = [_angle(named[axis].group(1), named[axis].group(2), None) for axis in ("roll", "pitch", "yaw")]
+        return _rpy(angles), [m.span() for m in named.values()], _angle_penalty(angles)
+
+    if _ORIENTATION_HINT.search(text):
+        # Orientation is mentioned but not in a form we understand.
+        return None, [], 0.5
+    return None, [], 0.0
+
+
+def _rpy(angles: List[Tuple[float, bool]]) -> Orientation:
+    roll, pitch, yaw = (value for value, _ in angles)
+    return Orientation(roll=roll, pitch=pitch, yaw=yaw)
+
+
+def _angle_penalty(angles: List[Tuple[float, bool]]) -> float:
+    # Unitless angles are read as radians, which is a guess worth checking.
+    return 0.0 if all(has_unit for _, has_unit in angles) else 0.3
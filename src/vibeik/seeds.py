@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from .cache import LRUCache, array_digest
+from .config import cache_dir, env_int
+from .kinematics import fkine_batch
+
+
+DEFAULT_SAMPLES = 20000
+# Metres of position error treated as equivalent to one unit of rotation-column error.
+ORIENTATION_WEIGHT = 0.3
+
+
+def pose_features(poses: np.ndarray) -> np.ndarray:
+    """Map ``(N, 4, 4)`` poses to k-d tree features: position plus weighted x/z axes."""
+    poses = np.asarray(poses).reshape(-1, 4, 4)
+    return np.concatenate(
+        [poses[:, :3, 3], ORIENTATION_WEIGHT * poses[:, :3, 0], ORIENTATION_WEIGHT * poses[:, :3, 2]],
+        axis=1,
+    )
+
+
+class SeedIndex:
+    """Joint-space samples indexed by their flange pose for nearest-neighbour IK seeds."""
+
+    def __init__(self, q: np.ndarray, features: np.ndarray) -> None:
+        from scipy.spatial import cKDTree
+
+        self.q = q
+        self.features = features
+        self._tree = cKDTree(features)
+
+    @classmethod
+    def build(cls, dh: np.ndarray, samples: int = DEFAULT_SAMPLES, rng_seed: int = 0) -> "SeedIndex":
+        rng = np.random.default_rng(rng_seed)
+        q = rng.uniform(-np.pi, np.pi, size=(samples, dh.shape[0]))
+        return cls(q, pose_features(fkine_batch(dh, q)))
+
+    def nearest(self, target: np.ndarray, k: int = 4) -> np.ndarray:
+        """Return up to ``k`` joint seeds whose flange poses are closest to ``target``."""
+        k = min(k, len(self.q))
+        _, indices = self._tree.query(pose_features(target)[0], k=k)
+        return self.q[np.atleast_1d(indices)]
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temp file per writer, so processes saving the same index cannot clobber each other's.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, q=self.q, features=self.features)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "SeedIndex":
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(npz["q"], npz["features"])
+
+
+_SEED_INDEXES: LRUCache = LRUCache(maxsize=8)
+
+
+def _store_path(digest: str) -> Optional[Path]:
+    base = cache_dir()
+    if base is None:
+        return None
+    return base / "seeds" / f"{digest}.npz"
+
+
+def seed_index(dh: np.ndarray) -> SeedIndex:
+    """Return the seed index for ``dh``, loading or building and persisting it once."""
+    digest = array_digest(dh)
+
+    def _load_or_build() -> SeedIndex:
+        store = _store_path(digest)
+        if store is not None and store.exists():
+            try:
+                return SeedIndex.load(store)
+            except (OSError, ValueError, KeyError):
+                pass
+        index = SeedIndex.build(dh, samples=env_int("VIBEIK_SEED_SAMPLES", DEFAULT_SAMPLES))
+        if store is not None:
+            try:
+                index.save(store)
+            except OSError:
+                pass
+        return index
+
+    return _SEED_INDEXES.get_or_create(digest, _load_or_build)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import csv
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+import numpy as np
+from pydantic import ValidationError
+
+from .ik import SOLVER_AUTO, check_solver, solve_ik
+from .metrics import record_ik
+from .pipeline import UNREACHABLE_RESULT, ResolvedResources, point_result
+from .poses import PoseBatch
+from .reachability import reachability_map
+from .types import BatchTarget, StreamPointResult
+
+
+INPUT_FORMATS = ("csv", "ndjson")
+
+
+class TargetLineParser:
+    """Turn CSV (header first) or NDJSON lines into one-pose batches one line at a time.
+
+    CSV cells go straight into arrays; only NDJSON lines are validated as models.
+    """
+
+    def __init__(self, input_format: str = "csv") -> None:
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unknown input format: {input_format}")
+        self.input_format = input_format
+        self._columns: Optional[List[str]] = None
+
+    def feed(self, line: str) -> Optional[PoseBatch]:
+        """Return the pose on ``line``, or None for blank and header lines."""
+        line = line.strip()
+        if not line:
+            return None
+        if self.input_format == "ndjson":
+            try:
+                return PoseBatch.from_targets([BatchTarget.model_validate_json(line)])
+            except ValidationError as exc:
+                raise ValueError(f"invalid target: {exc.errors()[0]['msg']}") from exc
+        values = next(csv.reader([line]))
+        if self._columns is None:
+            columns = [value.strip() for value in values]
+            if not {"x", "y", "z"} <= set(columns):
+                raise ValueError("Targets CSV needs a header with x, y and z columns")
+            self._columns = columns
+            return None
+        return PoseBatch.from_rows(self._columns, [values])
+
+
+class StreamSolver:
+    """Solve targets one at a time, warm-starting each from the last good solution."""
+
+    def __init__(self, resources: ResolvedResources, solver: str = SOLVER_AUTO) -> None:
+        self.resources = resources
+        self.solver = check_solver(solver)
+        self._reach = reachability_map(resources.robot.dh, resources.tool.tcp)
+        self._seed: Optional[np.ndarray] = None
+        self._index = 0
+
+    def solve(self, pose: PoseBatch) -> StreamPointResult:
+        """Solve the single pose in ``pose``."""
+        if self._reach is not None and not self._reach.is_reachable(pose.positions[0]):
+            result = UNREACHABLE_RESULT
+        else:
+            target = pose.flange_targets(self.resources.tool.tcp_inv)[0]
+            result = solve_ik(self.resources.robot.dh, target, solver=self.solver, q0=self._seed)
+            record_ik([result])
+        if result.ok:
+            self._seed = result.joint_angles
+        point = StreamPointResult(index=self._index, **point_result(result).model_dump())
+        self._index += 1
+        return point
+
+    def fail(self, warning: str) -> StreamPointResult:
+        point = StreamPointResult(index=self._index, ok=False, warning=warning)
+        self._index += 1
+        return point
+
+    def feed(self, parser: TargetLineParser, line: str) -> Optional[StreamPointResult]:
+        try:
+            pose = parser.feed(line)
+        except ValueError as exc:
+            return self.fail(str(exc))
+        if pose is None:
+            return None
+        return self.solve(pose)
+
+
+def stream_solve(
+    resources: ResolvedResources, lines: Iterable[str], input_format: str = "csv", solver: str = SOLVER_AUTO
+) -> Iterator[StreamPointResult]:
+    """Lazily solve every target in ``lines``; memory does not grow with path length."""
+    parser = TargetLineParser(input_format)
+    stream = StreamSolver(resources, solver)
+    for line in lines:
+        point = stream.feed(parser, line)
+        if point is not None:
+            yield point
+
+
+async def aiter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split an async byte stream (such as a request body) into text lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode()
+    if buffer:
+        yield buffer.decode()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+
+# Hard ceiling for BatchSolveRequest.workers; the server also clamps it to its pool size.
+MAX_BATCH_WORKERS = 64
 
 
 class TargetPosition(BaseModel):
@@ -18,6 +22,16 @@ class Orientation(BaseModel):
     quaternion: Optional[List[float]] = None
     keyword: Optional[str] = None
 
+    @field_validator("quaternion")
+    @classmethod
+    def _check_quaternion(cls, value: Optional[List[float]]) -> Optional[List[float]]:
+        if value:
+            if len(value) != 4:
+                raise ValueError("Quaternion orientations need four components (w, x, y, z)")
+            if not any(value):
+                raise ValueError("Quaternion orientations must be non-zero")
+        return value
+
 
 class ParsedInstruction(BaseModel):
     robot_model: str
@@ -29,6 +43,9 @@ class ParsedInstruction(BaseModel):
 
 class SolveRequest(BaseModel):
     text: str = Field(..., description="Natural language instruction")
+    use_parse_cache: bool = Field(True, description="Reuse cached LLM parses of identical instructions")
+    include_timings: bool = Field(False, description="Report per-stage durations in meta.timings_ms")
+    solver: str = Field("auto", description="IK backend: auto, analytic, numpy_lm, ikine_LM or a registered name")
 
 
 class SolveMeta(BaseModel):
@@ -36,8 +53,11 @@ class SolveMeta(BaseModel):
     tool_name: Optional[str] = None
     residual_error: Optional[float] = None
     solver: Optional[str] = None
+    cache_hit: Optional[bool] = None
+    cache_hits: Optional[int] = None
     notes: Optional[List[str]] = None
     raw: Optional[Any] = None
+    timings_ms: Optional[Dict[str, float]] = None
 
 
 class SolveResponse(BaseModel):
@@ -46,3 +66,37 @@ class SolveResponse(BaseModel):
     joint_angles_deg: Optional[List[float]] = None
     warnings: List[str] = Field(default_factory=list)
     meta: SolveMeta = Field(default_factory=SolveMeta)
+
+
+class BatchTarget(TargetPosition):
+    orientation: Optional[Orientation] = None
+
+
+class BatchSolveRequest(BaseModel):
+    robot_model: str
+    tool_name: str
+    targets: List[BatchTarget]
+    workers: Optional[int] = Field(
+        None, ge=1, le=MAX_BATCH_WORKERS,
+        description="Chunks solved concurrently; defaults to VIBEIK_WORKERS and is capped at the server's pool size",
+    )
+    chunk_size: Optional[int] = Field(None, ge=1, description="Targets per worker task")
+    solver: str = Field("auto", description="IK backend, as for SolveRequest")
+
+
+class BatchPointResult(BaseModel):
+    ok: bool
+    joint_angles_rad: Optional[List[float]] = None
+    residual_error: Optional[float] = None
+    warning: Optional[str] = None
+
+
+class StreamPointResult(BatchPointResult):
+    index: int
+
+
+class BatchSolveResponse(BaseModel):
+    ok: bool
+    results: List[BatchPointResult] = Field(default_factory=list)
+    warnings: List[str] = Field(default_factory=list)
+    meta: SolveMeta = Field(default_factory=SolveMeta)
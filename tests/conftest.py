@@ -3,7 +3,23 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path_factory, monkeypatch):
+    monkeypatch.setenv("VIBEIK_CACHE_DIR", str(tmp_path_factory.getbasetemp() / "vibeik-cache"))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_ik_cache():
+    from vibeik.ik_cache import reset_ik_cache
+
+    reset_ik_cache()
+    yield
+    reset_ik_cache()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from vibeik.analytic_ik import solve_spherical_wrist, spherical_wrist_geometry
+from vibeik.ik import solve_ik
+from vibeik.kinematics import fkine
+from vibeik.resources import load_robot
+
+
+ROBOT_PATH = Path(__file__).resolve().parents[1] / "RobotResources" / "RobotModels" / "KUKA KR120R2500.m"
+
+
+def _angle_diff(a, b):
+    return (a - b + np.pi) % (2 * np.pi) - np.pi
+
+
+def test_kuka_dh_is_detected_as_spherical_wrist():
+    dh = load_robot(ROBOT_PATH).dh
+    assert spherical_wrist_geometry(dh) is not None
+    bent = dh.copy()
+    bent[3, 1] = 0.1  # a4 != 0 moves the wrist centre off the last axes
+    assert spherical_wrist_geometry(bent) is None
+
+
+def test_analytic_solutions_reproduce_random_poses():
+    dh = load_robot(ROBOT_PATH).dh
+    geometry = spherical_wrist_geometry(dh)
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        q = rng.uniform(-np.pi, np.pi, size=6)
+        target = fkine(dh, q)
+        solutions = solve_spherical_wrist(geometry, target)
+        assert 1 <= len(solutions) <= 8
+        for solution in solutions:
+            assert np.allclose(fkine(dh, solution.q), target, atol=1e-8)
+        assert min(np.abs(_angle_diff(s.q, q)).max() for s in solutions) < 1e-6
+
+
+def test_solve_ik_reports_analytic_solver_and_picks_seed_branch():
+    dh = load_robot(ROBOT_PATH).dh
+    q = np.array([0.3, -0.8, 0.4, 0.5, 0.7, -0.2])
+    result = solve_ik(dh, fkine(dh, q), q0=q)
+    assert result.ok
+    assert result.solver == "analytic"
+    assert np.allclose(result.joint_angles, q, atol=1e-8)
+    assert result.solutions.shape[1] == 6
+
+
+def test_analytic_solver_rejects_unreachable_target():
+    dh = load_robot(ROBOT_PATH).dh
+    target = np.eye(4)
+    target[:3, 3] = [10.0, 0.0, 0.0]
+    result = solve_ik(dh, target, solver="analytic")
+    assert result.ok is False
+    assert result.solver == "analytic"
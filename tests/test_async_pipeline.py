@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from vibeik import llm
+from vibeik.cli import RESOURCE_INDEX
+from vibeik.pipeline import solve_instruction_async
+from vibeik.types import ParsedInstruction, TargetPosition
+
+
+async def _slow_llm_parse(text, api_key):
+    await asyncio.sleep(0.2)
+    return ParsedInstruction(
+        robot_model="KR120R2500",
+        tool_name="Drill_8mm",
+        target=TargetPosition(x=1.5, y=0.1, z=1.0),
+    )
+
+
+def test_llm_parses_overlap_on_the_event_loop(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("vibeik.nl_parse._parse_with_llm_async", _slow_llm_parse)
+
+    async def _run():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            index = RESOURCE_INDEX.current()
+            # Warm the resource and reachability caches before timing.
+            await solve_instruction_async("warm up", index, executor, use_parse_cache=False)
+            texts = [f"instruction {i}" for i in range(4)]
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(solve_instruction_async(text, index, executor, use_parse_cache=False) for text in texts)
+            )
+            return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(_run())
+    assert all(response.ok for response in responses)
+    assert elapsed < 0.6
+
+
+def test_async_client_is_shared(monkeypatch):
+    pytest.importorskip("openai")
+    monkeypatch.setattr(llm, "_ASYNC_CLIENT", None)
+    monkeypatch.setenv("VIBEIK_LLM_TIMEOUT", "5")
+    first = llm.get_async_client("test-key")
+    assert llm.get_async_client("test-key") is first
+    assert first.timeout == 5.0
+    asyncio.run(llm.close_async_client())
+
+
+def test_resource_loading_runs_in_the_executor(monkeypatch):
+    from vibeik import pipeline
+    from vibeik.pipeline import resolve_resources_async
+
+    threads = []
+    load_robot = pipeline.load_robot
+
+    def _recording_load_robot(path):
+        threads.append(threading.current_thread().name)
+        return load_robot(path)
+
+    monkeypatch.setattr(pipeline, "load_robot", _recording_load_robot)
+
+    async def _run():
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="loader") as executor:
+            return await resolve_resources_async(RESOURCE_INDEX.current(), "KR120R2500", "Drill_8mm", executor)
+
+    resources = asyncio.run(_run())
+    assert resources.robot.dh.shape == (6, 4)
+    assert threads and threads[0].startswith("loader")
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import io
+
+from fastapi.testclient import TestClient
+import numpy as np
+from pydantic import ValidationError
+import pytest
+
+from vibeik.api import app
+from vibeik.cli import run_batch
+from vibeik.parallel import shutdown_pool
+from vibeik.poses import read_pose_csv
+from vibeik.types import BatchSolveRequest, BatchTarget
+
+
+def test_read_pose_csv_parses_positions_and_orientations():
+    handle = io.StringIO(
+        "x,y,z,roll,pitch,yaw\n"
+        "1.5,0.1,1.0,,,\n"
+        "1.4,0.0,0.9,0,3.14159,0\n"
+    )
+    poses = read_pose_csv(handle)
+    assert poses.positions[:, 0].tolist() == [1.5, 1.4]
+    assert np.isnan(poses.rpy[0]).all()
+    assert poses.rpy[1, 1] == pytest.approx(3.14159)
+
+
+def test_read_pose_csv_requires_xyz_header():
+    with pytest.raises(ValueError):
+        read_pose_csv(io.StringIO("a,b,c\n1,2,3\n"))
+
+
+def test_batch_solve_returns_one_result_per_target():
+    targets = [BatchTarget(x=1.5, y=0.1 * i, z=1.0) for i in range(5)]
+    targets.append(BatchTarget(x=10.0, y=0.0, z=0.0))
+    response = run_batch("KR120R2500", "Drill_8mm", targets)
+    assert len(response.results) == 6
+    assert all(result.ok for result in response.results[:5])
+    assert response.results[-1].ok is False
+    assert response.ok is False
+    assert response.meta.solver == "analytic"
+    # Warm starts keep neighbouring holes on the same branch.
+    q = np.array([result.joint_angles_rad for result in response.results[:5]])
+    assert np.abs(np.diff(q, axis=0)).max() < 0.5
+
+
+def test_batch_route_reports_unknown_robot():
+    client = TestClient(app)
+    response = client.post(
+        "/solve/batch",
+        json={"robot_model": "UnknownBot", "tool_name": "Drill_8mm", "targets": [{"x": 1, "y": 0, "z": 1}]},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["ok"] is False
+    assert "Unknown robot" in payload["warnings"][0]
+
+
+def test_parallel_batch_matches_sequential_order():
+    targets = [BatchTarget(x=1.5, y=0.05 * i, z=1.0) for i in range(6)]
+    sequential = run_batch("KR120R2500", "Drill_8mm", targets, workers=1)
+    try:
+        parallel = run_batch("KR120R2500", "Drill_8mm", targets, workers=2, chunk_size=2)
+    finally:
+        shutdown_pool()
+    assert [r.ok for r in parallel.results] == [r.ok for r in sequential.results]
+    for seq, par in zip(sequential.results, parallel.results):
+        assert np.allclose(seq.joint_angles_rad, par.joint_angles_rad)
+
+
+def test_concurrent_batches_share_the_pool(monkeypatch):
+    monkeypatch.setenv("VIBEIK_WORKERS", "2")
+    targets = [BatchTarget(x=1.5, y=0.05 * i, z=1.0) for i in range(6)]
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # workers=3 is clamped to the pool size rather than rebuilding the pool under the other batch.
+            futures = [executor.submit(run_batch, "KR120R2500", "Drill_8mm", targets, workers=workers, chunk_size=2)
+                       for workers in (2, 3)]
+            replies = [future.result() for future in futures]
+    finally:
+        shutdown_pool()
+    assert [r.ok for r in replies[0].results] == [r.ok for r in replies[1].results]
+
+
+def test_batch_request_caps_workers():
+    with pytest.raises(ValidationError):
+        BatchSolveRequest(robot_model="KR120R2500", tool_name="Drill_8mm", targets=[], workers=10_000)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+from pathlib import Path
+import sys
+
+import numpy as np
+
+
+BENCH_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "bench.py"
+
+
+def _bench_module():
+    spec = importlib.util.spec_from_file_location("vibeik_bench", BENCH_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_quick_suite_reports_percentiles_and_restores_env():
+    bench = _bench_module()
+    before = dict(os.environ)
+    report = bench.run_suite(quick=True, only=["parse_matrices", "rotation_from_orientation"], rounds=1)
+    assert dict(os.environ) == before
+    assert set(report["results"]) == {
+        "parse_matrices", "rotation_from_orientation_rpy", "rotation_from_orientation_quaternion",
+    }
+    for result in report["results"].values():
+        assert 0 < result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["throughput_per_s"] > 0
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    bench = _bench_module()
+    baseline = {"results": {"a": {"best_round_p50_ms": 1.0}, "b": {"best_round_p50_ms": 1.0}}}
+    report = {"results": {"a": {"best_round_p50_ms": 1.2}, "b": {"best_round_p50_ms": 1.5},
+                          "new": {"best_round_p50_ms": 9.0}}}
+    regressions = bench.compare(report, baseline, tolerance=0.3)
+    assert [regression["name"] for regression in regressions] == ["b"]
+
+
+def test_benchmark_poses_are_reachable():
+    bench = _bench_module()
+    from vibeik.ik import solve_ik
+    from vibeik.resources import load_robot
+
+    dh = load_robot(bench.ROBOT_FILE).dh
+    poses = bench.reachable_poses(dh, 16)
+    assert poses.shape == (16, 4, 4)
+    assert all(solve_ik(dh, pose).ok for pose in poses)
+    assert np.array_equal(poses, bench.reachable_poses(dh, 16))
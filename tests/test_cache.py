@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import numpy as np
+
+from vibeik import ik
+from vibeik.cache import LRUCache, array_digest
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats.hits == 3
+    assert stats.misses == 1
+    assert stats.size == 2
+
+
+def test_array_digest_tracks_content():
+    dh = np.arange(24, dtype=float).reshape(6, 4)
+    assert array_digest(dh) == array_digest(dh.copy())
+    changed = dh.copy()
+    changed[0, 0] += 1e-9
+    assert array_digest(dh) != array_digest(changed)
+
+
+def test_robot_model_cache_builds_once_per_dh(monkeypatch):
+    built = []
+
+    def _fake_build(dh):
+        built.append(dh)
+        return object()
+
+    monkeypatch.setattr(ik, "_build_robot_from_dh", _fake_build)
+    ik.invalidate_model_cache()
+    dh = np.ones((6, 4))
+
+    first = ik.get_robot_model(dh)
+    second = ik.get_robot_model(dh.copy())
+    assert first is second
+    assert len(built) == 1
+    assert ik.model_cache_stats().hits == 1
+
+    ik.invalidate_model_cache(dh)
+    assert ik.get_robot_model(dh) is not first
+    assert len(built) == 2
+    ik.invalidate_model_cache()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from vibeik import daemon
+from vibeik.cli import main
+
+
+EXAMPLE_TEXT = "Using the KR120R2500 robot, move the Drill_8mm tool to [1.5m, 0.1m, 1.0m]"
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    path = tmp_path / "vibeik.sock"
+    monkeypatch.setenv("VIBEIK_SOCKET", str(path))
+    server = daemon.start_daemon(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_daemon_solves_batches_and_streams(running_daemon):
+    assert daemon.ping()
+    reply = json.loads(daemon.request({"command": "solve", "text": EXAMPLE_TEXT}))
+    assert reply["ok"] and reply["meta"]["tool_name"] == "Drill_8mm"
+
+    batch = json.loads(daemon.request({
+        "command": "batch", "robot_model": "KR120R2500", "tool_name": "Drill_8mm",
+        "targets_csv": "x,y,z\n1.5,0.1,1.0\n10,0,0\n",
+    }))
+    assert [result["ok"] for result in batch["results"]] == [True, False]
+
+    out = io.StringIO()
+    header = {"command": "stream", "robot_model": "KR120R2500", "tool_name": "Drill_8mm", "input_format": "csv"}
+    all_ok = daemon.stream(header, iter(["x,y,z\n", "1.5,0.1,1.0\n", "1.5,0.2,1.0\n"]), out)
+    assert all_ok is True
+    assert [json.loads(line)["index"] for line in out.getvalue().splitlines()] == [0, 1]
+
+    error = json.loads(daemon.request({"command": "batch", "robot_model": "KR120R2500",
+                                       "tool_name": "Drill_8mm", "targets_csv": "a,b\n1,2\n"}))
+    assert "x, y and z" in error["error"]
+
+
+def test_cli_forwards_to_running_daemon(running_daemon, monkeypatch, capsys):
+    forwarded = []
+    original = daemon._dispatch
+
+    def _record(header):
+        forwarded.append(header["command"])
+        return original(header)
+
+    monkeypatch.setattr(daemon, "_dispatch", _record)
+    main([EXAMPLE_TEXT, "--json"])
+    assert forwarded == ["solve"]
+    assert json.loads(capsys.readouterr().out)["ok"] is True
+
+    main([EXAMPLE_TEXT, "--no-daemon"])
+    assert forwarded == ["solve"]
+    assert "Joint angles (rad)" in capsys.readouterr().out
+
+
+def test_cli_solves_in_process_without_daemon(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("VIBEIK_SOCKET", str(tmp_path / "missing.sock"))
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert daemon.request({"command": "ping"}) is None
+    main([EXAMPLE_TEXT, "--json"])
+    assert json.loads(capsys.readouterr().out)["ok"] is True
+
+
+def test_second_daemon_refuses_a_live_socket(running_daemon):
+    with pytest.raises(ValueError, match="already listening"):
+        daemon.start_daemon(running_daemon.path)
+
+
+def test_daemon_socket_is_private_to_the_user(running_daemon, monkeypatch):
+    assert running_daemon.path.stat().st_mode & 0o777 == 0o600
+    assert daemon.ping()
+
+    uid = os.getuid()
+    monkeypatch.setattr(daemon.os, "getuid", lambda: uid + 1)
+    assert not daemon.ping()
+
+
+def test_start_daemon_never_replaces_a_regular_file(tmp_path):
+    path = tmp_path / "vibeik.sock"
+    path.write_text("keep me")
+    with pytest.raises(ValueError, match="not a socket"):
+        daemon.start_daemon(path)
+    assert path.read_text() == "keep me"
+
+
+def test_fallback_socket_lives_in_a_private_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv("VIBEIK_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    path = daemon.socket_path()
+    assert path.parent == tmp_path / f"vibeik-{os.getuid()}"
+
+    server = daemon.start_daemon()
+    server.server_close()
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+    path.parent.chmod(0o755)
+    with pytest.raises(ValueError, match="mode 0700"):
+        daemon.start_daemon()
+
+
+def test_unexpected_errors_are_reported_to_the_client(running_daemon, monkeypatch):
+    def _fail(header):
+        raise np.linalg.LinAlgError("Singular matrix")
+
+    monkeypatch.setattr(daemon, "_dispatch", _fail)
+    reply = json.loads(daemon.request({"command": "solve", "text": EXAMPLE_TEXT}))
+    assert reply == {"ok": False, "error": "Singular matrix"}
+
+
+def test_warm_caches_builds_seed_indexes_and_reachability_maps(monkeypatch):
+    from vibeik import reachability, seeds
+
+    seeded, mapped = [], []
+    monkeypatch.setattr(seeds, "seed_index", lambda dh: seeded.append(dh.shape))
+    monkeypatch.setattr(reachability, "reachability_map", lambda dh, tcp: mapped.append((dh.shape, tcp.shape)))
+    daemon.warm_caches()
+    assert seeded == [(6, 4)]
+    assert mapped == [((6, 4), (4, 4))]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import io
+import json
+
+from fastapi.testclient import TestClient
+import numpy as np
+import pytest
+
+from vibeik.api import app
+from vibeik.cli import main
+from vibeik.formats import META_HEADER, negotiate, read_raw
+
+
+EXAMPLE_TEXT = "Using the KR120R2500 robot, move the Drill_8mm tool to [1.5m, 0.1m, 1.0m]"
+BATCH = {
+    "robot_model": "KR120R2500",
+    "tool_name": "Drill_8mm",
+    "targets": [{"x": 1.5, "y": 0.1, "z": 1.0}, {"x": 10.0, "y": 0.0, "z": 0.0}, {"x": 1.5, "y": 0.2, "z": 1.0}],
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_negotiate_prefers_json_unless_a_binary_type_wins():
+    assert negotiate(None) == "json"
+    assert negotiate("text/html,*/*;q=0.8") == "json"
+    assert negotiate("application/x-npy") == "npy"
+    assert negotiate("application/json;q=0.5, application/octet-stream") == "raw"
+    assert negotiate("application/octet-stream;q=0, application/json") == "json"
+
+
+def test_solve_returns_npy_with_meta_header(client):
+    reply = client.post("/solve", json={"text": EXAMPLE_TEXT}).json()
+    response = client.post("/solve", json={"text": EXAMPLE_TEXT}, headers={"Accept": "application/x-npy"})
+    assert response.headers["content-type"] == "application/x-npy"
+    table = np.load(io.BytesIO(response.content))
+    assert table.dtype.names == ("ok", "residual_error", "joint_angles_rad")
+    assert table["ok"][0] == 1
+    assert np.array_equal(table["joint_angles_rad"][0], reply["joint_angles_rad"])
+    meta = json.loads(response.headers[META_HEADER])
+    assert meta["ok"] and meta["meta"]["robot_model"] == reply["meta"]["robot_model"]
+
+
+def test_batch_raw_payload_round_trips_and_adds_degrees_on_request(client):
+    reply = client.post("/solve/batch", json=BATCH).json()
+    plain = client.post("/solve/batch", json=BATCH, headers={"Accept": "application/octet-stream"})
+    table, degrees = read_raw(plain.content)
+    assert not degrees and "joint_angles_deg" not in table.dtype.names
+    assert table["ok"].tolist() == [1, 0, 1]
+    assert np.isnan(table["joint_angles_rad"][1]).all()
+    assert np.array_equal(table["joint_angles_rad"][[0, 2]],
+                          [reply["results"][0]["joint_angles_rad"], reply["results"][2]["joint_angles_rad"]])
+    # Six float64 angles, a residual and a status byte per target, against ~300 bytes of JSON.
+    assert len(plain.content) < len(json.dumps(reply)) / 3
+
+    with_degrees = client.post("/solve/batch", params={"degrees": True}, json=BATCH,
+                               headers={"Accept": "application/octet-stream"})
+    table, degrees = read_raw(with_degrees.content)
+    assert degrees
+    assert np.allclose(table["joint_angles_deg"][0], np.degrees(reply["results"][0]["joint_angles_rad"]))
+
+
+def test_batch_msgpack_payload(client):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.post("/solve/batch", json=BATCH, headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    payload = msgpack.unpackb(response.content)
+    assert payload["point_ok"] == [True, False, True]
+    assert payload["point_warnings"][1] == "Target outside reachable workspace"
+    angles = np.frombuffer(payload["joint_angles_rad"], dtype="<f8").reshape(-1, payload["joints"])
+    assert angles.shape == (3, 6)
+    assert "joint_angles_deg" not in payload
+
+
+def test_cli_format_writes_binary_to_stdout(capsysbinary, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    main([EXAMPLE_TEXT, "--no-daemon", "--format", "raw", "--degrees"])
+    table, degrees = read_raw(capsysbinary.readouterr().out)
+    assert degrees and table["ok"].tolist() == [1]
+    assert np.allclose(np.radians(table["joint_angles_deg"]), table["joint_angles_rad"])
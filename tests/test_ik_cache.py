@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vibeik import metrics
+from vibeik.cli import run
+from vibeik.ik import solve_ik
+from vibeik.ik_cache import ik_cache_stats
+from vibeik.kinematics import fkine
+from vibeik.resources import load_robot
+
+
+ROBOT_PATH = Path(__file__).resolve().parents[1] / "RobotResources" / "RobotModels" / "KUKA KR120R2500.m"
+EXAMPLE_TEXT = "Using the KR120R2500 robot, move the Drill_8mm tool to [1.5m, 0.1m, 1.0m]"
+
+
+def test_repeated_targets_are_served_from_the_cache():
+    dh = load_robot(ROBOT_PATH).dh
+    q = np.array([0.3, -0.8, 0.4, 0.5, 0.7, -0.2])
+    target = fkine(dh, q)
+
+    first = solve_ik(dh, target, solver="numpy_lm", q0=q)
+    assert first.ok and not first.cache_hit
+    nudged = target.copy()
+    nudged[0, 3] += 1e-8  # well inside the default 1 um position tolerance
+    second = solve_ik(dh, nudged, solver="numpy_lm", q0=q)
+    assert second.cache_hit
+    assert np.array_equal(second.joint_angles, first.joint_angles)
+
+    moved = target.copy()
+    moved[0, 3] += 1e-3
+    assert not solve_ik(dh, moved, solver="numpy_lm", q0=q).cache_hit
+    # The seed, the solver and the robot are part of the key.
+    assert not solve_ik(dh, target, solver="numpy_lm").cache_hit
+    assert not solve_ik(dh, target, solver="analytic", q0=q).cache_hit
+    assert not solve_ik(dh * 1.01, target, solver="numpy_lm", q0=q).cache_hit
+    assert not solve_ik(dh, target, solver="numpy_lm", q0=q, use_cache=False).cache_hit
+    assert ik_cache_stats().hits == 1
+
+
+def test_cache_hit_is_reported_in_meta_and_can_be_disabled(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    first = run(EXAMPLE_TEXT)
+    second = run(EXAMPLE_TEXT)
+    assert first.ok and second.ok
+    assert first.meta.cache_hit is False and second.meta.cache_hit is True
+    assert second.joint_angles_rad == first.joint_angles_rad
+
+    monkeypatch.setenv("VIBEIK_IK_CACHE", "0")
+    assert run(EXAMPLE_TEXT).meta.cache_hit is False
+    assert ik_cache_stats() is None
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setenv("VIBEIK_IK_CACHE_SIZE", "2")
+    dh = load_robot(ROBOT_PATH).dh
+    targets = [fkine(dh, np.array([0.1 * i, -0.5, 0.4, 0.2, 0.6, 0.0])) for i in range(3)]
+    for target in targets:
+        solve_ik(dh, target)
+    assert ik_cache_stats().size == 2
+    assert not solve_ik(dh, targets[0]).cache_hit
+    assert solve_ik(dh, targets[2]).cache_hit
+
+
+def test_cached_results_cannot_be_corrupted_by_callers():
+    dh = load_robot(ROBOT_PATH).dh
+    q = np.array([0.3, -0.8, 0.4, 0.5, 0.7, -0.2])
+    target = fkine(dh, q)
+    first = solve_ik(dh, target, solver="analytic", q0=q)
+    first.joint_angles[0] += 1.0  # the caller's own array, not the cached copy
+    hit = solve_ik(dh, target, solver="analytic", q0=q)
+    assert hit.cache_hit
+    assert np.allclose(fkine(dh, hit.joint_angles), target)
+    with pytest.raises(ValueError):
+        hit.joint_angles[0] = 0.0
+
+
+def test_cache_hits_are_not_counted_as_solves():
+    dh = load_robot(ROBOT_PATH).dh
+    target = fkine(dh, np.array([0.2, -0.6, 0.3, 0.1, 0.5, 0.0]))
+    result = solve_ik(dh, target, solver="analytic")
+    labels = {"solver": "analytic", "outcome": "ok"}
+    solves, hits = metrics.IK_SOLVES.value(**labels), metrics.IK_CACHE_HITS.value(**labels)
+    metrics.record_ik([result, solve_ik(dh, target, solver="analytic")])
+    assert metrics.IK_SOLVES.value(**labels) == solves + 1
+    assert metrics.IK_CACHE_HITS.value(**labels) == hits + 1
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vibeik.kinematics import fkine, fkine_batch, fkine_jacobian, fkine_jacobian_batch, singularity_measure
+from vibeik.resources import load_robot, load_tool
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+ROBOT_PATH = BASE_DIR / "RobotResources" / "RobotModels" / "KUKA KR120R2500.m"
+TOOL_PATH = BASE_DIR / "RobotResources" / "Tools" / "Drill_8mm.m"
+
+
+def test_fkine_batch_matches_roboticstoolbox():
+    rtb = pytest.importorskip("roboticstoolbox")
+    dh = load_robot(ROBOT_PATH).dh
+    robot = rtb.DHRobot(
+        [rtb.RevoluteDH(a=a, alpha=alpha, d=d, offset=theta) for alpha, a, theta, d in dh]
+    )
+    rng = np.random.default_rng(0)
+    q = rng.uniform(-np.pi, np.pi, size=(5, 6))
+
+    poses = fkine_batch(dh, q)
+    assert poses.shape == (5, 4, 4)
+    for qi, pose in zip(q, poses):
+        assert np.allclose(pose, robot.fkine(qi).A, atol=1e-12)
+
+
+def test_fkine_batch_applies_tool_transform():
+    dh = load_robot(ROBOT_PATH).dh
+    tool = load_tool(TOOL_PATH)
+    q = np.zeros((1, 6))
+    flange = fkine_batch(dh, q)[0]
+    tcp = fkine_batch(dh, q, tool.tcp)[0]
+    assert np.allclose(tcp, flange @ tool.tcp)
+    assert np.allclose(fkine(dh, q[0], tool.tcp), tcp)
+
+
+def _numeric_jacobian(dh, q, eps=1e-7):
+    pose = fkine(dh, q)
+    jacobian = np.zeros((6, len(q)))
+    for j in range(len(q)):
+        dq = q.copy()
+        dq[j] += eps
+        moved = fkine(dh, dq)
+        jacobian[:3, j] = (moved[:3, 3] - pose[:3, 3]) / eps
+        spin = (moved[:3, :3] - pose[:3, :3]) / eps @ pose[:3, :3].T
+        jacobian[3:, j] = [spin[2, 1], spin[0, 2], spin[1, 0]]
+    return jacobian
+
+
+def test_fkine_jacobian_batch_matches_fk_and_finite_differences():
+    dh = load_robot(ROBOT_PATH).dh
+    tool = load_tool(TOOL_PATH).tcp
+    q = np.random.default_rng(1).uniform(-2.0, 2.0, size=(8, 6))
+
+    poses, jacobians = fkine_jacobian_batch(dh, q)
+    assert jacobians.shape == (8, 6, 6)
+    assert np.allclose(poses, fkine_batch(dh, q), atol=1e-12)
+    for qi, jacobian in zip(q, jacobians):
+        assert np.allclose(jacobian, _numeric_jacobian(dh, qi), atol=1e-5)
+
+    tcp_pose, tcp_jacobian = fkine_jacobian(dh, q[0], tool)
+    assert np.allclose(tcp_pose, fkine(dh, q[0], tool))
+    # Same angular rows; the linear rows gain the lever arm to the TCP.
+    assert np.allclose(tcp_jacobian[3:], jacobians[0, 3:])
+    assert not np.allclose(tcp_jacobian[:3], jacobians[0, :3])
+
+
+def test_singularity_measure_tracks_inverse_condition_number():
+    dh = load_robot(ROBOT_PATH).dh
+    q = np.random.default_rng(2).uniform(-2.0, 2.0, size=(64, 6))
+    _, jacobians = fkine_jacobian_batch(dh, q)
+    ratio = singularity_measure(jacobians) * np.linalg.cond(jacobians)
+    assert np.all((ratio > 0.1) & (ratio < 10.0))
+
+    # q5 = 0 aligns the axes of joints 4 and 6: a wrist singularity.
+    wrist = q[:1].copy()
+    wrist[0, 4] = 0.0
+    assert singularity_measure(fkine_jacobian(dh, wrist[0])[1]) < 1e-12
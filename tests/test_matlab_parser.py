@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import builtins
+import math
+
+import numpy as np
+import pytest
+
+from vibeik.matlab_m_parser import extract_matrix, parse_matrices
+
+
+ROBOT_TEXT = """
+% calibration data first, then the table we want
+LUT = [1 2 3; 4 5 6; 7 8 9];
+DH  = [ -pi/2,  0,      pi/2,   -pi/2,      pi/2,   pi;         %Alpha
+        0.35,   1.15,   -0.041, 0,          0,      0;          %r or a
+        0,      0,      -pi/2,  0,          0,      -pi;        %theta
+        0.675,  0,      0,      -1.000,     0,      -0.215]';   %d
+"""
+
+
+def test_expressions_are_evaluated_without_eval(monkeypatch):
+    def _no_eval(*args, **kwargs):
+        raise AssertionError("eval must not be used")
+
+    monkeypatch.setattr(builtins, "eval", _no_eval)
+    matrices = parse_matrices("M = [pi/2, -2^3 1e-3; (1+1)*pi, +4, 2**-1];")
+    assert np.allclose(matrices["M"], [[math.pi / 2, -8, 1e-3], [2 * math.pi, 4, 0.5]])
+
+
+@pytest.mark.parametrize("token", ["__import__('os')", "abs(1)", "x", "1 if 1 else 0", "9^9^9"])
+def test_unsupported_expressions_raise_value_error(token):
+    with pytest.raises(ValueError):
+        parse_matrices(f"M = [{token} 1];")
+
+
+def test_extract_only_evaluates_the_returned_matrix():
+    # The lookup table holds an expression the parser rejects; it must never be evaluated.
+    text = "CAL = [" + " ".join(["unknown_fn(1)"] * 5000) + "];\n" + ROBOT_TEXT
+    dh = extract_matrix(text, ["DH", "dh"], expected_shape=(6, 4))
+    assert dh.name == "DH"
+    assert dh.value.shape == (6, 4)
+    assert dh.value[0, 0] == pytest.approx(-math.pi / 2)
+
+
+def test_extract_keeps_preference_order_and_shape_fallback():
+    text = "dh = [1 2 3 4];\nDH = [0 0 0 0; 1 1 1 1];\nT = [1 2; 3 4];\nDH = [1 2; 3 4; 5 6];\n"
+    # The later DH assignment wins; it has the wrong shape, so the next preferred name is tried.
+    assert extract_matrix(text, ["DH", "dh"], expected_shape=(1, 4)).name == "dh"
+    assert extract_matrix(text, ["DH"], expected_shape=(3, 2)).value[2, 1] == 6
+    assert extract_matrix(text, ["missing"], expected_shape=(2, 2)).name == "T"
+    with pytest.raises(ValueError, match="not found"):
+        extract_matrix(text, ["DH"], expected_shape=(4, 4))
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+import pytest
+
+from vibeik import metrics
+from vibeik.api import app
+
+
+EXAMPLE_TEXT = "Using the KR120R2500 robot, move the Drill_8mm tool to [1.5m, 0.1m, 1.0m]"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    metrics.REGISTRY.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_solve_reports_stage_timings_only_on_request(client):
+    plain = client.post("/solve", json={"text": EXAMPLE_TEXT}).json()
+    assert plain["ok"] and plain["meta"]["timings_ms"] is None
+
+    # Otherwise the repeated pose is answered from the IK result cache and never verified.
+    assert client.delete("/cache/ik").json() == {"ok": True}
+    timed = client.post("/solve", json={"text": EXAMPLE_TEXT, "include_timings": True}).json()
+    timings = timed["meta"]["timings_ms"]
+    assert {"index", "parse", "match", "load", "reachability", "ik", "verify"} <= set(timings)
+    assert all(ms >= 0 for ms in timings.values())
+    assert timings["verify"] <= timings["ik"]
+
+
+def test_metrics_endpoint_exposes_requests_ik_and_caches(client):
+    client.post("/solve", json={"text": EXAMPLE_TEXT})
+    client.post("/solve", json={"text": "Using the KR120R2500 robot, move the Drill_8mm tool to [9m, 9m, 9m]"})
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'vibeik_requests_total{route="solve",outcome="ok"} 1' in text
+    assert 'vibeik_requests_total{route="solve",outcome="failed"} 1' in text
+    assert 'vibeik_request_duration_seconds_count{route="solve"} 2' in text
+    assert 'vibeik_request_duration_seconds_bucket{route="solve",le="+Inf"} 2' in text
+    assert 'vibeik_stage_duration_seconds_count{stage="parse"} 2' in text
+    assert 'vibeik_ik_solves_total{solver="analytic",outcome="ok"} 1' in text
+    assert 'vibeik_cache_hit_ratio{cache="robot_resource"}' in text
+    assert 'vibeik_cache_misses_total{cache="ik_result"} 1' in text
+
+
+def test_llm_calls_are_counted_by_outcome():
+    metrics.REGISTRY.clear()
+    with metrics.llm_call("parse"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.llm_call("parse"):
+            raise RuntimeError("timeout")
+    assert metrics.LLM_CALLS.value(purpose="parse", outcome="ok") == 1
+    assert metrics.LLM_CALLS.value(purpose="parse", outcome="error") == 1
+    assert metrics.STAGE_SECONDS.count(stage="llm") == 2
@@ -6,12 +6,17 @@ import numpy as np
 
 from vibeik.kinematics import default_rotation, rotation_from_orientation
 from vibeik.nl_parse import parse_instruction
+from vibeik.parse_cache import clear_parse_cache, parse_cache_stats
+from vibeik.rule_parse import parse_with_rules
+from vibeik.types import ParsedInstruction, TargetPosition
 
 
 EXAMPLE_TEXT = (
     "I am using the KUKA KR120 R2500 robot. "
     "I want to move the tooltip of an 8mm drilling tool to [1.5m, 0.1m, 1.0m]"
 )
+# Too vague for the deterministic grammar, so it always goes to the LLM.
+VAGUE_TEXT = "Put the KR120's drill bit just above the fixture, tilted a little"
 
 
 def test_default_orientation_matrix():
@@ -27,3 +32,108 @@ def test_fallback_parser_extracts_fields(monkeypatch):
     assert parsed.target.x == 1.5
     assert parsed.target.y == 0.1
     assert parsed.target.z == 1.0
+
+
+def test_rule_parser_handles_units_and_orientation():
+    result = parse_with_rules(
+        "Using the KR120R2500 robot, move the Drill_8mm tool to (1500, 100, 1000) mm with rpy [0, 90, 0] deg"
+    )
+    assert result.confidence == 1.0
+    assert result.parsed.robot_model == "KR120R2500"
+    assert result.parsed.tool_name == "Drill_8mm"
+    assert (result.parsed.target.x, result.parsed.target.y, result.parsed.target.z) == (1.5, 0.1, 1.0)
+    assert np.isclose(result.parsed.orientation.pitch, np.pi / 2)
+
+    result = parse_with_rules("Use the KR120R2500 robot with a Drill_8mm tool at x=150cm, y=10cm, z=1m, "
+                              "quaternion (w,x,y,z) = [0, 2, 0, 0]")
+    assert result.parsed.target.x == 1.5
+    assert result.parsed.orientation.quaternion == [0.0, 1.0, 0.0, 0.0]
+
+
+def test_rule_parser_lowers_confidence_when_ambiguous():
+    two_targets = parse_with_rules("Use the KR120 robot and the drill tool to [1, 2, 3], then to [2, 3, 4]")
+    assert two_targets.confidence < 0.8
+    unparsed_orientation = parse_with_rules("Use the KR120 robot and the drill tool to [1m, 2m, 3m] pointing down")
+    assert unparsed_orientation.confidence < 0.8
+    assert parse_with_rules("move somewhere nice").parsed is None
+
+
+def test_rule_parser_applies_trailing_units_and_rejects_mixed_ones():
+    result = parse_with_rules("Using the KR120R2500 robot, move the Drill_8mm tool to 1500, 100, 1000 mm")
+    assert result.confidence >= 0.8
+    assert (result.parsed.target.x, result.parsed.target.y, result.parsed.target.z) == (1.5, 0.1, 1.0)
+
+    mixed = parse_with_rules("Using the KR120R2500 robot, move the Drill_8mm tool to [1500 mm, 100, 1000]")
+    assert mixed.parsed is None
+    unitless = parse_with_rules("Using the KR120R2500 robot, move the Drill_8mm tool to [1.5, 0.1, 1.0]")
+    assert unitless.parsed.target.x == 1.5
+    assert unitless.confidence < 0.8
+
+
+def test_rule_parser_defers_offsets_and_frames():
+    for phrase in (
+        "move the Drill_8mm tool 100mm above [1.5m, 0.1m, 1.0m]",
+        "move the Drill_8mm tool 10 cm to the left of [1.5m, 0.1m, 1.0m]",
+        "move the Drill_8mm tool to [1.5m, 0.1m, 1.0m] relative to the current position",
+        "move the Drill_8mm tool to [1.5m, 0.1m, 1.0m] in the tool frame",
+        "move the Drill_8mm tool from [1m, 0m, 1m], then 5 cm further",
+    ):
+        assert parse_with_rules(f"Using the KR120R2500 robot, {phrase}").parsed is None, phrase
+
+
+def test_confident_rule_parse_skips_llm(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    calls = []
+    monkeypatch.setattr("vibeik.nl_parse._parse_with_llm", _fake_llm(calls))
+    parsed = parse_instruction(EXAMPLE_TEXT)
+    assert parsed.tool_name == "8mm drilling"
+    assert calls == []
+
+    parse_instruction(VAGUE_TEXT, use_cache=False)
+    assert len(calls) == 1
+
+
+def _fake_llm(calls):
+    def _parse(text, api_key):
+        calls.append(text)
+        return ParsedInstruction(
+            robot_model="KUKA KR120 R2500",
+            tool_name="Drill_8mm",
+            target=TargetPosition(x=1.5, y=0.1, z=1.0),
+        )
+
+    return _parse
+
+
+def test_llm_parses_are_cached_by_normalized_text(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    calls = []
+    monkeypatch.setattr("vibeik.nl_parse._parse_with_llm", _fake_llm(calls))
+    clear_parse_cache()
+
+    first = parse_instruction(VAGUE_TEXT)
+    second = parse_instruction("  " + VAGUE_TEXT.replace(" ", "   ") + "\n")
+    assert second == first
+    assert len(calls) == 1
+    assert parse_cache_stats().memory.hits == 1
+
+    parse_instruction(VAGUE_TEXT, use_cache=False)
+    assert len(calls) == 2
+
+
+def test_parse_cache_is_shared_through_sqlite(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    calls = []
+    monkeypatch.setattr("vibeik.nl_parse._parse_with_llm", _fake_llm(calls))
+    clear_parse_cache()
+    parse_instruction(VAGUE_TEXT)
+
+    # A fresh worker has an empty LRU but reads the same SQLite store.
+    monkeypatch.setattr("vibeik.parse_cache._CACHE", None)
+    parse_instruction(VAGUE_TEXT)
+    assert len(calls) == 1
+    assert parse_cache_stats().disk_hits == 1
+
+    clear_parse_cache()
+    parse_instruction(VAGUE_TEXT)
+    assert len(calls) == 2
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pytest
+
+from vibeik.cli import run_batch
+from vibeik.kinematics import make_transform, rotation_from_orientation
+from vibeik.poses import PoseBatch, read_pose_csv
+from vibeik.types import BatchTarget, Orientation
+
+
+def test_vectorized_transforms_match_single_pose_conversion():
+    rng = np.random.default_rng(3)
+    targets = []
+    for i in range(30):
+        x, y, z = rng.uniform(-1, 1, 3)
+        if i % 3 == 0:
+            orientation = Orientation(quaternion=rng.normal(size=4).tolist())
+        elif i % 3 == 1:
+            orientation = Orientation(**dict(zip(("roll", "pitch", "yaw"), rng.uniform(-np.pi, np.pi, 3))))
+        else:
+            orientation = None if i % 2 else Orientation(roll=0.1)  # incomplete RPY -> default
+        targets.append(BatchTarget(x=x, y=y, z=z, orientation=orientation))
+
+    transforms = PoseBatch.from_targets(targets).transforms()
+    assert transforms.shape == (30, 4, 4)
+    for target, transform in zip(targets, transforms):
+        expected = make_transform(rotation_from_orientation(target.orientation), [target.x, target.y, target.z])
+        assert np.allclose(transform, expected, atol=1e-12)
+
+    tcp_inv = np.linalg.inv(make_transform(np.eye(3), [0.0, 0.0, 0.2]))
+    flange = PoseBatch.from_targets(targets).take(np.arange(30) % 2 == 0).flange_targets(tcp_inv)
+    assert np.allclose(flange, transforms[::2] @ tcp_inv)
+
+
+def test_read_pose_csv_fills_arrays_and_names_bad_lines():
+    poses = read_pose_csv(io.StringIO(
+        "x,y,z,roll,pitch,yaw,qw,qx,qy,qz\n"
+        "1.5,0.1,1.0,,,,,,,\n"
+        "1.4,0.0,0.9,0,3.14159,0,,,,\n"
+        "1.3,0.0,0.9,0,0,0,1,0,0,0\n"
+        "1.2,0.0,0.9,0,,,,,,\n"
+    ))
+    assert poses.positions.shape == (4, 3)
+    assert np.isnan(poses.rpy[[0, 3]]).all() and poses.rpy[1, 1] == pytest.approx(3.14159)
+    assert np.isnan(poses.quaternions[[0, 1, 3]]).all()
+    assert np.array_equal(poses.quaternions[2], [1, 0, 0, 0])
+    assert np.allclose(poses.rotations()[3], rotation_from_orientation(None))
+
+    with pytest.raises(ValueError, match="line 3: could not convert y='oops'"):
+        read_pose_csv(io.StringIO("x,y,z\n1,2,3\n1,oops,3\n"))
+    with pytest.raises(ValueError, match="x, y and z"):
+        read_pose_csv(io.StringIO("a,b,c\n1,2,3\n"))
+
+
+def test_pose_batch_solves_like_model_targets():
+    targets = [BatchTarget(x=1.5, y=0.1 * i, z=1.0) for i in range(4)] + [BatchTarget(x=10.0, y=0.0, z=0.0)]
+    from_models = run_batch("KR120R2500", "Drill_8mm", targets)
+    from_arrays = run_batch("KR120R2500", "Drill_8mm", PoseBatch.from_targets(targets))
+    assert [r.ok for r in from_arrays.results] == [True, True, True, True, False]
+    for expected, actual in zip(from_models.results, from_arrays.results):
+        assert expected.joint_angles_rad == actual.joint_angles_rad
+
+
+def test_quaternions_are_normalized_and_validated():
+    rotations = PoseBatch(np.zeros((1, 3)), quaternions=np.array([[0.0, 2.0, 0.0, 0.0]])).rotations()
+    assert np.allclose(rotations[0], np.diag([1.0, -1.0, -1.0]))
+    with pytest.raises(ValueError, match="four components"):
+        Orientation(quaternion=[1.0, 0.0, 0.0])
+    with pytest.raises(ValueError, match="line 2: Quaternion orientations must be non-zero"):
+        read_pose_csv(io.StringIO("x,y,z,qw,qx,qy,qz\n1,0,1,0,0,0,0\n"))
+
+
+def test_batch_route_rejects_short_quaternions_without_a_server_error():
+    from fastapi.testclient import TestClient
+
+    from vibeik.api import app
+
+    with TestClient(app) as client:
+        response = client.post("/solve/batch", json={
+            "robot_model": "KR120R2500", "tool_name": "Drill_8mm",
+            "targets": [{"x": 1.5, "y": 0.1, "z": 1.0, "orientation": {"quaternion": [1, 0, 0]}}],
+        })
+    assert response.status_code == 422
+    assert "four components" in response.text
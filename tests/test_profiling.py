@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+import pstats
+
+from fastapi.testclient import TestClient
+import pytest
+
+from vibeik.api import app
+from vibeik.cli import main
+from vibeik.profiling import PROFILE_HEADER, profile_sample_rate, run_profiled, should_profile
+
+
+EXAMPLE_TEXT = "Using the KR120R2500 robot, move the Drill_8mm tool to [1.5m, 0.1m, 1.0m]"
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("VIBEIK_PROFILE_DIR", str(tmp_path / "profiles"))
+    return tmp_path / "profiles"
+
+
+def test_cli_profile_writes_pstats_and_collapsed_stacks(profile_dir, capsys):
+    main([EXAMPLE_TEXT, "--profile"])
+    captured = capsys.readouterr()
+    assert "Joint angles (rad)" in captured.out
+    assert "Profile written to" in captured.err
+
+    [dump] = profile_dir.glob("cli-*.pstats")
+    functions = {name for _, _, name in pstats.Stats(str(dump)).stats}
+    assert {"solve_instruction", "solve_ik"} <= functions
+
+    lines = dump.with_suffix(".collapsed").read_text().splitlines()
+    stacks = [line.rsplit(" ", 1) for line in lines]
+    assert all(int(value) > 0 for _, value in stacks)
+    assert any("solve_instruction" in stack and "solve_ik" in stack for stack, _ in stacks)
+
+
+def test_solve_is_profiled_only_when_requested(profile_dir, monkeypatch):
+    with TestClient(app) as client:
+        plain = client.post("/solve", json={"text": EXAMPLE_TEXT})
+        assert plain.json()["ok"] and PROFILE_HEADER not in plain.headers
+        refused = client.post("/solve", json={"text": EXAMPLE_TEXT}, headers={PROFILE_HEADER: "1"})
+        assert refused.json()["ok"] and PROFILE_HEADER not in refused.headers
+        assert not profile_dir.exists()
+
+        monkeypatch.setenv("VIBEIK_PROFILE_ALLOW_HEADER", "1")
+        profiled = client.post("/solve", json={"text": EXAMPLE_TEXT}, headers={PROFILE_HEADER: "1"})
+        assert profiled.json()["ok"]
+        stem = profiled.headers[PROFILE_HEADER]
+        assert (profile_dir / f"{stem}.pstats").exists()
+        assert (profile_dir / f"{stem}.collapsed").exists()
+
+        binary = client.post("/solve", json={"text": EXAMPLE_TEXT},
+                             headers={PROFILE_HEADER: "1", "Accept": "application/x-npy"})
+        assert binary.headers["content-type"] == "application/x-npy"
+        assert (profile_dir / f"{binary.headers[PROFILE_HEADER]}.pstats").exists()
+
+        monkeypatch.delenv("VIBEIK_PROFILE_ALLOW_HEADER")
+        monkeypatch.setenv("VIBEIK_PROFILE_SAMPLE_RATE", "1")
+        sampled = client.post("/solve", json={"text": EXAMPLE_TEXT})
+        assert PROFILE_HEADER in sampled.headers
+    assert len(list(profile_dir.glob("solve-*.pstats"))) == 3
+
+
+def test_invalid_sample_rate_disables_sampling(monkeypatch, caplog):
+    monkeypatch.setenv("VIBEIK_PROFILE_SAMPLE_RATE", "5%")
+    with caplog.at_level("WARNING", logger="vibeik.profiling"):
+        assert profile_sample_rate() == 0.0
+        assert not should_profile(None)
+    assert caplog.text.count("VIBEIK_PROFILE_SAMPLE_RATE") == 1
+    assert not should_profile("1")
+    monkeypatch.setenv("VIBEIK_PROFILE_ALLOW_HEADER", "1")
+    assert should_profile("1")
+
+
+def test_oldest_profiles_are_deleted_beyond_the_limit(profile_dir, monkeypatch):
+    reports = [run_profiled("test", sum, [n], directory=profile_dir)[1] for n in range(4)]
+    for n, report in enumerate(reports):
+        os.utime(report.pstats_path, ns=(n, n))
+    monkeypatch.setenv("VIBEIK_PROFILE_MAX_FILES", "2")
+    run_profiled("test", sum, [4], directory=profile_dir)
+
+    kept = sorted(path.name for path in profile_dir.iterdir())
+    assert len(kept) == 4
+    assert reports[3].pstats_path.name in kept and reports[3].collapsed_path.name in kept
+    assert not reports[0].pstats_path.exists() and not reports[0].collapsed_path.exists()
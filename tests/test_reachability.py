@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from vibeik import parallel
+from vibeik.cli import run_batch
+from vibeik.kinematics import fkine_batch
+from vibeik.reachability import UNREACHABLE_WARNING, ReachabilityMap, reachability_map
+from vibeik.resources import load_robot, load_tool
+from vibeik.types import BatchTarget
+
+
+RESOURCES_DIR = Path(__file__).resolve().parents[1] / "RobotResources"
+
+
+def _robot_and_tool():
+    robot = load_robot(RESOURCES_DIR / "RobotModels" / "KUKA KR120R2500.m")
+    tool = load_tool(RESOURCES_DIR / "Tools" / "Drill_8mm.m")
+    return robot.dh, tool.tcp
+
+
+def test_map_covers_sampled_positions_and_rejects_far_points():
+    dh, tcp = _robot_and_tool()
+    reach = ReachabilityMap.build(dh, tcp, samples=50000)
+    q = np.random.default_rng(1).uniform(-np.pi, np.pi, size=(2000, 6))
+    positions = fkine_batch(dh, q, tcp)[:, :3, 3]
+    assert reach.reachable(positions).mean() > 0.99
+    assert not reach.is_reachable(np.array([10.0, 0.0, 0.0]))
+    assert reach.bits.dtype == np.uint8
+
+
+def test_map_round_trips_through_disk(tmp_path):
+    dh, tcp = _robot_and_tool()
+    reach = ReachabilityMap.build(dh, tcp, samples=5000)
+    reach.save(tmp_path / "reach.npz")
+    loaded = ReachabilityMap.load(tmp_path / "reach.npz")
+    probes = np.random.default_rng(2).uniform(-3, 3, size=(500, 3))
+    assert np.array_equal(loaded.reachable(probes), reach.reachable(probes))
+
+
+def test_concurrent_saves_of_one_map_do_not_collide(tmp_path):
+    dh, tcp = _robot_and_tool()
+    reach = ReachabilityMap.build(dh, tcp, samples=2000)
+    store = tmp_path / "reach" / "map.npz"
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: reach.save(store), range(8)))
+    assert np.array_equal(ReachabilityMap.load(store).bits, reach.bits)
+    assert [path.name for path in store.parent.iterdir()] == ["map.npz"]
+
+
+def test_unreachable_batch_targets_skip_the_solver(monkeypatch):
+    dh, tcp = _robot_and_tool()
+    assert reachability_map(dh, tcp) is not None
+    calls = []
+    original = parallel.solve_targets_parallel
+
+    def _spy(dh, targets, **kwargs):
+        calls.append(len(targets))
+        return original(dh, targets, **kwargs)
+
+    monkeypatch.setattr(parallel, "solve_targets_parallel", _spy)
+    response = run_batch("KR120R2500", "Drill_8mm", [BatchTarget(x=10, y=0, z=0), BatchTarget(x=1.5, y=0.1, z=1.0)])
+    assert calls == [1]
+    assert response.results[0].warning == UNREACHABLE_WARNING
+    assert response.results[1].ok
+
+
+def test_reachability_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("VIBEIK_REACHABILITY", "0")
+    dh, tcp = _robot_and_tool()
+    assert reachability_map(dh, tcp) is None
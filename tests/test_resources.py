@@ -3,8 +3,18 @@ from __future__ import annotations
 from pathlib import Path
 
 import numpy as np
+import pytest
 
-from vibeik.resources import build_resource_index, load_robot, load_tool
+from vibeik.name_match import NameMatcher, synonym_table
+from vibeik.pipeline import resolve_resources
+from vibeik.resources import (
+    LiveResourceIndex,
+    build_resource_index,
+    clear_resource_cache,
+    load_robot,
+    load_tool,
+    resource_cache_stats,
+)
 
 
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -36,16 +46,23 @@ def _write_tool_file(path: Path) -> None:
 def test_tool_match_uses_llm_resolver_when_enabled(monkeypatch, tmp_path):
     tools_dir = tmp_path / "Tools"
     tools_dir.mkdir()
-    tool_path = tools_dir / "Drill_8mm.m"
-    _write_tool_file(tool_path)
+    for name in ("Drill_8mm", "Drill_10mm", "Gripper"):
+        _write_tool_file(tools_dir / f"{name}.m")
     index = build_resource_index(tmp_path)
 
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-    monkeypatch.setattr("vibeik.resources._llm_pick_candidate", lambda query, candidates: "Drill_8mm")
+    offered = []
 
-    match = index.match_tool("8mm drilling tool")
+    def _pick(query, candidates):
+        offered.extend(candidates)
+        return "Drill_10mm"
 
-    assert match == ("Drill_8mm", tool_path)
+    monkeypatch.setattr("vibeik.resources._llm_pick_candidate", _pick)
+
+    match = index.match_tool("drilling tool")
+
+    assert match == ("Drill_10mm", tools_dir / "Drill_10mm.m")
+    assert set(offered) == {"Drill_8mm", "Drill_10mm"}
 
 
 def test_tool_match_skips_llm_when_api_key_missing(monkeypatch, tmp_path):
@@ -64,4 +81,103 @@ def test_tool_match_skips_llm_when_api_key_missing(monkeypatch, tmp_path):
 
     match = index.match_tool("8mm drilling tool")
 
-    assert match is None
+    assert match == ("Drill_8mm", tool_path)
+
+
+def test_ambiguous_matches_are_refused_without_llm(monkeypatch, tmp_path, caplog):
+    tools_dir = tmp_path / "Tools"
+    tools_dir.mkdir()
+    for name in ("Drill_8mm", "Drill_10mm", "Drill_12mm"):
+        _write_tool_file(tools_dir / f"{name}.m")
+    robots_dir = tmp_path / "RobotModels"
+    robots_dir.mkdir()
+    for name in ("KUKA KR120R2500", "KUKA KR210R2700"):
+        (robots_dir / f"{name}.m").write_text("")
+    index = build_resource_index(tmp_path)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    with caplog.at_level("WARNING", logger="vibeik.resources"):
+        assert index.match_tool("drill") is None
+        assert index.match_robot("KUKA") is None
+    assert "Drill_8mm" in caplog.text and "Drill_12mm" in caplog.text
+    assert "KUKA KR210R2700" in caplog.text
+    assert set(index.tool_ties("drill")) == {"Drill_8mm", "Drill_10mm", "Drill_12mm"}
+    assert index.match_tool("Drill_10mm") == ("Drill_10mm", tools_dir / "Drill_10mm.m")
+
+    with pytest.raises(ValueError, match=r"Ambiguous tool: drill \(candidates: "):
+        resolve_resources(index, "KUKA KR120R2500", "drill")
+
+
+def test_name_matcher_ranks_a_large_catalog_locally(monkeypatch, tmp_path):
+    synonyms = tmp_path / "synonyms.json"
+    synonyms.write_text('{"suction": "vacuum"}')
+    monkeypatch.setenv("VIBEIK_SYNONYMS", str(synonyms))
+    names = {f"g{i}": f"Gripper_Vacuum_{i}" for i in range(2000)}
+    names.update({f"d{i}": f"Drill_{i}mm" for i in range(1, 40)})
+    matcher = NameMatcher(names, synonym_table())
+
+    assert matcher.best("suction gripper 17").display == "Gripper_Vacuum_17"
+    assert matcher.best("8mm drilling").display == "Drill_8mm"
+    # Every drill is an equally good answer, so the caller should ask the LLM.
+    assert matcher.best("drilling") is None
+    assert len(matcher.rank("drilling", limit=5)) == 5
+    assert matcher.rank("zzz") == []
+
+
+def test_live_index_tracks_added_and_removed_files(tmp_path):
+    tools_dir = tmp_path / "Tools"
+    tools_dir.mkdir()
+    live = LiveResourceIndex(tmp_path)
+    first = live.current()
+    assert first.match_tool("Drill_8mm") is None
+    assert live.current() is first
+
+    tool_path = tools_dir / "Drill_8mm.m"
+    _write_tool_file(tool_path)
+    updated = live.current()
+    assert updated is not first
+    assert updated.resolve_tool("Drill_8mm") == tool_path
+
+    tool_path.unlink()
+    assert live.current().resolve_tool("Drill_8mm") is None
+
+
+def test_tool_loader_caches_inverse_tcp(tmp_path, monkeypatch):
+    monkeypatch.setenv("VIBEIK_CACHE_DIR", str(tmp_path / "cache"))
+    tool_path = tmp_path / "Offset.m"
+    tool_path.write_text("T_TCP = [1 0 0 0.1; 0 1 0 0; 0 0 1 0.2; 0 0 0 1];")
+    clear_resource_cache()
+
+    tool = load_tool(tool_path)
+    assert np.allclose(tool.tcp @ tool.tcp_inv, np.eye(4))
+    assert load_tool(tool_path) is tool
+    assert resource_cache_stats()["tools"].hits == 1
+
+
+def test_compiled_resources_survive_a_cold_start(tmp_path, monkeypatch):
+    monkeypatch.setenv("VIBEIK_CACHE_DIR", str(tmp_path / "cache"))
+    robot_path = tmp_path / "Bot.m"
+    calibration = "CAL = [" + "; ".join(["0.125 0.25 0.5 1.0"] * 2500) + "];\n"
+    robot_path.write_text(calibration + "DH = [" + "; ".join(["0 0.1 0 0.2"] * 6) + "];")
+    clear_resource_cache()
+    first = load_robot(robot_path)
+    assert len(list((tmp_path / "cache" / "resources" / "robots").iterdir())) == 1
+
+    clear_resource_cache()
+
+    def _fail(path, text):
+        raise AssertionError("compiled store should be reused")
+
+    monkeypatch.setattr("vibeik.resources._ROBOT_CACHE._compile_text", _fail)
+    again = load_robot(robot_path)
+    assert np.array_equal(again.dh, first.dh)
+
+
+def test_small_resources_are_not_written_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("VIBEIK_CACHE_DIR", str(tmp_path / "cache"))
+    robot_path = tmp_path / "Bot.m"
+    robot_path.write_text("DH = [" + "; ".join(["0 0.1 0 0.2"] * 6) + "];")
+    clear_resource_cache()
+
+    assert load_robot(robot_path).dh.shape == (6, 4)
+    assert not (tmp_path / "cache" / "resources").exists()
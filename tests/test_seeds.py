@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from vibeik import seeds
+from vibeik.kinematics import fkine, fkine_batch
+from vibeik.resources import load_robot
+
+
+ROBOT_PATH = Path(__file__).resolve().parents[1] / "RobotResources" / "RobotModels" / "KUKA KR120R2500.m"
+
+
+def test_nearest_seeds_are_closest_samples():
+    dh = load_robot(ROBOT_PATH).dh
+    index = seeds.SeedIndex.build(dh, samples=5000)
+    q = np.array([0.2, -0.5, 0.3, 0.1, 0.6, -0.4])
+    target = fkine(dh, q)
+
+    nearest = index.nearest(target, k=3)
+    assert nearest.shape == (3, 6)
+    target_features = seeds.pose_features(target)
+    brute_force = np.linalg.norm(index.features - target_features, axis=1).min()
+    best = np.linalg.norm(seeds.pose_features(fkine_batch(dh, nearest[:1])) - target_features)
+    assert np.isclose(best, brute_force)
+
+
+def test_seed_index_is_persisted_per_robot(monkeypatch, tmp_path):
+    monkeypatch.setenv("VIBEIK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("VIBEIK_SEED_SAMPLES", "500")
+    seeds._SEED_INDEXES.clear()
+    dh = load_robot(ROBOT_PATH).dh
+    first = seeds.seed_index(dh)
+    assert len(list((tmp_path / "seeds").glob("*.npz"))) == 1
+
+    seeds._SEED_INDEXES.clear()
+    monkeypatch.setattr(seeds.SeedIndex, "build", classmethod(lambda cls, *a, **k: 1 / 0))
+    again = seeds.seed_index(dh)
+    assert np.array_equal(again.q, first.q)
+    seeds._SEED_INDEXES.clear()
+
+
+def test_concurrent_saves_of_one_index_do_not_collide(tmp_path):
+    dh = load_robot(ROBOT_PATH).dh
+    index = seeds.SeedIndex.build(dh, samples=2000)
+    store = tmp_path / "seeds" / "index.npz"
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: index.save(store), range(8)))
+    assert np.array_equal(seeds.SeedIndex.load(store).q, index.q)
+    assert [path.name for path in store.parent.iterdir()] == ["index.npz"]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vibeik import ik
+from vibeik.cli import run
+from vibeik.ik import IKResult, available_solvers, register_solver, solve_ik
+from vibeik.kinematics import fkine
+from vibeik.lm_solver import SOLVER_CACHE_SIZE, NumpyLMSolver, lm_solver
+from vibeik.resources import load_robot
+
+
+ROBOT_PATH = Path(__file__).resolve().parents[1] / "RobotResources" / "RobotModels" / "KUKA KR120R2500.m"
+EXAMPLE_TEXT = "Using the KR120R2500 robot, move the Drill_8mm tool to [1.5m, 0.1m, 1.0m]"
+
+
+def test_numpy_lm_reaches_random_poses():
+    dh = load_robot(ROBOT_PATH).dh
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        q = rng.uniform(-np.pi, np.pi, size=6)
+        target = fkine(dh, q)
+        result = solve_ik(dh, target, solver="numpy_lm", q0=q + rng.normal(scale=0.2, size=6))
+        assert result.ok, result.warning
+        assert result.solver == "numpy_lm"
+        assert result.iterations >= 1
+        assert np.allclose(fkine(dh, result.joint_angles), target, atol=1e-5)
+
+
+def test_numpy_lm_falls_back_to_indexed_seeds_when_q0_fails(monkeypatch):
+    monkeypatch.setenv("VIBEIK_SEED_SAMPLES", "2000")
+    dh = load_robot(ROBOT_PATH).dh
+    target = fkine(dh, np.array([0.2, -0.5, 0.3, 0.1, 0.6, -0.4]))
+    q0 = np.full(6, 3.0)
+    seeds = list(ik._lm_seeds(dh, target, q0))
+    assert np.array_equal(seeds[0], q0)
+    assert len(seeds) == 1 + ik.SEED_CANDIDATES
+
+    solver = lm_solver(dh)
+    tried = []
+
+    class _FailingFromQ0:
+        def solve(self, target, seed):
+            tried.append(seed)
+            solution = solver.solve(target, seed)
+            return replace(solution, success=solution.success and len(tried) > 1)
+
+    monkeypatch.setattr(ik, "lm_solver", lambda dh: _FailingFromQ0())
+    result = solve_ik(dh, target, solver="numpy_lm", q0=q0, use_cache=False)
+    assert result.ok, result.warning
+    assert len(tried) >= 2 and np.array_equal(tried[0], q0)
+
+
+def test_numpy_lm_reuses_its_buffers():
+    dh = load_robot(ROBOT_PATH).dh
+    solver = NumpyLMSolver(dh)
+    target = fkine(dh, np.array([0.2, -0.5, 0.3, 0.1, 0.6, 0.0]))
+    buffers = [id(solver._links), id(solver._jacobian), id(solver._normal)]
+    first = solver.solve(target, np.zeros(6))
+    second = solver.solve(target, np.zeros(6))
+    assert first.success and second.success
+    assert np.array_equal(first.q, second.q)
+    assert [id(solver._links), id(solver._jacobian), id(solver._normal)] == buffers
+
+
+def test_thread_solver_cache_is_bounded():
+    dh = load_robot(ROBOT_PATH).dh
+    first = lm_solver(dh)
+    assert lm_solver(dh) is first
+    for offset in range(SOLVER_CACHE_SIZE):
+        lm_solver(dh + (offset + 1) * 1e-3)
+    assert lm_solver(dh) is not first
+
+
+def test_registered_solver_is_selectable_per_request(monkeypatch):
+    calls = []
+
+    def fixed(dh, target, q0):
+        calls.append(target)
+        return IKResult(ok=True, joint_angles=np.zeros(6), residual_error=0.0, warning=None, solver="fixed")
+
+    monkeypatch.setattr(ik, "_BACKENDS", dict(ik._BACKENDS))
+    register_solver("fixed", fixed)
+    assert "fixed" in available_solvers()
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    response = run(EXAMPLE_TEXT, solver="fixed")
+    assert response.ok and response.meta.solver == "fixed"
+    assert len(calls) == 1
+    assert run(EXAMPLE_TEXT).meta.solver == "analytic"
+
+
+def test_unknown_solver_is_reported():
+    response = run(EXAMPLE_TEXT, solver="nope")
+    assert not response.ok
+    assert "Unknown IK solver: nope" in response.warnings[0]
+    with pytest.raises(ValueError, match="reserved"):
+        register_solver("auto", lambda dh, target, q0: None)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+# Time allowed for importing vibeik and solving one prompt on top of numpy and pydantic.
+STARTUP_BUDGET_S = float(os.getenv("VIBEIK_STARTUP_BUDGET", "0.5"))
+HEAVY_MODULES = (
+    "openai", "httpx", "dotenv", "fastapi", "starlette", "roboticstoolbox", "spatialmath",
+    "scipy", "asyncio", "multiprocessing", "sqlite3",
+)
+
+_SCRIPT = """
+import json, sys, time
+import numpy, pydantic
+start = time.perf_counter()
+from vibeik.cli import run
+response = run(sys.argv[1], use_parse_cache=False)
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in sys.argv[2:] if name in sys.modules)
+print(json.dumps({"ok": response.ok, "elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def test_fallback_solve_starts_within_budget(tmp_path):
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    env.update(PYTHONPATH=str(SRC_DIR), VIBEIK_CACHE_DIR=str(tmp_path), VIBEIK_REACHABILITY="0")
+    text = ("I am using the KUKA KR120 R2500 robot. "
+            "I want to move the tooltip of an 8mm drilling tool to [1.5m, 0.1m, 1.0m]")
+    output = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, text, *HEAVY_MODULES],
+        env=env, capture_output=True, text=True, check=True, timeout=60,
+    )
+    report = json.loads(output.stdout)
+    assert report["ok"]
+    assert report["heavy"] == []
+    assert report["elapsed"] < STARTUP_BUDGET_S
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from vibeik.api import app
+from vibeik.cli import RESOURCE_INDEX, run_stream
+from vibeik.pipeline import resolve_resources
+from vibeik.streaming import stream_solve
+
+
+def test_stream_solve_is_lazy_and_indexes_points():
+    resources = resolve_resources(RESOURCE_INDEX.current(), "KR120R2500", "Drill_8mm")
+
+    def lines():
+        yield "x,y,z"
+        yield "1.5,0.1,1.0"
+        yield "not,a,number"
+        raise AssertionError("stream should not read ahead")
+
+    points = stream_solve(resources, lines())
+    first = next(points)
+    assert first.index == 0 and first.ok
+    second = next(points)
+    assert second.index == 1 and second.ok is False
+
+
+def test_cli_stream_writes_one_ndjson_line_per_target():
+    out = io.StringIO()
+    lines = io.StringIO('{"x": 1.5, "y": 0.1, "z": 1.0}\n\n{"x": 10, "y": 0, "z": 0}\n')
+    all_ok = run_stream("KR120R2500", "Drill_8mm", lines, out, input_format="ndjson")
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert all_ok is False
+    assert [record["index"] for record in records] == [0, 1]
+    assert [record["ok"] for record in records] == [True, False]
+
+
+def test_stream_route_emits_ndjson():
+    client = TestClient(app)
+    response = client.post(
+        "/solve/stream",
+        params={"robot_model": "KR120R2500", "tool_name": "Drill_8mm"},
+        content="x,y,z\n1.5,0.1,1.0\n1.5,0.2,1.0\n",
+        headers={"content-type": "text/csv"},
+    )
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["ok"] for record in records] == [True, True]